@@ -0,0 +1,101 @@
+# bench/brake_propagation.py
+# 긴 체인 제동 전파 벤치마크: 같은 스텝 feed-forward 채널 켬/끔 비교
+# - label 연결로 headless SUMO 시작 → r_0 경로에 트럭 N대 투입 → 체인 구성
+# - 정속 주행(warmup) 후 리더 스크립트 제동(press_for) → 체인 위치별 반응 지연,
+#   쌍별 간격 최대 감소량, 목표 간격(정지 간격 + 헤드웨이 × 속도) 대비 최대 부족량
+# 사용법 (truck_platooning 폴더에서, SUMO 필요):
+#   python bench/brake_propagation.py              # N = 8, 16
+#   python bench/brake_propagation.py 24 --brake 3
+import argparse
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)
+
+from simulation import events                        # noqa: E402
+from simulation.engine import PlatoonEngine, start_sumo  # noqa: E402
+from simulation.netindex import route_gap            # noqa: E402
+from simulation.profile import DEFAULT               # noqa: E402
+
+ROUTE = "r_0"
+SPACING = 18.0        # 투입 간격 (트럭 길이 12m + 여유) [m]
+FIRST_POS = 20.0      # 맨 뒤 트럭 투입 위치 [m]
+
+
+def _spawn(conn, n):
+    """r_0 첫 엣지에 트럭 n대를 앞에서부터 일정 간격으로 투입 → [B0(리더), B1, ...]"""
+    chain = [f"B{i}" for i in range(n)]
+    for i, vid in enumerate(chain):
+        pos = FIRST_POS + (n - 1 - i) * SPACING
+        conn.vehicle.add(vid, ROUTE, typeID="truckCACC", depart="now",
+                         departPos=f"{pos:.1f}", departSpeed="0", departLane="0")
+    conn.simulationStep()
+    return chain
+
+
+def run(profile, n, label, warmup, brake_s, after):
+    conn = start_sumo(profile, label)
+    events.configure(path=None, echo=False)
+    engine = PlatoonEngine(conn, _spawn(conn, n), profile, label=label)
+    engine.setup()
+    pairs = list(engine.state.follow_pairs)
+
+    while engine.sim_t < warmup and engine.step():
+        pass
+    base = {p: route_gap(conn, *p) for p in pairs}
+    min_gap = dict(base)
+    undershoot = {p: 0.0 for p in pairs}
+
+    engine.brakes.press_for(brake_s)
+    end_t = engine.sim_t + brake_s + after
+    while engine.sim_t < end_t and engine.step():
+        for p in pairs:
+            g = route_gap(conn, *p)
+            if g is None:
+                continue
+            if min_gap[p] is None or g < min_gap[p]:
+                min_gap[p] = g
+            want = profile.standstill_gap + profile.time_headway * conn.vehicle.getSpeed(p[0])
+            undershoot[p] = max(undershoot[p], want - g)
+
+    shrink = [(base[p] - min_gap[p]) if base[p] is not None and min_gap[p] is not None else None
+              for p in pairs]
+    episodes = engine.state.brake_channel.episodes
+    latency = episodes[-1]["latency"] if episodes else []
+    engine.finish(close_events=False)
+    return shrink, [undershoot[p] for p in pairs], latency
+
+
+def _fmt(xs):
+    return " ".join("  —  " if x is None else f"{x:5.2f}" for x in xs)
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="리더 제동 전파: feed-forward 채널 켬/끔 비교")
+    ap.add_argument("sizes", nargs="*", type=int, help="체인 길이 (기본 8 16)")
+    ap.add_argument("--warmup", type=float, default=60.0, help="제동 전 정속 주행 sim 시간 [s]")
+    ap.add_argument("--brake", type=float, default=3.0, help="리더 제동 유지 시간 [s]")
+    ap.add_argument("--after", type=float, default=20.0, help="제동 해제 후 관찰 시간 [s]")
+    args = ap.parse_args(argv)
+
+    base = DEFAULT.replace(name="brake-bench", sumo_binary="sumo", delay_ms=0, seed=42)
+    k = 0
+    for n in args.sizes or [8, 16]:
+        print(f"=== N={n} ===")
+        for ff in (False, True):
+            shrink, under, latency = run(base.replace(brake_feed_forward=ff), n, f"brake{k}",
+                                         args.warmup, args.brake, args.after)
+            k += 1
+            worst = max((s for s in shrink if s is not None), default=float("nan"))
+            print(f"feed_forward={'on ' if ff else 'off'}  worst gap shrink {worst:6.2f} m  "
+                  f"worst undershoot {max(under, default=0.0):6.2f} m")
+            print(f"  반응 지연[s] (위치 0=리더): {_fmt(latency)}")
+            print(f"  간격 감소[m] (쌍별):        {_fmt(shrink)}")
+            print(f"  목표 대비 부족[m] (쌍별):   {_fmt(under)}")
+    events.close()
+
+
+if __name__ == "__main__":
+    main()
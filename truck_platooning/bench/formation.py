@@ -0,0 +1,54 @@
+# bench/formation.py
+# 편성 시간 비교: 출발 편성 계획 vs 기존 게이트 폴링(앞차가 출구를 지나야 다음 차 출발)
+# SUMO 실행 없이 도로망 인덱스만 사용 (pa_0 → r_0, pa_1 → r_2 로 번갈아 배치)
+# 사용법 (truck_platooning 폴더에서):
+#   python bench/formation.py            # N = 3, 5, 10, 20
+#   python bench/formation.py 4 8 16
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)
+
+from simulation import formation, netindex              # noqa: E402
+from simulation.engine import PA0_END_POS, START_SPACING  # noqa: E402
+from simulation.profile import DEFAULT                   # noqa: E402
+
+SOURCES = (("pa_0", "r_0"), ("pa_1", "r_2"))
+
+
+def gate_estimate(plan):
+    """게이트 방식: 체인 순서대로, 앞차가 출구 + START_SPACING 을 지나야 다음 차 출발"""
+    release = 0.0
+    arrive = []
+    prev = None
+    for s in plan.slots:
+        if prev is not None:
+            _, _, exit_pos = net.parking_areas[prev.parking]
+            release += formation.travel_time(max(PA0_END_POS - exit_pos, 0.0) + START_SPACING, prev.speed, prev.accel)
+        arrive.append(release + s.travel)
+        prev = s
+    # 합류 순서가 체인과 다르면 재정렬(추월/양보)이 추가로 필요
+    in_order = all(a <= b for a, b in zip(arrive, arrive[1:]))
+    return max(arrive), in_order
+
+
+def run(n):
+    chain = [f"B{i}" for i in range(n)]
+    parking_of, routes = {}, {}
+    for i, vid in enumerate(chain):
+        pa, rid = SOURCES[i % len(SOURCES)]
+        parking_of[vid] = pa
+        routes[vid] = net.route_edges(rid)
+    plan = formation.plan(chain, parking_of, routes, net, DEFAULT.standstill_gap, DEFAULT.time_headway)
+    gate_t, in_order = gate_estimate(plan)
+    print(f"N={n:>3}  merge={plan.merge_edge}  plan {plan.formation_time:7.1f}s  "
+          f"gate {gate_t:7.1f}s{'' if in_order else ' (순서 뒤섞임)'}  "
+          f"headway {plan.headway:.2f}s")
+
+
+if __name__ == "__main__":
+    net, _, _ = netindex.load()
+    for n in [int(a) for a in sys.argv[1:]] or [3, 5, 10, 20]:
+        run(n)
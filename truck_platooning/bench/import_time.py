@@ -0,0 +1,53 @@
+# bench/import_time.py
+# 시작 시간 벤치마크: python -X importtime 으로 모듈별 누적 import 시간 측정
+# 사용법 (truck_platooning 폴더에서):
+#   python bench/import_time.py                       # 엔진/GUI 기본 비교
+#   python bench/import_time.py simulation.platoon    # 원하는 모듈 지정
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_MODULES = ["simulation.engine", "simulation.app"]
+HEAVY = ("tkinter", "http.server", "numpy")   # 엔진 경로에 있으면 안 되는 모듈
+REPEAT = 5
+
+
+def measure(module):
+    """(모듈 누적 us, {import된 모듈: 누적 us}) — 자식 프로세스에서 1회 import"""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT, capture_output=True, text=True,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1])
+    table = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        parts = line[len("import time:"):].split("|")
+        try:
+            cumulative = int(parts[1])
+        except ValueError:
+            continue  # 헤더 줄
+        table[parts[2].strip()] = cumulative
+    return table.get(module, 0), table
+
+
+def main(modules):
+    for module in modules:
+        runs = [measure(module) for _ in range(REPEAT)]
+        best, table = min(runs, key=lambda r: r[0])
+        heavy = [f"{m} {table[m] / 1000:.1f}ms" for m in HEAVY if m in table]
+        top = sorted(
+            ((us, name) for name, us in table.items() if name.startswith("simulation.") and name != module),
+            reverse=True,
+        )[:5]
+        print(f"{module}: {best / 1000:.1f} ms (best of {REPEAT}), modules={len(table)}")
+        print(f"  heavy: {', '.join(heavy) if heavy else '-'}")
+        for us, name in top:
+            print(f"  {name:<28} {us / 1000:6.1f} ms")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:] or DEFAULT_MODULES)
@@ -0,0 +1,92 @@
+# bench/safety_monitor.py
+# 안전 모니터 계산 비용: 차량 N대(차선 L개)의 TTC/헤드웨이/DRAC 한 번 계산 시간
+# - pair_metrics(): (차선, 위치) 정렬 + 배열 연산만
+# - SafetyMonitor.step(): 구독 결과 dict → 배열 변환 + 지표 + KPI 누적 (TraCI 왕복 제외)
+# 사용법 (truck_platooning 폴더에서, NumPy 필요):
+#   python bench/safety_monitor.py            # N = 100, 1000, 5000
+#   python bench/safety_monitor.py 20000 --lanes 200
+import argparse
+import os
+import random
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import numpy as np                                   # noqa: E402
+from simulation import events                        # noqa: E402
+from simulation.safety import SafetyMonitor, pair_metrics  # noqa: E402
+
+REPEAT = 200
+
+
+class _Snapshot:
+    """구독 결과만 돌려주는 최소 연결 (모든 차량이 이미 구독된 상태)"""
+    class exceptions:
+        TraCIException = Exception
+
+    def __init__(self, results):
+        self.results = results
+        self.vehicle = self
+        self.simulation = self
+
+    def getAllSubscriptionResults(self):
+        return self.results
+
+    def getIDList(self):
+        return tuple(self.results)
+
+    def getCollidingVehiclesIDList(self):
+        return ()
+
+
+def _snapshot(n, lanes, seed=1):
+    """차선마다 20~60 m 간격 대열, 속도는 차선 평균 ±2 m/s (정상 흐름 — 경보 쌍은 드묾)"""
+    rng = random.Random(seed)
+    v_lane, v_pos, v_speed, v_len = SafetyMonitor.VARS
+    out = {}
+    per_lane = -(-n // lanes)
+    for i in range(n):
+        k, j = divmod(i, per_lane)
+        base = 15.0 + k % 15
+        out[f"v{i}"] = {v_lane: f"e{k}_0", v_pos: j * 40.0 + rng.uniform(-10, 10),
+                        v_speed: base + rng.uniform(-2, 2), v_len: 12.0 if i % 5 == 0 else 4.5}
+    return out
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="안전 모니터 스텝당 계산 시간")
+    ap.add_argument("sizes", nargs="*", type=int, help="차량 수 (기본 100 1000 5000)")
+    ap.add_argument("--lanes", type=int, default=50, help="차선 수")
+    args = ap.parse_args(argv)
+    events.configure(path=None, echo=False)
+
+    mon = SafetyMonitor()
+    for n in args.sizes or [100, 1000, 5000]:
+        results = _snapshot(n, args.lanes)
+        v_lane, v_pos, v_speed, v_len = SafetyMonitor.VARS
+        codes = {}
+        lane = np.array([codes.setdefault(r[v_lane], len(codes)) for r in results.values()])
+        pos = np.array([r[v_pos] for r in results.values()])
+        length = np.array([r[v_len] for r in results.values()])
+        speed = np.array([r[v_speed] for r in results.values()])
+
+        t0 = time.perf_counter()
+        for _ in range(REPEAT):
+            fol, *_ = pair_metrics(lane, pos, length, speed)
+        core = (time.perf_counter() - t0) / REPEAT
+
+        conn = _Snapshot(results)
+        mon = SafetyMonitor()
+        t0 = time.perf_counter()
+        for _ in range(REPEAT):
+            mon.step(conn, 0.0, 0.05, ())
+        full = (time.perf_counter() - t0) / REPEAT
+        print(f"N={n:6d}  pairs={fol.size:6d}  pair_metrics {core * 1e6:8.1f} us  "
+              f"step(변환 포함) {full * 1e6:8.1f} us  경보 쌍 알림 {mon.kpi['all']['alerts']}")
+    events.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+# bench/soak.py
+# 장시간 실행 메모리 소크 테스트: 연속 배경 교통 + 수명 주기 정리 → RSS / 차량별 상태 크기가 평탄한지
+# - 기본 체인(주차장 트럭)으로 엔진 시작, 배경 교통 생성기(traffic.py)가 차선당 rate(veh/h)로 계속 투입
+#   (프로파일에 traffic_demand 가 있으면 그 수요 사용)
+# - report 간격마다 sim 시간, 주행 중 차량 수, 누적 출발/도착, 구간 평균 스텝 비용(wall), 프로세스 RSS,
+#   차량별 상태 항목 수 출력
+#   (차량별 상태 = RuntimeState dict/set + 후보 점수 + 차량 경로 표 + 이벤트 레이트 리밋 키 + 게이지)
+# - 마지막 줄: 첫 보고 이후 RSS 증가량. 정리가 동작하면 누적 차량 수와 무관하게 거의 일정
+# 사용법 (truck_platooning 폴더에서, SUMO 필요):
+#   python bench/soak.py                     # sim 3시간, 차선당 600 veh/h
+#   python bench/soak.py --hours 6 --rate 1200 --report 600
+#   python bench/soak.py --profile profiles/heavy_traffic.toml --hours 2
+import argparse
+import os
+import resource
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)
+
+from simulation import events                        # noqa: E402
+from simulation import metrics                       # noqa: E402
+from simulation.engine import PlatoonEngine          # noqa: E402
+from simulation.netindex import get_index            # noqa: E402
+from simulation.profile import DEFAULT               # noqa: E402
+
+
+def rss_mb():
+    """현재 RSS [MB] (/proc 없으면 최대 RSS)"""
+    try:
+        with open("/proc/self/status") as fh:
+            for line in fh:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024.0
+    except OSError:
+        pass
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024.0 * 1024.0) if sys.platform == "darwin" else peak / 1024.0
+
+
+def tracked_entries(engine):
+    """차량 수에 비례해 커질 수 있는 구조의 항목 수 합"""
+    rt = engine.state
+    n = sum(len(d) for d in (rt.vehicle_distances, rt.nearby_platoon, rt.join_scores, rt.started,
+                             rt.cut_in_active_pairs, rt.yielding_for_merge, rt.startup_lock_done,
+                             rt.startup_lock_until, rt.boosted, rt.lane_mode_restore, rt.pending_merge,
+                             rt.merge_coordinator, rt.join_cooldown, rt.leave_guard))
+    n += len(engine.candidates._scores) + len(get_index().vehicle_routes)
+    n += len(events.logger._last) + len(events.logger._suppressed) + len(metrics.registry._gauges)
+    if engine.safety is not None:
+        n += len(engine.safety._subscribed)
+    return n
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="장시간 실행 RSS / 차량별 상태 크기 소크 테스트")
+    ap.add_argument("--hours", type=float, default=3.0, help="sim 시간 [h]")
+    ap.add_argument("--rate", type=float, default=600.0, help="배경 교통 수요 [veh/h/lane] (프로파일에 없을 때)")
+    ap.add_argument("--report", type=float, default=900.0, help="보고 간격 sim [s]")
+    ap.add_argument("--profile", default=None, help="프로파일 파일 (기본: DEFAULT, sumo 바이너리)")
+    args = ap.parse_args(argv)
+
+    if args.profile:
+        from simulation.profile import load_profile
+        profile = load_profile(args.profile)
+    else:
+        profile = DEFAULT.replace(name="soak", sumo_binary="sumo", delay_ms=0, seed=7)
+    if not profile.traffic_demand:
+        profile = profile.replace(traffic_demand=((0.0, args.rate),))
+    events.configure(path=None, echo=False)
+    engine = PlatoonEngine.launch(profile, label="soak")
+
+    end_t = engine.sim_t + args.hours * 3600.0
+    next_report = engine.sim_t
+    base_rss = None
+    wall, steps = 0.0, 0
+    print(f"{'sim_t[s]':>9} {'live':>6} {'departed':>9} {'arrived':>8} {'step[ms]':>8} {'RSS[MB]':>8} {'tracked':>8}")
+    while engine.sim_t < end_t:
+        t0 = time.perf_counter()
+        if not engine.step():
+            break
+        wall += time.perf_counter() - t0
+        steps += 1
+        if engine.sim_t >= next_report:
+            next_report += args.report
+            lc = engine.lifecycle
+            rss = rss_mb()
+            base_rss = rss if base_rss is None else base_rss
+            print(f"{engine.sim_t:9.0f} {len(lc.live):6d} {lc.departed:9d} {lc.arrived:8d} "
+                  f"{wall / max(steps, 1) * 1000:8.2f} {rss:8.1f} {tracked_entries(engine):8d}", flush=True)
+            wall, steps = 0.0, 0
+    rss = rss_mb()
+    traffic = engine.traffic.summary() if engine.traffic is not None else {}
+    print(f"RSS 증가 (첫 보고 대비): {rss - (base_rss or rss):+.1f} MB, 배경 교통 {traffic}")
+    engine.finish(close_events=False)
+    events.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,21 @@
 # main.py
-from simulation.app import run
+# 사용법: python main.py [프로파일.toml|프로파일.json] [--rtf 1|2|10|max] [--web PORT [--no-gui] [--chain Veh0,Veh1]]
+import argparse
+from simulation.app import run, run_web
+from simulation.pacing import parse_rtf
 
 if __name__ == "__main__":
-    run()
-    
\ No newline at end of file
+    ap = argparse.ArgumentParser(description="트럭 플래투닝 GUI")
+    ap.add_argument("profile", nargs="?", default=None, help="프로파일 파일(.toml/.json). 없으면 기본 프로파일")
+    ap.add_argument("--rtf", type=parse_rtf, default=1.0, help="목표 실시간 배속 (1, 2, 10, max). 기본 1")
+    ap.add_argument("--web", type=int, default=None, metavar="PORT", help="브라우저 대시보드 포트 (0이면 빈 포트)")
+    ap.add_argument("--no-gui", action="store_true", help="Tk 창 없이 실행 (--web 필요)")
+    ap.add_argument("--chain", default=None, help="--no-gui 체인 (쉼표 구분, 기본: pa_0 주차 순서)")
+    args = ap.parse_args()
+    if args.no_gui:
+        if args.web is None:
+            ap.error("--no-gui 는 --web PORT 와 함께 사용")
+        run_web(args.profile, rtf=args.rtf, web_port=args.web,
+                chain=args.chain.split(",") if args.chain else None)
+    else:
+        run(args.profile, rtf=args.rtf, web_port=args.web)
@@ -0,0 +1,232 @@
+# simulation/analytics.py
+# 스트리밍 간격/열 안정성(string stability) 통계
+# - (follower, leader) 쌍마다 O(1) 메모리: Welford 평균/분산 + P² 분위수
+# - 매 스텝 update, 실행 종료 시 JSON export (전체 궤적 저장 없이 스윕 비교용)
+import json
+import math
+import os
+
+from simulation.profile import DEFAULT
+
+
+class RunningStats:
+    """Welford 온라인 평균/분산 + 최소/최대"""
+    __slots__ = ("n", "mean", "m2", "min", "max")
+
+    def __init__(self):
+        self.n = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def push(self, x):
+        self.n += 1
+        d = x - self.mean
+        self.mean += d / self.n
+        self.m2 += d * (x - self.mean)
+        if x < self.min:
+            self.min = x
+        if x > self.max:
+            self.max = x
+
+    @property
+    def variance(self):
+        return self.m2 / (self.n - 1) if self.n > 1 else 0.0
+
+    @property
+    def std(self):
+        return math.sqrt(self.variance)
+
+    @property
+    def rms(self):
+        """sqrt(E[x²]) = sqrt(mean² + 모분산)"""
+        if self.n == 0:
+            return 0.0
+        return math.sqrt(self.mean * self.mean + self.m2 / self.n)
+
+
+class P2Quantile:
+    """P² 알고리즘(Jain & Chlamtac) 스트리밍 분위수 추정 — 마커 5개만 유지"""
+    __slots__ = ("p", "n", "q", "pos", "des", "inc")
+
+    def __init__(self, p):
+        self.p = p
+        self.n = 0
+        self.q = []
+        self.pos = [1, 2, 3, 4, 5]
+        self.des = [1.0, 1.0 + 2.0 * p, 1.0 + 4.0 * p, 3.0 + 2.0 * p, 5.0]
+        self.inc = [0.0, p / 2.0, p, (1.0 + p) / 2.0, 1.0]
+
+    def push(self, x):
+        if self.n < 5:
+            self.q.append(x)
+            self.n += 1
+            if self.n == 5:
+                self.q.sort()
+            return
+        self.n += 1
+        q, pos = self.q, self.pos
+
+        if x < q[0]:
+            q[0] = x
+            k = 0
+        elif x >= q[4]:
+            q[4] = x
+            k = 3
+        else:
+            k = 0
+            while x >= q[k + 1]:
+                k += 1
+        for i in range(k + 1, 5):
+            pos[i] += 1
+        for i in range(5):
+            self.des[i] += self.inc[i]
+
+        # 가운데 마커 3개 보정
+        for i in (1, 2, 3):
+            d = self.des[i] - pos[i]
+            if (d >= 1 and pos[i + 1] - pos[i] > 1) or (d <= -1 and pos[i - 1] - pos[i] < -1):
+                d = 1 if d > 0 else -1
+                qp = q[i] + d / (pos[i + 1] - pos[i - 1]) * (
+                    (pos[i] - pos[i - 1] + d) * (q[i + 1] - q[i]) / (pos[i + 1] - pos[i])
+                    + (pos[i + 1] - pos[i] - d) * (q[i] - q[i - 1]) / (pos[i] - pos[i - 1])
+                )
+                if not (q[i - 1] < qp < q[i + 1]):
+                    # 포물선 보간이 단조성을 깨면 선형 보간
+                    qp = q[i] + d * (q[i + d] - q[i]) / (pos[i + d] - pos[i])
+                q[i] = qp
+                pos[i] += d
+
+    def value(self):
+        if self.n == 0:
+            return None
+        if self.n < 5:
+            s = sorted(self.q)
+            return s[int(round(self.p * (len(s) - 1)))]
+        return self.q[2]
+
+
+class PairStats:
+    """(follower, leader) 한 쌍의 누적 통계"""
+    __slots__ = ("follower", "leader", "upstream", "gap", "gap_err", "speed_err",
+                 "gap_p05", "abs_err_p95", "below_standstill_s", "time_s")
+
+    def __init__(self, follower, leader):
+        self.follower = follower
+        self.leader = leader
+        self.upstream = None            # 체인에서 바로 앞 쌍 (leader, leader의 리더)
+        self.gap = RunningStats()
+        self.gap_err = RunningStats()
+        self.speed_err = RunningStats()  # v_follower - v_leader
+        self.gap_p05 = P2Quantile(0.05)
+        self.abs_err_p95 = P2Quantile(0.95)
+        self.below_standstill_s = 0.0
+        self.time_s = 0.0
+
+    def push(self, gap, err, dv, dt, standstill):
+        self.gap.push(gap)
+        self.gap_err.push(err)
+        self.speed_err.push(dv)
+        self.gap_p05.push(gap)
+        self.abs_err_p95.push(abs(err))
+        self.time_s += dt
+        if gap < standstill:
+            self.below_standstill_s += dt
+
+
+class GapAnalytics:
+    def __init__(self, lookahead=250.0, profile=DEFAULT):
+        self.lookahead = lookahead
+        self.standstill_gap = profile.standstill_gap
+        self.time_headway = profile.time_headway
+        self.pairs = {}      # (follower, leader) -> PairStats
+        self._last_t = None
+
+    def step(self, traci_mod, follow_pairs, sim_t):
+        """매 스텝 호출: 현재 체인의 모든 쌍에 샘플 1개씩 추가"""
+        dt = 0.0 if self._last_t is None else max(0.0, sim_t - self._last_t)
+        self._last_t = sim_t
+        if not follow_pairs:
+            return
+
+        ids = set(traci_mod.vehicle.getIDList())
+        f2l = {f: l for (f, l) in follow_pairs}
+        for f, l in follow_pairs:
+            if f not in ids or l not in ids:
+                continue
+            try:
+                if traci_mod.vehicle.isStopped(f) or traci_mod.vehicle.isStopped(l):
+                    continue
+                info = traci_mod.vehicle.getLeader(f, self.lookahead)
+                if not info or info[0] != l:
+                    continue  # 끼어든 차량이 있거나 아직 같은 차선이 아님
+                gap = float(info[1])
+                vF = traci_mod.vehicle.getSpeed(f)
+                vL = traci_mod.vehicle.getSpeed(l)
+            except traci_mod.exceptions.TraCIException:
+                continue
+
+            st = self.pairs.get((f, l))
+            if st is None:
+                st = self.pairs[(f, l)] = PairStats(f, l)
+            ll = f2l.get(l)
+            st.upstream = (l, ll) if ll else None
+            err = gap - (self.standstill_gap + self.time_headway * max(vF, 0.0))
+            st.push(gap, err, vF - vL, dt, self.standstill_gap)
+
+    # -------- 결과 --------
+    def _amplification(self, st):
+        """열 안정성: 이 쌍의 속도오차 RMS / 앞 쌍의 속도오차 RMS (<=1 이면 감쇠)"""
+        up = self.pairs.get(st.upstream) if st.upstream else None
+        if up is None or up.speed_err.n == 0:
+            return None
+        base = up.speed_err.rms
+        return st.speed_err.rms / base if base > 1e-9 else None
+
+    def results(self):
+        rows = []
+        for st in self.pairs.values():
+            if st.gap.n == 0:
+                continue
+            amp = self._amplification(st)
+            rows.append({
+                "follower": st.follower,
+                "leader": st.leader,
+                "samples": st.gap.n,
+                "time_s": round(st.time_s, 3),
+                "gap_mean": st.gap.mean,
+                "gap_min": st.gap.min,
+                "gap_p05": st.gap_p05.value(),
+                "gap_error_mean": st.gap_err.mean,
+                "gap_error_std": st.gap_err.std,
+                "abs_gap_error_p95": st.abs_err_p95.value(),
+                "below_standstill_s": round(st.below_standstill_s, 3),
+                "speed_error_rms": st.speed_err.rms,
+                "speed_error_amplification": amp,
+            })
+        return rows
+
+    def summary(self):
+        """스윕 비교용 요약 지표"""
+        rows = self.results()
+        if not rows:
+            return {}
+        amps = [r["speed_error_amplification"] for r in rows if r["speed_error_amplification"] is not None]
+        n = sum(r["samples"] for r in rows)
+        return {
+            "pairs": len(rows),
+            "gap_min": min(r["gap_min"] for r in rows),
+            "gap_error_mean": sum(r["gap_error_mean"] * r["samples"] for r in rows) / n,
+            "abs_gap_error_p95_max": max(r["abs_gap_error_p95"] for r in rows),
+            "below_standstill_s": sum(r["below_standstill_s"] for r in rows),
+            "max_amplification": max(amps) if amps else None,
+            "string_stable": all(a <= 1.0 for a in amps) if amps else None,
+        }
+
+    def export(self, path, meta=None):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "w", encoding="utf-8") as fh:
+            json.dump({"meta": meta or {}, "summary": self.summary(), "pairs": self.results()},
+                      fh, ensure_ascii=False, indent=2)
+        return path
@@ -1,194 +1,122 @@
 # simulation/app.py
-import math
+# GUI 실행 셸: 엔진(simulation.engine) + Tk 창
+# - Tk/UI 모듈은 창을 실제로 띄우는 run() 안에서만 import (엔진 import 경로에 Tk 없음)
+# - run_web(): Tk 창 없이 브라우저 대시보드만 (렌더링이 제어 루프와 같은 이벤트 루프를 쓰지 않음)
 import time
-import tkinter as tk
-import traci
-import simulation.config as cfg
-from simulation.config import Sumo_config
-from simulation.safety import init_safety_defaults
-from simulation.platoon import (
-    maintain_or_release_lock,
-    boost_followers_once,
-    control_follower_speed,
-    ensure_initial_gap_lock,
-    switch_to_cacc,
-    switch_to_basic,
-)
-from simulation.ui import build_speedometer, update_vehicle
-from simulation.startui import open_selector_and_wait
-from simulation.vehicle_ui import _order_chain
-from simulation.cutin_ui import open_cutin_panel
-from simulation.cut_in import CutInManager
-from simulation.config import is_platoon_truck
-from simulation.config import PLATOON_JOIN_DISTANCE
-
-# ==== 출발 게이트 설정 (pa_0 출구 위치 기준) ====
-# pa_0이 lane="E0_0"에 있다면 EDGE는 "E0" 입니다.
-START_GATE_EDGE = "E0"   # 출발 게이트가 위치한 엣지 ID
-PA0_END_POS     = 30     
-START_SPACING   = 3.0   # 앞차가 게이트 통과 후 최소 이 거리(m) 이상 벌어졌을 때 다음 차 출발
 
-# ======= 모든 차량이 주차될 때까지 대기 =======
-# ======= 모든 플래투닝 트럭이 각자 주차장에 들어와야 UI 표시 =======
-def wait_until_all_parked(traci_mod, timeout=180.0):
-    """
-    시뮬레이터에 등장한 '플래투닝 트럭(Veh..)'들만
-    모두 정차(주차) 상태가 될 때까지 대기.
-    일반 차량은 무시.
-    """
-    t0 = time.time()
-    while time.time() - t0 < timeout:
-        traci_mod.simulationStep()
-
-        # 플래투닝 트럭만 필터링
-        ids = [
-            vid for vid in traci_mod.vehicle.getIDList()
-            if is_platoon_truck(vid)
-        ]
+from simulation import events
+from simulation.config import is_platoon_truck
+from simulation.engine import PlatoonEngine, default_chain, start_sumo, wait_until_all_parked
+from simulation.maneuvers import _order_chain
+from simulation.pacing import RTF_CHOICES, Pacer, rtf_label
+from simulation.profile import DEFAULT, load_profile
 
-        if ids and all(traci_mod.vehicle.isStopped(vid) for vid in ids):
-            print("[INFO] 모든 플래투닝 트럭 주차 완료.")
-            return True
+MAX_SPEEDOMETERS = 6   # 계기판은 체인 앞쪽부터 이 대수까지만 (전체 트럭은 Fleet 표에서)
 
-    print("[WARN] 일부 플래투닝 트럭이 여전히 이동 중입니다. (timeout)")
-    return False
+def run(profile_path=None, rtf=1.0, web_port=None):
+    # 0) 시나리오 프로파일 (없으면 config.py 기본값)
+    profile = load_profile(profile_path) if profile_path else DEFAULT
 
-def run():
-    # 1) SUMO 시작 + 기본값
-    traci.start(Sumo_config)
-    init_safety_defaults()
-    print("[INFO] SUMO 시작 - 모든 차량 주차 완료 대기 중...")
+    # 1) SUMO 시작 + 기본값 (기본 연결의 스텝 캐시)
+    traci = start_sumo(profile)
+    events.emit("info", "SUMO 시작 - 모든 차량 주차 완료 대기 중...")
 
     ok = wait_until_all_parked(traci, timeout=180.0)
-    print("[INFO] 주차 완료 상태:", ok)
+    events.emit("info", f"주차 완료 상태: {ok}")
 
     # 2) 주차 이후 선택창: 리더/팔로워 선택 → 체인
+    from simulation.startui import open_selector_and_wait
     chain = open_selector_and_wait(traci)  # ['Veh0','Veh1', ...]
-    print("[DEBUG] 선택 결과 chain =", chain)
+    events.emit("chain", f"선택 결과 chain = {chain}", chain=chain)
     if not chain:
-        print("[WARN] 선택이 취소되거나 비어 있습니다. 종료.")
+        events.emit("warn", "선택이 취소되거나 비어 있습니다. 종료.")
         traci.close(False)
+        events.close()
         return
 
-    # FOLLOW_PAIRS 구성 (선택 차량만)
-    pairs = [(chain[i], chain[i - 1]) for i in range(1, len(chain))]  # (follower, leader)
-    cfg.FOLLOW_PAIRS = pairs
-    cfg.FOLLOWERS = [f for f, _ in pairs]
-    print("[INFO] FOLLOW_PAIRS:", cfg.FOLLOW_PAIRS)
-
-    leader_id = chain[0]
-    try:
-        traci.vehicle.setType(leader_id, "truckBASIC")
-    except traci.exceptions.TraCIException:
-        pass
-
-    # 팔로워는 CACC 타입으로 전환
-    for f, _ in cfg.FOLLOW_PAIRS:
-        switch_to_cacc(f)
+    engine = PlatoonEngine(traci, chain, profile)
+    engine.setup()
+    dash = _serve_web(engine, web_port)
 
     # 3) UI 구성 (선택 차량만 계기판 띄우기)
+    import tkinter as tk
+    from simulation.ui import build_speedometer, update_vehicle
+    from simulation.vehicle_ui import open_vehicle_viewer
+    from simulation.cutin_ui import open_cutin_panel
+    from simulation.fleet_ui import FleetView
+
     root = tk.Tk()
     # 창 생성 직후 위치 지정
-    root.geometry("+100+50")  
+    root.geometry("+100+50")
     root.title("Truck Platooning – Real-Time Dashboard")
     colors = ["red", "orange", "yellow", "green", "blue", "purple", "pink"]
 
-    # Veh* 차량만 UI 대상
+    # Veh* 차량만 UI 대상 (체인 멤버 먼저)
     all_vehicles = [
         vid for vid in traci.vehicle.getIDList()
         if is_platoon_truck(vid)
     ]
+    all_vehicles = [v for v in chain if v in all_vehicles] + [v for v in all_vehicles if v not in chain]
 
     meters = {}  # vid -> (canvas, needle, label)
 
-    for idx, vid in enumerate(all_vehicles):
+    for idx, vid in enumerate(all_vehicles[:MAX_SPEEDOMETERS]):
         try:
             canv, needle, lab = build_speedometer(
                 root, vid, col=idx, needle_color=colors[idx % len(colors)]
             )
             meters[vid] = (canv, needle, lab)
         except Exception as e:
-            print(f"[WARN] {vid} 계기판 생성 실패: {e}")
+            events.emit("warn", f"{vid} 계기판 생성 실패: {e}", vid=vid)
 
     # 차량 뷰어(리더/팔로워/참여/이탈 등)
-    from simulation.vehicle_ui import open_vehicle_viewer
-    open_vehicle_viewer(root, traci, chain)   # 드롭다운 뷰어 창 1개 띄움
-
-    # 5) “게이트 + 간격” 조건으로 순차 출발
-    release_index = 0                # chain[release_index]가 다음 출발 대상
-    released = []                    # 이미 출발한 차량 목록
-    gate_cross_dist = {}             # {vid: gate 통과 직후의 누적 거리}
-
-    def ready_to_release_next():
-        """다음 차량을 출발시켜도 되는지 판단."""
-        nonlocal gate_cross_dist
-
-        # 리더는 바로 출발
-        if release_index == 0:
-            return True
-
-        # 앞차 조건 확인
-        prev_id = chain[release_index - 1]
-        try:
-            road = traci.vehicle.getRoadID(prev_id)          
-            lane_pos = traci.vehicle.getLanePosition(prev_id) 
-
-            # (1) 게이트 통과 여부: 아직 pa_0 출구 이전이면 대기
-            if road == START_GATE_EDGE and lane_pos < PA0_END_POS:
-                return False
-
-            # (2) 게이트 통과 순간의 누적거리(distance)를 기준점으로 기록
-            if prev_id not in gate_cross_dist:
-                gate_cross_dist[prev_id] = traci.vehicle.getDistance(prev_id)
-
-            # (3) 간격 조건: 게이트 통과 기준점 대비 START_SPACING 이상 이동했는가
-            d_from_gate = traci.vehicle.getDistance(prev_id) - gate_cross_dist[prev_id]
-            return d_from_gate >= START_SPACING
-
-        except traci.exceptions.TraCIException:
-            return False
-
-    # ==== 메인 루프 ====
-
-    # 끼어들기 상태 준비
-    cutin_mgr = CutInManager()
+    open_vehicle_viewer(root, traci, chain, engine.state, engine.brakes)   # 드롭다운 뷰어 창 1개 띄움
 
     # 체인 콜백: UI에서 Leader/Follower 콤보박스 갱신용
     def _get_chain_for_cutin():
         # FOLLOW_PAIRS 기반 실시간 체인 정렬
-        return _order_chain(cfg.FOLLOW_PAIRS)
+        return _order_chain(engine.state.follow_pairs)
 
     # 보조 UI 창 하나 띄우기
-    open_cutin_panel(root, cutin_mgr, _get_chain_for_cutin)
+    open_cutin_panel(root, engine.cutin, _get_chain_for_cutin)
+
+    # 속도/간격 시계열 플롯 (NumPy 필요, 없으면 생략)
+    try:
+        from simulation.plots_ui import open_plot_window
+        plots = open_plot_window(root, traci, engine.state)
+    except ImportError as e:
+        plots = None
+        events.emit("warn", f"시계열 플롯 생략 (NumPy 필요): {e}")
+
+    # 실시간 배속 선택 (1×/2×/10×/max) + 실측 배속 표시
+    pacer = Pacer(rtf)
+    pace_bar = tk.Frame(root)
+    pace_bar.grid(row=2, column=0, columnspan=max(1, len(meters)), sticky="w", padx=10, pady=(0, 8))
+    tk.Label(pace_bar, text="배속:").pack(side="left")
+    rtf_var = tk.StringVar(value=rtf_label(rtf))
+    for text, value in RTF_CHOICES:
+        tk.Radiobutton(pace_bar, text=text, value=text, variable=rtf_var,
+                       command=lambda v=value: pacer.set_rtf(v, engine.sim_t)).pack(side="left")
+    pace_label = tk.Label(pace_bar, text="", font=("Consolas", 9))
+    pace_label.pack(side="left", padx=(12, 0))
+
+    # 전체 트럭 Fleet 표 (캔버스 1개, 보이는 행만 갱신)
+    fleet = FleetView(root, traci, engine.state)
+    fleet.grid(row=3, column=0, columnspan=max(1, len(meters)), sticky="nsew", padx=10, pady=(0, 10))
 
+    # ==== 메인 루프 ====
     def update_loop():
-        nonlocal release_index
-        try:
-            traci.simulationStep()
-        except traci.exceptions.TraCIException:
+        # 밀린 만큼 스텝 실행 (뒤처지면 여러 스텝), UI 는 프레임당 1번만 갱신
+        alive, wait_ms = pacer.frame(engine)
+        if not alive:
+            events.emit("pacing", "페이싱 요약", **pacer.summary())
+            if dash:
+                dash.stop()
+            engine.finish()
             root.quit()
             return
-
-        # --- 동적으로 플래투닝 체인 업데이트 ---
-        current_chain = _order_chain(cfg.FOLLOW_PAIRS)
-
-        # --- 출발 조건 충족 시에만 다음 차량 release ---
-        if release_index < len(chain) and ready_to_release_next():
-            vid = chain[release_index]
-            try:
-                if traci.vehicle.isStopped(vid):
-                    traci.vehicle.resume(vid)
-                    print(f"[START] {vid} 출발")
-                    released.append(vid)
-
-                    # 팔로워 출발 직후 초기 락
-                    for f, l in cfg.FOLLOW_PAIRS:
-                        if vid == f:
-                            ensure_initial_gap_lock(f, l)
-            except traci.exceptions.TraCIException:
-                pass
-            else:
-                release_index += 1
+        if dash:
+            dash.publish()
 
         # --- UI 갱신 ---
         all_veh_set = set(traci.vehicle.getIDList())
@@ -198,73 +126,60 @@ def run():
                     canv, needle, lab = meters[vid]
                     update_vehicle(traci, vid, canv, needle, lab)
                 except Exception as e:
-                    print(f"[WARN] {vid} UI 갱신 실패: {e}")
-
-        # 제어 로직
-        boost_followers_once()
-        for f, l in cfg.FOLLOW_PAIRS:
-            maintain_or_release_lock(f, l)
-            control_follower_speed(f, l)
-
-        # 끼어들기 상태머신 진행
-        cutin_mgr.tick()
-
-        # 플래투닝 맨 뒷 차량과 비플래투닝 차량 간 거리 계산 + 로그 레이트-리밋 
+                    events.emit("warn", f"{vid} UI 갱신 실패: {e}", key=f"ui:{vid}", every=5.0, vid=vid)
+        if plots:
+            plots.sample(engine.sim_t, engine.chain_now)
         try:
-            # 체인 기준: 실시간 체인 사용 (current_chain)
-            if current_chain:
-                last_platoon_veh = current_chain[-1]
-
-                all_veh_set = set(traci.vehicle.getIDList())
-                platoon_vehicles = set(current_chain)
-                non_platoon_vehicles = all_veh_set - platoon_vehicles
-
-                if last_platoon_veh in all_veh_set and non_platoon_vehicles:
-                    # 플래투닝 맨 뒷 차량 위치
-                    last_pos = traci.vehicle.getPosition(last_platoon_veh)
-
-                    for non_platoon_veh in non_platoon_vehicles:
-                        try:
-                            # 주차장에 있는 차량은 스킵
-                            non_lane = traci.vehicle.getLaneID(non_platoon_veh)
-                            non_road = traci.vehicle.getRoadID(non_platoon_veh)
-                            if (not non_lane) or non_lane.startswith("pa_") or non_road.startswith("pa_"):
-                                cfg.VEHICLE_DISTANCES[non_platoon_veh] = float("inf")
-                                continue
+            fleet.refresh(engine.chain_now)
+        except Exception as e:
+            events.emit("warn", f"Fleet 표 갱신 실패: {e}", key="ui:fleet", every=5.0)
 
-                            non_pos = traci.vehicle.getPosition(non_platoon_veh)
-                            dx = last_pos[0] - non_pos[0]
-                            dy = last_pos[1] - non_pos[1]
-                            distance_diff = math.sqrt(dx * dx + dy * dy)
+        if pacer.achieved is not None:
+            pace_label.config(text=f"실측 {pacer.achieved:.2f}× · 스텝 {pacer.step_ema * 1000:.1f} ms")
+        root.after(wait_ms, update_loop)
 
-                            # vehicle_ui에서 사용할 값 저장
-                            cfg.VEHICLE_DISTANCES[non_platoon_veh] = distance_diff
+    def on_close():
+        if dash:
+            dash.stop()
+        engine.finish(wait=False)
+        root.destroy()
 
-                        except traci.exceptions.TraCIException:
-                            # 에러 발생 시 거리 무한대로 설정
-                            cfg.VEHICLE_DISTANCES[non_platoon_veh] = float("inf")
-                            pass
-        except Exception:
-            pass
+    root.protocol("WM_DELETE_WINDOW", on_close)
+    root.after(1, update_loop)
+    root.mainloop()
 
-        # --- 종료 처리 ---
-        if traci.simulation.getMinExpectedNumber() <= 0:
-            try:
-                traci.close()
-            except Exception:
-                pass
-            root.quit()
-            return
 
-        root.after(50, update_loop)  # 20Hz
+def _serve_web(engine, port):
+    if port is None:
+        return None
+    from simulation.webdash import serve
+    return serve(engine, port=port)
 
-    def on_close():
-        try:
-            traci.close(False)
-        except Exception:
-            pass
-        root.destroy()
 
-    root.protocol("WM_DELETE_WINDOW", on_close)
-    root.after(50, update_loop)
-    root.mainloop()
\ No newline at end of file
+def run_web(profile_path=None, rtf=1.0, web_port=8765, chain=None):
+    """Tk 창 없이 실행 + 브라우저 대시보드 (체인 미지정이면 default_chain: pa_0 주차 순서)"""
+    profile = load_profile(profile_path) if profile_path else DEFAULT
+    traci = start_sumo(profile)
+    events.emit("info", "SUMO 시작 - 모든 차량 주차 완료 대기 중...")
+    ok = wait_until_all_parked(traci, timeout=180.0)
+    events.emit("info", f"주차 완료 상태: {ok}")
+
+    chain = chain or default_chain(traci)
+    events.emit("chain", f"chain = {chain}", chain=chain)
+    engine = PlatoonEngine(traci, chain, profile)
+    engine.setup()
+    dash = _serve_web(engine, web_port)
+    pacer = Pacer(rtf)
+    try:
+        while True:
+            alive, wait_ms = pacer.frame(engine)
+            if not alive:
+                break
+            dash.publish()
+            time.sleep(wait_ms / 1000.0)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        events.emit("pacing", "페이싱 요약", **pacer.summary())
+        dash.stop()
+        engine.finish()
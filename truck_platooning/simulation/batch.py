@@ -0,0 +1,108 @@
+# simulation/batch.py
+# 한 프로세스에서 여러 시뮬레이션 교대 실행 (label TraCI 연결)
+# - 엔진마다 SUMO 1개 + RuntimeState 1개, 인터프리터/모듈 import 는 한 번만
+# - round-robin: 엔진마다 batch 스텝씩 번갈아 진행
+# - cache(ResultCache)를 주면 같은 설정(키 동일)은 SUMO 를 띄우지 않고 저장된 결과 반환,
+#   한 호출 안의 중복 설정도 한 번만 실행
+# - stop(engine) 을 주면 check_every 스텝마다 호출, 사유 문자열을 돌려주면 그 실행을 조기 종료
+#   (결과에 aborted=사유, 조기 종료 결과는 캐시에 저장하지 않음 — 중단 기준이 키에 없으므로)
+#
+# 사용법 (truck_platooning 폴더에서):
+#   python -m simulation.batch profiles/headless.toml profiles/headless.toml --batch 20 --max-steps 4000
+#   python -m simulation.batch profiles/*.toml --max-steps 4000 --cache results/cache
+import argparse
+import json
+import time
+
+from simulation import events
+from simulation.engine import PlatoonEngine
+from simulation.profile import DEFAULT, load_profile
+from simulation.resultcache import DEFAULT_MAX_BYTES, ResultCache, run_key
+
+
+def run_many(profiles, chain=None, batch=1, max_steps=None, label_prefix="run", cache=None, traces=False,
+             stop=None, check_every=100):
+    """profiles 마다 엔진 1개를 띄워 교대로 스텝. 반환: 엔진별 result() 목록 (입력 순서)
+    cache 가 있으면 적중한 설정은 실행하지 않음 (결과에 cached=True)"""
+    results = [None] * len(profiles)
+    todo = {}                                 # 키 -> 그 키를 쓰는 입력 위치들 (첫 위치만 실행)
+    for i, p in enumerate(profiles):
+        key = run_key(p, chain, max_steps) if cache is not None else i
+        if key in todo:
+            todo[key].append(i)
+            continue
+        hit = cache.get(key) if cache is not None else None
+        if hit is not None:
+            results[i] = hit
+            continue
+        todo[key] = [i]
+
+    engines = [
+        (key, PlatoonEngine.launch(profiles[idx[0]], label=f"{label_prefix}{idx[0]}", chain=chain))
+        for key, idx in todo.items()
+    ]
+    alive = [eng for _, eng in engines]
+    aborted = {}                              # 엔진 -> 조기 종료 사유
+    next_check = {eng: check_every for eng in alive}
+    started = time.perf_counter()
+    while alive:
+        for eng in list(alive):
+            done = False
+            for _ in range(batch):
+                if not eng.step() or (max_steps and eng.steps >= max_steps):
+                    done = True
+                    break
+            if not done and stop is not None and eng.steps >= next_check[eng]:
+                next_check[eng] = eng.steps + check_every
+                reason = stop(eng)
+                if reason:
+                    aborted[eng] = reason
+                    events.emit("abort", f"{eng.label} 조기 종료: {reason}", label=eng.label, steps=eng.steps)
+                    done = True
+            if done:
+                eng.finish(close_events=False)
+                alive.remove(eng)
+    events.close()
+    # 교대 실행이라 엔진별 wall 시간은 따로 못 잼 → 전체를 실행 수로 나눈 값을 적중 시 절약 시간으로 기록
+    wall = (time.perf_counter() - started) / len(engines) if engines else 0.0
+    for key, eng in engines:
+        res = eng.result()
+        if eng in aborted:
+            res["aborted"] = aborted[eng]
+        elif cache is not None:
+            cache.put(key, res, wall_s=wall, traces=eng.gap_stats.results() if traces else None)
+        for n, i in enumerate(todo[key]):
+            results[i] = dict(res, deduplicated=True) if n else res
+    return results
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="여러 시나리오를 한 프로세스에서 교대 실행")
+    ap.add_argument("profiles", nargs="*", help="프로파일 파일(.toml/.json). 없으면 기본 프로파일 1개")
+    ap.add_argument("--repeat", type=int, default=1, help="각 프로파일 반복 횟수")
+    ap.add_argument("--batch", type=int, default=1, help="엔진을 바꾸기 전 연속 스텝 수")
+    ap.add_argument("--max-steps", type=int, default=None, help="엔진별 최대 스텝 (없으면 시뮬레이션 종료까지)")
+    ap.add_argument("--chain", default=None, help="쉼표로 구분한 체인 (예: Veh0,Veh1,Veh2)")
+    ap.add_argument("--cache", default=None, metavar="DIR", help="결과 캐시 디렉터리 (예: results/cache)")
+    ap.add_argument("--cache-mb", type=float, default=DEFAULT_MAX_BYTES / 2**20, help="결과 캐시 크기 상한 [MB]")
+    ap.add_argument("--traces", action="store_true", help="캐시에 쌍별 간격 통계 행도 저장")
+    args = ap.parse_args(argv)
+
+    profiles = [load_profile(p) for p in args.profiles] or [DEFAULT.replace(sumo_binary="sumo", delay_ms=0)]
+    profiles = [p for p in profiles for _ in range(args.repeat)]
+    chain = args.chain.split(",") if args.chain else None
+    cache = ResultCache(args.cache, max_bytes=args.cache_mb * 2**20) if args.cache else None
+
+    t0 = time.perf_counter()
+    results = run_many(profiles, chain=chain, batch=args.batch, max_steps=args.max_steps,
+                       cache=cache, traces=args.traces)
+    wall = time.perf_counter() - t0
+    steps = sum(r["steps"] for r in results if not (r.get("cached") or r.get("deduplicated")))
+    print(json.dumps(results, ensure_ascii=False, indent=2, default=str))
+    print(f"{len(results)} runs, {steps} steps, {wall:.2f} s wall, {steps / wall if wall else 0.0:.0f} steps/s")
+    if cache is not None:
+        print("cache:", json.dumps(cache.report(), ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,18 +1,102 @@
 # simulation/brake_controller.py
 # 모든 차량 브레이크 제어 (클릭마다 감속량 누적, 이후 자동 복귀)
+# + 같은 스텝 제동 전파 채널 (리더 제동 명령 → 체인 뒤 모든 팔로워 제어기에 feed-forward 감속)
+from simulation import events
+from simulation import metrics
+
+REACT_DECEL = -0.5        # 이 이하 가속도면 '반응(감속 시작)'으로 간주 [m/s²]
+EPISODE_TIMEOUT = 10.0    # 제동 시작 후 이 시간 안에 반응 없으면 미반응으로 기록 [s]
+
+
+class BrakeChannel:
+    """리더 제동 → 같은 스텝에 팔로워 제어기로 전달되는 feed-forward 채널 (RuntimeState 당 1개)
+    - publish(): 제동 주체(BrakeController / 스크립트 이벤트)가 이번 스텝 명령 가속도 게시
+    - feed_forward(): 팔로워 제어기가 같은 스텝에 읽음 (제동 차량이 체인상 앞에 있을 때만)
+    - observe(): 제동 시작 후 체인 위치별 반응 지연(실제 감속 시작까지) 측정
+    """
+    def __init__(self):
+        self.source = None
+        self.accel = 0.0          # 이번 스텝 명령 가속도 (<0 이면 제동)
+        self._t = None            # 게시한 sim time (다른 스텝 값은 무시)
+        self._chain = []
+        self._order = {}          # vid -> 체인 인덱스
+        self.active = False       # 제동 명령 게시 중
+        self.onset_t = None       # 측정 중인 제동 시작 시각 (측정 끝나면 None)
+        self.latency = {}         # vid -> 반응 지연 [s] (진행 중인 제동)
+        self.episodes = []        # [{'source', 'onset', 'latency': [위치별 지연 or None]}]
+
+    def set_chain(self, chain):
+        """체인 순서 갱신 (바뀌었을 때만 재색인)"""
+        if chain != self._chain:
+            self._chain = list(chain)
+            self._order = {v: i for i, v in enumerate(self._chain)}
+
+    def publish(self, source, accel, sim_t):
+        self.source = source
+        self.accel = accel
+        self._t = sim_t
+        if accel < 0.0 and not self.active:
+            self.onset_t = sim_t
+            self.latency = {}
+            events.emit("brake", f"{source} 제동 시작 → 팔로워 feed-forward", vid=source,
+                        accel=round(accel, 2))
+        self.active = accel < 0.0
+
+    def feed_forward(self, follower_id, sim_t):
+        """이번 스텝에 follower 가 미리 반영할 가속도 (없으면 0)"""
+        if self._t != sim_t or self.accel >= 0.0:
+            return 0.0
+        i = self._order.get(follower_id)
+        j = self._order.get(self.source)
+        if i is None or j is None or i <= j:
+            return 0.0
+        return self.accel
+
+    def observe(self, traci_mod, sim_t):
+        """매 스텝: 제동 차량부터 체인 뒤까지 감속 시작 시각 기록"""
+        if self._t != sim_t:
+            self.active = False       # 이번 스텝 게시 없음 = 제동 종료
+        if self.onset_t is None:
+            return
+        j = self._order.get(self.source)
+        targets = self._chain[j:] if j is not None else [self.source]
+        for vid in targets:
+            if vid in self.latency:
+                continue
+            try:
+                if traci_mod.vehicle.getAcceleration(vid) <= REACT_DECEL:
+                    self.latency[vid] = round(sim_t - self.onset_t, 3)
+            except traci_mod.exceptions.TraCIException:
+                self.latency[vid] = None
+        done = len(self.latency) >= len(targets)
+        if done or (sim_t - self.onset_t > EPISODE_TIMEOUT and not self.active):
+            by_pos = [self.latency.get(v) for v in targets]
+            self.episodes.append({"source": self.source, "onset": self.onset_t, "latency": by_pos})
+            for k, lat in enumerate(by_pos):
+                if lat is not None:
+                    metrics.set_gauge("brake_reaction_latency_seconds", lat, position=str(k))
+            events.emit("brake_latency", f"제동 반응 지연(위치별): {by_pos}", vid=self.source,
+                        latency=[None if x is None else round(x, 3) for x in by_pos])
+            self.onset_t = None
+
+
 class BrakeController:
     def __init__(self, traci_mod, sim_dt=0.05,
                  ramp_down_per_s=1.5,   # 버튼 누르는 동안 factor 감소 속도 (초당)
                  ramp_up_per_s=0.8,     # 버튼 떼고 나서 factor 회복 속도 (초당)
-                 min_factor=0.0):       # 최저 factor (0.0이면 정지까지 허용)
+                 min_factor=0.0,        # 최저 factor (0.0이면 정지까지 허용)
+                 channel=None):         # BrakeChannel (None이면 전파 없음)
         self.traci = traci_mod
         self.SIM_DT = sim_dt
         self.ramp_down = ramp_down_per_s
         self.ramp_up = ramp_up_per_s
         self.min_factor = min_factor
+        self.channel = channel
         self.factor = 1.0
+        self.applied = 1.0          # 마지막으로 적용한 factor
         self.braking = False
-        self.leader_id = None 
+        self.release_at = None      # 스크립트 제동: 이 sim time 에 자동 해제
+        self.leader_id = None
 
     def set_leader(self, leader_id: str):
         """리더 차량 ID를 동적으로 설정"""
@@ -24,6 +108,15 @@ class BrakeController:
             return
         self.traci.vehicle.setSpeed(lid, -1) # 잔여 명령 해제
         self.traci.vehicle.setSpeedFactor(lid, self.factor)
+        self.applied = self.factor
+
+    def _publish(self, lid):
+        """이번 스텝 리더 예상 가속도: 허용 속도(speedFactor 반영)까지 차량 최대 감속도로 감속"""
+        veh = self.traci.vehicle
+        v = veh.getSpeed(lid)
+        v_des = veh.getAllowedSpeed(lid)
+        accel = -min(veh.getDecel(lid), max(0.0, (v - v_des) / self.SIM_DT))
+        self.channel.publish(lid, accel, self.traci.simulation.getTime())
 
     def on_brake_press(self, _=None):
         """버튼을 꾹 누르는 순간"""
@@ -33,13 +126,26 @@ class BrakeController:
         """버튼을 떼는 순간"""
         self.braking = False
 
+    def press_for(self, seconds):
+        """스크립트 제동: 지금부터 seconds 동안 버튼을 누른 것과 같음"""
+        self.braking = True
+        self.release_at = self.traci.simulation.getTime() + seconds
+
     def update(self):
         """매 step 회복(브레이크를 누르지 않아도 자동 복귀)"""
         lid = self.leader_id
         if not lid or lid not in self.traci.vehicle.getIDList():
             return
+        if self.release_at is not None and self.traci.simulation.getTime() >= self.release_at:
+            self.braking = False
+            self.release_at = None
         if self.braking:
             self.factor = max(self.min_factor, self.factor - self.ramp_down * self.SIM_DT)
         else:
             self.factor = min(1.0, self.factor + self.ramp_up * self.SIM_DT)
-        self._apply()
\ No newline at end of file
+        # 평상시(factor 1.0 유지)에는 명령 없음 → 다른 제어기의 setSpeed 를 지우지 않음
+        if self.factor == 1.0 and self.applied == 1.0:
+            return
+        self._apply()
+        if self.channel is not None:
+            self._publish(lid)
@@ -0,0 +1,138 @@
+# simulation/candidates.py
+# 플래투닝 참여 후보 인덱스
+# - 비플래투닝 트럭(Veh*)마다 같은 경로 위 PLATOON_JOIN_DISTANCE 이내 체인 멤버를 유지 → rt.nearby_platoon
+# - 거리: 유클리드가 아닌 경로 누적 오프셋 기준 (두 차량의 현재 엣지가 양쪽 경로에 모두 있을 때만)
+# - 점수: 내 남은 경로 중 리더 목적지까지의 경로와 겹치는 비율 (0~1) → rt.join_scores
+# - 증분 갱신: 위치는 매 스텝 스텝 캐시된 getRoadID/getLanePosition 으로,
+#   경로 겹침은 (내 엣지, 리더, 리더 목적지)가 바뀔 때만 다시 계산
+from simulation import runtime
+from simulation.config import is_platoon_truck
+from simulation.netindex import get_index
+
+
+def _stop_field(stop, name):
+    return stop.get(name, "") if isinstance(stop, dict) else getattr(stop, name, "")
+
+
+def destination_edge(traci_mod, vid, net=None):
+    """차량 목적지 엣지 (vehicle_ui._get_destination_str 과 같은 기준):
+    마지막 정차가 주차장/차선이면 그 엣지, 없으면 경로 마지막 엣지"""
+    net = net or get_index()
+    try:
+        stops = traci_mod.vehicle.getStops(vid)
+    except traci_mod.exceptions.TraCIException:
+        stops = ()
+    if stops:
+        last = stops[-1]
+        pa = _stop_field(last, "parkingArea")
+        if pa in net.parking_areas:
+            return net.lane_edge(net.parking_areas[pa][0])
+        lane = _stop_field(last, "lane")
+        if lane:
+            return net.lane_edge(lane)
+    try:
+        edges = net.vehicle_route(traci_mod, vid)
+    except traci_mod.exceptions.TraCIException:
+        return None
+    return edges[-1] if edges else None
+
+
+def route_overlap(net, my_edges, my_edge, leader_edges, leader_edge, dest):
+    """내 남은 경로(현재 엣지부터) 중 리더의 남은 경로(현재 엣지 ~ 목적지)와 겹치는 길이 비율"""
+    if my_edge not in my_edges or leader_edge not in leader_edges:
+        return None
+    mine = my_edges[my_edges.index(my_edge):]
+    i = leader_edges.index(leader_edge)
+    j = leader_edges.index(dest, i) if dest in leader_edges[i:] else len(leader_edges) - 1
+    shared = set(leader_edges[i:j + 1])
+    total = sum(net.edge_length(e) for e in mine)
+    if total <= 0.0:
+        return 0.0
+    return sum(net.edge_length(e) for e in mine if e in shared) / total
+
+
+class JoinCandidateIndex:
+    def __init__(self, state=None):
+        self.rt = state or runtime.current()
+        self._scores = {}    # vid -> ((내 엣지, 리더, 리더 목적지), 점수)
+
+    def forget(self, vids):
+        """도착 차량 점수 캐시 정리"""
+        for vid in vids:
+            self._scores.pop(vid, None)
+
+    def _locate(self, traci_mod, vid, net):
+        """(경로 엣지, 현재 엣지, 차선 위치) — 주차 중/미출발이면 None"""
+        try:
+            lane = traci_mod.vehicle.getLaneID(vid)
+            road = traci_mod.vehicle.getRoadID(vid)
+            if (not lane) or lane.startswith("pa_") or road.startswith("pa_"):
+                return None
+            return net.vehicle_route(traci_mod, vid), road, traci_mod.vehicle.getLanePosition(vid)
+        except traci_mod.exceptions.TraCIException:
+            return None
+
+    def update(self, traci_mod, chain):
+        """매 스텝 호출: rt.nearby_platoon / rt.join_scores / rt.vehicle_distances 갱신"""
+        rt = self.rt
+        net = get_index()
+        limit = rt.profile.platoon_join_distance
+        nearby, distances, scores = {}, {}, {}
+
+        members = set(chain)
+        trucks = [v for v in traci_mod.vehicle.getIDList() if is_platoon_truck(v) and v not in members]
+        located = {}
+        for v in chain:
+            loc = self._locate(traci_mod, v, net)
+            if loc is not None:
+                located[v] = loc
+
+        leader = chain[0] if chain else None
+        dest = destination_edge(traci_mod, leader, net) if leader in located else None
+
+        for me in trucks:
+            mine = self._locate(traci_mod, me, net)
+            if mine is None or not located:
+                distances[me] = float("inf")
+                continue
+            my_edges, my_edge, my_pos = mine
+            offs = net.route_offsets(my_edges)
+            pm = offs.get(my_edge)
+            cand = []
+            if pm is not None:
+                pm += my_pos
+                for v, (v_edges, v_edge, v_pos) in located.items():
+                    # 같은 경로 위: 두 차량의 현재 엣지가 양쪽 경로에 모두 있을 때
+                    pv = offs.get(v_edge)
+                    if pv is None or my_edge not in net.route_offsets(v_edges):
+                        continue
+                    d = abs(pv + v_pos - pm)
+                    if d <= limit + 1e-6:
+                        cand.append((v, d))
+            cand.sort(key=lambda x: x[1])
+            if cand:
+                nearby[me] = cand
+            distances[me] = cand[0][1] if cand else float("inf")
+
+            # 리더 목적지까지 경로 겹침 (내 엣지/목적지가 바뀔 때만 재계산)
+            if dest is not None:
+                key = (my_edge, leader, dest)
+                cached = self._scores.get(me)
+                if cached is not None and cached[0] == key:
+                    score = cached[1]
+                else:
+                    l_edges, l_edge, _ = located[leader]
+                    score = route_overlap(net, my_edges, my_edge, l_edges, l_edge, dest)
+                    if score is None and cached is not None:
+                        score = cached[1]   # 교차로 내부 엣지 등: 이전 값 유지
+                    self._scores[me] = (key, score)
+                if score is not None:
+                    scores[me] = score
+
+        # 사라진 차량 정리
+        for vid in [v for v in self._scores if v not in distances]:
+            del self._scores[vid]
+
+        rt.nearby_platoon = nearby
+        rt.join_scores = scores
+        rt.vehicle_distances = distances
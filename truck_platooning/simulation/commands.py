@@ -0,0 +1,182 @@
+# simulation/commands.py
+# 참여/이탈/출발/제동/끼어들기 명령 (UI 비의존)
+# - VehicleViewer(Tk) 버튼과 웹 대시보드가 같은 함수 사용 (확인 대화상자는 호출하는 UI 쪽 책임)
+# - CommandQueue: 다른 스레드(웹 서버)에서 put → 엔진이 스텝 시작 시 제어 스레드에서 drain 하며 실행
+#   (TraCI 연결은 스레드 안전하지 않으므로 명령 실행은 항상 제어 스레드에서)
+import queue
+
+from simulation import events
+from simulation import metrics
+from simulation.maneuvers import (
+    LEAVE_GUARD_SEC,
+    _adjacent_lane_or_self,
+    _nearby_fallback,
+    _order_chain,
+    _pick_best_front_for_merge,
+    _smooth_change_lane,
+)
+from simulation.platoon import switch_to_basic, switch_to_cacc
+
+OPS = ("join", "leave", "start", "brake", "cut_in_spawn", "cut_in", "cut_out")
+
+
+# ===== 참여/이탈/출발 =====
+def join_target(traci_mod, rt, me):
+    """me 가 합류할 체인 앞차와 거리 (참여 불가면 None)"""
+    chain = _order_chain(rt.follow_pairs)
+    if me in chain or not chain:
+        return None
+    nearby = rt.nearby_platoon.get(me, [])
+    if not nearby:
+        nearby = _nearby_fallback(traci_mod, me, chain, rt.profile.platoon_join_distance)
+    nearby = [(v, d) for (v, d) in nearby if v in chain]
+    if not nearby:
+        return None
+    front, distance = nearby[0]
+    return _pick_best_front_for_merge(traci_mod, me, chain, front), distance
+
+
+def join(traci_mod, rt, me, front, distance=None):
+    """me 를 front 뒤에 끼워 넣고 합류 코디네이터에 등록"""
+    pairs = list(rt.follow_pairs)
+    rear = next((f for (f, l) in pairs if l == front), None)
+    pairs = [(f, l) for (f, l) in pairs if f != me and l != me]
+    pairs.append((me, front))
+    if rear:
+        pairs = [(f, (me if (f == rear and l == front) else l)) for (f, l) in pairs]
+    rt.set_pairs(pairs)
+
+    switch_to_cacc(me)
+
+    # 합류 코디네이터에 등록
+    rt.merge_coordinator[me] = {
+        'front': front,
+        'rear': rear,  # rear가 None이면 맨 뒤 합류
+        'state': 'aligning'
+    }
+    events.emit("join", f"{me} trying to merge behind {front}, coordinator active.",
+                vid=me, front=front, rear=rear,
+                distance=None if distance is None else round(distance, 2))
+    return rear
+
+
+def leave(traci_mod, rt, me):
+    """me 를 체인에서 빼고 앞/뒤를 다시 잇기 → (front, rear), 체인 멤버가 아니면 None"""
+    pairs = list(rt.follow_pairs)
+    chain = _order_chain(pairs)
+    if me not in chain:
+        return None
+    i = chain.index(me)
+    front = chain[i-1] if i-1 >= 0 else None
+    rear  = chain[i+1] if i+1 < len(chain) else None
+
+    try:
+        if rear and (rear in traci_mod.vehicle.getIDList()):
+            sim_t = traci_mod.simulation.getTime()
+            rt.leave_guard[rear] = (sim_t + LEAVE_GUARD_SEC, me)
+            metrics.inc("guard_activations", guard="leave_guard")
+            events.emit("guard", guard="leave_guard", vid=rear, departing=me, until=sim_t + LEAVE_GUARD_SEC)
+            try:
+                v_now = traci_mod.vehicle.getSpeed(rear)
+                traci_mod.vehicle.setSpeed(rear, max(3.0, v_now - 2.0))
+                traci_mod.vehicle.setLaneChangeMode(rear, 0)
+            except Exception: pass
+    except Exception: pass
+
+    pairs = [(f, l) for (f, l) in pairs if f != me and l != me]
+    if front and rear: pairs.append((rear, front))
+    events.emit("leave", f"{me} 플래투닝 이탈", vid=me, front=front, rear=rear)
+    rt.set_pairs(pairs)
+
+    switch_to_basic(me)
+
+    # 합류 중이었다면 코디네이터에서 제거
+    rt.merge_coordinator.pop(me, None)
+
+    try:
+        cur_lane = traci_mod.vehicle.getLaneID(me)
+        cur_idx  = traci_mod.vehicle.getLaneIndex(me)
+        tgt_idx  = _adjacent_lane_or_self(traci_mod, cur_lane, cur_idx, prefer_right=True)
+        _smooth_change_lane(traci_mod, me, tgt_idx, hold_sec=3.0)
+    except Exception: pass
+    return front, rear
+
+
+def start(traci_mod, rt, me):
+    """주차 중인 비플래투닝 트럭 수동 출발 (출발했으면 True)"""
+    try:
+        if me not in traci_mod.vehicle.getIDList():
+            return False
+        lane_id = traci_mod.vehicle.getLaneID(me)
+        road_id = traci_mod.vehicle.getRoadID(me)
+        is_in_parking = (not lane_id or lane_id.startswith("pa_") or road_id.startswith("pa_")
+                         or traci_mod.vehicle.isStopped(me))
+        if not is_in_parking:
+            return False
+        traci_mod.vehicle.resume(me)
+    except traci_mod.exceptions.TraCIException:
+        return False
+    events.emit("release", f"{me} 출발", vid=me, manual=True)
+    rt.set_pairs([(f, l) for (f, l) in rt.follow_pairs if f != me and l != me])
+    rt.started.add(me)
+    return True
+
+
+# ===== 스레드 간 명령 큐 =====
+class CommandQueue:
+    """다른 스레드 → 제어 스레드 명령 전달. 명령은 dict: {'op': ..., 인자...}"""
+    def __init__(self, maxsize=256):
+        self._q = queue.Queue(maxsize=maxsize)
+
+    def put(self, cmd):
+        """명령 1건 enqueue (형식 오류/큐 포화면 False)"""
+        if not isinstance(cmd, dict) or cmd.get("op") not in OPS:
+            return False
+        try:
+            self._q.put_nowait(cmd)
+        except queue.Full:
+            return False
+        return True
+
+    def drain(self, engine):
+        """제어 스레드에서 스텝마다 호출: 쌓인 명령 모두 실행"""
+        while True:
+            try:
+                cmd = self._q.get_nowait()
+            except queue.Empty:
+                return
+            try:
+                ok = execute(engine, cmd)
+            except (engine.traci.exceptions.TraCIException, KeyError, TypeError, ValueError) as e:
+                ok = False
+                events.emit("warn", f"명령 실패 {cmd.get('op')}: {e}", op=cmd.get("op"))
+            args = {k: cmd[k] for k in ("vid", "leader", "follower", "seconds") if k in cmd}
+            events.emit("command", f"{cmd.get('op')} → {'ok' if ok else 'rejected'}",
+                        op=cmd.get("op"), ok=bool(ok), source=cmd.get("source"), **args)
+
+
+def execute(engine, cmd):
+    """명령 1건 실행 (수락되면 truthy)"""
+    op = cmd["op"]
+    traci_mod, rt = engine.traci, engine.state
+    vid = cmd.get("vid")
+    if op == "join":
+        target = join_target(traci_mod, rt, vid)
+        if target is None:
+            return False
+        join(traci_mod, rt, vid, *target)
+        return True
+    if op == "leave":
+        return leave(traci_mod, rt, vid) is not None
+    if op == "start":
+        return start(traci_mod, rt, vid)
+    if op == "brake":
+        engine.brakes.press_for(max(0.0, min(10.0, float(cmd.get("seconds", 2.0)))))
+        return True
+    if op == "cut_in_spawn":
+        return engine.cutin.start(cmd["leader"], cmd["follower"], car_id=cmd.get("car", "VehCut"))
+    if op == "cut_in":
+        return engine.cutin.request_cut_in()
+    if op == "cut_out":
+        return engine.cutin.request_cut_out()
+    return False
@@ -1,14 +1,6 @@
 # simulation/config.py
-# SUMO configuration 
-Sumo_config = [
-    'sumo-gui',
-    '-c', 'map/final.sumocfg',        # 상대경로로 map 폴더 지정
-    '--step-length', '0.05',         
-    '--delay', '100',                 
-    '--lateral-resolution', '0.1',
-    '--collision.action', 'warn',   
-    '--collision.mingap-factor', '1.0'
-]
+# 기본 상수 모음 — simulation/profile.py 의 ScenarioProfile 기본값으로 쓰임
+# (SUMO 실행 인자는 ScenarioProfile.sumo_args(), 실행 중 바뀌는 상태는 simulation/runtime.py)
 
 # === 플래투닝 / 제어 상수 === 
 DESIRED_GAP   = 15.0  #리더 - 팔로워 사이 간격
@@ -23,13 +15,14 @@ TIME_HEADWAY   = 0.5   # Th: 시간 간격 #0.6으로 하면 15.9정도 유지 0
 # 플래투닝 참여 버튼 활성화 거리 (m)
 PLATOON_JOIN_DISTANCE = 300.0 
 
-# ===== 전역 상태(런타임 갱신) =====
-FOLLOW_PAIRS = []
-FOLLOWERS = []
-VEHICLE_DISTANCES = {}
-STARTED = set()
-NEARBY_PLATOON = {} # 300m 참여 후보: {미참여 차량: [(플래투닝 차량, 거리), ...]}
-CUT_IN_ACTIVE_PAIRS = {}  # {(leader_id, follower_id): True} - 끼어들기 접근 중인 플래투닝 쌍
+# 구조화 이벤트 로그 (JSON Lines). None이면 콘솔 출력만
+EVENT_LOG_PATH = None
+
+# 로컬 메트릭 엔드포인트 포트 (None이면 비활성, 0이면 빈 포트 자동 선택)
+METRICS_PORT = None
+
+# 실행 종료 시 쌍별 간격/열 안정성 통계 저장 경로 (None이면 저장 안 함)
+ANALYTICS_PATH = "results/gap_stats.json"
 
 # === 끼어들기 대응 상수 ===
 CUT_IN_EXPAND_GAP = 38.0  # 끼어들기 접근 시 목표 간격 (기본 15m -> 38m: 차량길이 5m + 앞안전거리 15m + 뒤안전거리 15m + 여유 3m)
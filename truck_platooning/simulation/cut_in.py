@@ -1,10 +1,11 @@
 # simulation/cut_in.py
-import traci
-from collections import deque
+from simulation.traci_cache import traci
+from simulation import events
+from simulation import metrics
+from simulation.netindex import get_index
+from simulation import runtime
 import time
 
-_last_approach_print = 0.0  # 옆차 접근 감지 로그 레이트 리밋
-
 
 DESIRED_GAP = 15.0
 APPROACH_VF = 1.15
@@ -21,14 +22,14 @@ class CutInManager:
         request_cut_in()  : 옆차선 -> 메인차선 진입
         request_cut_out() : 메인차선 -> 옆차선 복귀
     """
-    def __init__(self):
+    def __init__(self, state=None):
+        self.rt = state or runtime.current()   # 소속 엔진의 런타임 상태 (끼어들기 플래그/프로파일)
         self.state = "idle"
         self.car_id = None
         self.target_lane = 0
         self.side_lane = 1
         self.leader = None
         self.follower = None
-        self._last_msgs = deque(maxlen=10)
 
         # 수동 트리거 플래그
         self._want_cut_in = False
@@ -42,8 +43,16 @@ class CutInManager:
         self._recognized_once = False
         self._last_recog_ts = 0.0
 
-    def log(self, msg):
-        self._last_msgs.append(msg)
+    def log(self, msg, **fields):
+        events.emit("cutin", msg, car=self.car_id, leader=self.leader, follower=self.follower, **fields)
+
+    def _set_state(self, state):
+        """상태 전이 + 이벤트 기록"""
+        if state == self.state:
+            return
+        events.emit("cutin_state", f"{self.state} -> {state}", car=self.car_id,
+                    leader=self.leader, follower=self.follower, prev=self.state, state=state)
+        self.state = state
 
     def ready(self):
         return self.state in ("idle", "done")
@@ -58,17 +67,16 @@ class CutInManager:
         self.follower = follower_id
         self._want_cut_in = False
         self._want_cut_out = False
-        self.state = "spawn"
+        self._set_state("spawn")
 
         # 차선 변경 감지 관련 초기화
         self._previous_lane_id = None
         self._lane_change_detected = False
 
         # 기존 플래그 제거 (새로 시작 시)
-        import simulation.config as cfg
         pair_key = (leader_id, follower_id)
-        if pair_key in cfg.CUT_IN_ACTIVE_PAIRS:
-            del cfg.CUT_IN_ACTIVE_PAIRS[pair_key]
+        if pair_key in self.rt.cut_in_active_pairs:
+            del self.rt.cut_in_active_pairs[pair_key]
 
         return True
 
@@ -79,24 +87,31 @@ class CutInManager:
 
     @staticmethod
     def _edge_id(lane_id: str) -> str:
-        return lane_id.split("_")[0]
+        return get_index().lane_edge(lane_id)
 
     def _ensure_dynamic_route(self, leader_id: str):
-        rid = traci.vehicle.getRouteID(leader_id)
-        if rid:
-            edges = traci.route.getEdges(rid)
-        else:
-            edges = traci.vehicle.getRoute(leader_id)
+        net = get_index()
         new_rid = f"r_cut_{leader_id}"
+        if net.route_edges(new_rid) is not None:
+            return new_rid  # 이미 SUMO에 등록한 경로
+
+        rid = traci.vehicle.getRouteID(leader_id)
+        edges = net.route_edges(rid) if rid else None
+        if edges is None:
+            edges = traci.route.getEdges(rid) if rid else traci.vehicle.getRoute(leader_id)
         try:
             traci.route.add(new_rid, edges)
         except traci.TraCIException:
             pass
+        net.register_route(new_rid, edges)
         return new_rid
 
+    def _route_edges_of(self, route_id):
+        return get_index().route_edges(route_id)
+
     def _pick_side_lane(self, lane_id: str):
         base_edge = self._edge_id(lane_id)
-        num_lanes = traci.edge.getLaneNumber(base_edge)
+        num_lanes = get_index().lane_count(base_edge)
         self.target_lane = 0
         self.side_lane = 1 if num_lanes >= 2 else 0
 
@@ -123,7 +138,7 @@ class CutInManager:
         # 리더/팔로워 유효성
         for vid in [self.leader, self.follower]:
             if not vid or vid not in traci.vehicle.getIDList():
-                self.state = "done"
+                self._set_state("done")
                 return
 
         if self.state == "spawn":
@@ -144,12 +159,13 @@ class CutInManager:
                     pass
 
             traci.vehicle.add(vehID=car, routeID=route_id, typeID="carCUT", depart="now")
+            get_index().vehicle_routes[car] = list(self._route_edges_of(route_id))
             traci.vehicle.setSpeedMode(car, 0)
             traci.vehicle.setSpeedFactor(car, APPROACH_VF)
 
             side_lane_id = f"{self._edge_id(laneL)}_{self.side_lane}"
             traci.vehicle.moveTo(car, side_lane_id, spawn_pos)
-            self.state = "approach"
+            self._set_state("approach")
 
             try:
                 self._previous_lane_id = side_lane_id
@@ -164,17 +180,16 @@ class CutInManager:
 
             # 차선 변경이 감지되면 간격 확장 시작
             if self._lane_change_detected:
-                import simulation.config as cfg
                 pair_key = (self.leader, self.follower)
-                if pair_key not in cfg.CUT_IN_ACTIVE_PAIRS:
-                    cfg.CUT_IN_ACTIVE_PAIRS[pair_key] = True
-                    print(f"[플래그 설정] CUT_IN_ACTIVE_PAIRS에 \
-                          ({self.leader}, {self.follower}) 추가됨")
+                if pair_key not in self.rt.cut_in_active_pairs:
+                    self.rt.cut_in_active_pairs[pair_key] = True
+                    metrics.inc("guard_activations", guard="cut_in_active")
+                    events.emit("guard", f"CUT_IN_ACTIVE_PAIRS에 ({self.leader}, {self.follower}) 추가됨",
+                                guard="cut_in_active", leader=self.leader, follower=self.follower)
 
             # 간격 확장 유지 (차선 변경 감지 후)
-            import simulation.config as cfg
             pair_key = (self.leader, self.follower)
-            if pair_key in cfg.CUT_IN_ACTIVE_PAIRS:
+            if pair_key in self.rt.cut_in_active_pairs:
                 self._expand_platoon_gap_for_cutin()
                 # 끼어드는 차량 - 계속 감속하여 간격 확장에 협조
                 self._slow_down_cutin_vehicle()
@@ -190,9 +205,11 @@ class CutInManager:
                 traci.vehicle.slowDown(self.car_id, max(vL, 9.0), 1.2)
 
                 # 깜빡이를 켰으므로 즉시 플래그 설정 (차선 변경 감지 전에 미리 설정)
-                if pair_key not in cfg.CUT_IN_ACTIVE_PAIRS:
-                    cfg.CUT_IN_ACTIVE_PAIRS[pair_key] = True
-                    print(f"[깜빡이 켜짐] 끼어들기 버튼 클릭 - 플래그 즉시 설정: ({self.leader}, {self.follower})")
+                if pair_key not in self.rt.cut_in_active_pairs:
+                    self.rt.cut_in_active_pairs[pair_key] = True
+                    metrics.inc("guard_activations", guard="cut_in_active")
+                    events.emit("guard", f"깜빡이 켜짐 - 플래그 즉시 설정: ({self.leader}, {self.follower})",
+                                guard="cut_in_active", leader=self.leader, follower=self.follower)
 
                 try:
                     self._previous_lane_id = traci.vehicle.getLaneID(self.car_id)
@@ -203,7 +220,7 @@ class CutInManager:
             try:
                 current_lane_id = traci.vehicle.getLaneID(self.car_id)
                 if current_lane_id and self._lane_index(current_lane_id) == self.target_lane:
-                    self.state = "in_main"
+                    self._set_state("in_main")
                     # 차선 변경 직후 한 번 체크
                     self._check_cutin_recognition()
             except traci.exceptions.TraCIException:
@@ -220,16 +237,15 @@ class CutInManager:
 
             if self._want_cut_out:
                 self._want_cut_out = False
-                import simulation.config as cfg
                 pair_key = (self.leader, self.follower)
-                if pair_key in cfg.CUT_IN_ACTIVE_PAIRS:
-                    del cfg.CUT_IN_ACTIVE_PAIRS[pair_key]
+                if pair_key in self.rt.cut_in_active_pairs:
+                    del self.rt.cut_in_active_pairs[pair_key]
 
                 steps = int(HOLD_CHANGE_SEC / traci.simulation.getDeltaT())
                 traci.vehicle.changeLane(self.car_id, self.side_lane, steps)
                 vC = traci.vehicle.getSpeed(self.car_id)
                 traci.vehicle.slowDown(self.car_id, vC + 5.0, 1.0)
-                self.state = "cut_out"
+                self._set_state("cut_out")
             return
 
         if self.state == "cut_out":
@@ -241,9 +257,9 @@ class CutInManager:
                         traci.vehicle.setSpeedFactor(self.car_id, 1.0)
                     except traci.TraCIException:
                         pass
-                    self.state = "done"
+                    self._set_state("done")
             except traci.TraCIException:
-                self.state = "done"
+                self._set_state("done")
             return
 
     def _detect_lane_change(self):
@@ -265,11 +281,11 @@ class CutInManager:
                 if prev_lane_idx == self.side_lane and current_lane_idx == self.target_lane:
                     if not self._lane_change_detected:
                         self._lane_change_detected = True
-                        print(f"[차선 변경 감지] 옆차({self.car_id})가 차선 변경 시작 - 플래투닝 그룹 간격 확장 시작")
+                        self.log(f"옆차({self.car_id})가 차선 변경 시작 - 플래투닝 그룹 간격 확장 시작")
                 elif prev_lane_idx == self.side_lane and current_lane_idx != self.side_lane:
                     if not self._lane_change_detected:
                         self._lane_change_detected = True
-                        print(f"[차선 변경 감지] 옆차({self.car_id})가 차선 변경 시작 - 플래투닝 그룹 간격 확장 시작")
+                        self.log(f"옆차({self.car_id})가 차선 변경 시작 - 플래투닝 그룹 간격 확장 시작")
 
             self._previous_lane_id = current_lane_id
 
@@ -300,48 +316,42 @@ class CutInManager:
         """CUT_IN_ACTIVE_PAIRS 플래그가 켜졌을 때, 현재 간격 모니터링
         platoon.control_follower_speed() 쪽에서 제어.
         """
-        global _last_approach_print
         try:
             if self.car_id not in traci.vehicle.getIDList():
-                import simulation.config as cfg
                 pair_key = (self.leader, self.follower)
-                if pair_key in cfg.CUT_IN_ACTIVE_PAIRS:
-                    del cfg.CUT_IN_ACTIVE_PAIRS[pair_key]
+                if pair_key in self.rt.cut_in_active_pairs:
+                    del self.rt.cut_in_active_pairs[pair_key]
                 return
 
             if self.leader not in traci.vehicle.getIDList() or self.follower not in traci.vehicle.getIDList():
-                import simulation.config as cfg
                 pair_key = (self.leader, self.follower)
-                if pair_key in cfg.CUT_IN_ACTIVE_PAIRS:
-                    del cfg.CUT_IN_ACTIVE_PAIRS[pair_key]
+                if pair_key in self.rt.cut_in_active_pairs:
+                    del self.rt.cut_in_active_pairs[pair_key]
                 return
 
-            import simulation.config as cfg
             pair_key = (self.leader, self.follower)
 
-            if pair_key not in cfg.CUT_IN_ACTIVE_PAIRS:
+            if pair_key not in self.rt.cut_in_active_pairs:
                 return
 
-            from simulation.config import CUT_IN_EXPAND_GAP
+            # 간격 로그만 남기는 경로 → 레이트 리밋에 걸리면 조회/포맷 생략
+            log_key = f"cutin_gap:{self.follower}"
+            if not events.should_emit(log_key, 2.0):
+                return
 
             try:
                 info = traci.vehicle.getLeader(self.follower, 150.0)
                 if info and info[0] == self.leader:
                     current_gap = float(info[1])
-
-                    now = time.time()
-                    if now - _last_approach_print > 2.0:
-                        if current_gap < CUT_IN_EXPAND_GAP:
-                            print(
-                                f"[간격 확장 중] 플래투닝 그룹 간격 확장 중 - "
-                                f"현재: {current_gap:.1f}m, 목표: {CUT_IN_EXPAND_GAP:.1f}m "
-                            )
-                        else:
-                            print(
-                                f"[간격 확장 완료] 플래투닝 그룹 간격 확보됨 - "
-                                f"현재: {current_gap:.1f}m, 목표: {CUT_IN_EXPAND_GAP:.1f}m"
-                            )
-                        _last_approach_print = now
+                    target = self.rt.profile.cut_in_expand_gap
+                    done = current_gap >= target
+                    events.emit(
+                        "cutin_gap",
+                        f"플래투닝 그룹 간격 {'확보됨' if done else '확장 중'} - "
+                        f"현재: {current_gap:.1f}m, 목표: {target:.1f}m",
+                        key=log_key, every=2.0,
+                        follower=self.follower, gap=round(current_gap, 2), target=target,
+                    )
 
             except traci.exceptions.TraCIException:
                 pass
@@ -374,9 +384,10 @@ class CutInManager:
             
             info = traci.vehicle.getLeader(self.follower, 150.0)
             if front_id == self.car_id:
-                print(
-                    f"[끼어들기 인식 완료] follower={self.follower}가 "
-                    f"{self.car_id}를 앞차로 인식 (gap={gap:.1f}m) → 간격 플래그 해제"
+                self.log(
+                    f"follower={self.follower}가 {self.car_id}를 앞차로 인식 "
+                    f"(gap={gap:.1f}m) → 간격 플래그 해제",
+                    gap=round(gap, 2),
                 )
                 self._clear_cutin_flag()
                 self._recognized_once = True
@@ -387,9 +398,8 @@ class CutInManager:
     def _clear_cutin_flag(self):
         """CUT_IN_ACTIVE_PAIRS 플래그 해제 유틸"""
         try:
-            import simulation.config as cfg
             pair_key = (self.leader, self.follower)
-            if pair_key in cfg.CUT_IN_ACTIVE_PAIRS:
-                del cfg.CUT_IN_ACTIVE_PAIRS[pair_key]
+            if pair_key in self.rt.cut_in_active_pairs:
+                del self.rt.cut_in_active_pairs[pair_key]
         except Exception:
             pass
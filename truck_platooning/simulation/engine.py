@@ -0,0 +1,447 @@
+# simulation/engine.py
+# 시뮬레이션 엔진 (UI 비의존)
+# - SUMO 시작, 주차 대기, 게이트 기반 순차 출발, 스텝별 제어/통계
+# - Tk를 import 하지 않음 → headless 실행/워커 프로세스에서 빠르게 로드
+# - 엔진마다 TraCI 연결(label) + RuntimeState 를 소유 → 한 프로세스에서 여러 시뮬레이션 교대 실행
+import os
+import time
+from simulation import traci_cache
+from simulation.traci_cache import traci
+from simulation import events
+from simulation import metrics
+from simulation import netindex
+from simulation import formation
+import simulation.config as cfg
+from simulation.config import is_platoon_truck
+from simulation import runtime
+from simulation.profile import DEFAULT
+from simulation.runtime import RuntimeState
+from simulation.safety import SafetyMonitor, init_safety_defaults
+from simulation.platoon import (
+    maintain_or_release_lock,
+    boost_followers_once,
+    control_follower_speed,
+    ensure_initial_gap_lock,
+    skip_settled,
+    switch_to_cacc,
+)
+from simulation.maneuvers import (
+    _order_chain,
+    _tick_join_cooldown,
+    _tick_lane_mode_restore,
+    _tick_leave_guard,
+    _tick_merge_coordinator,
+    _tick_pending_merge,
+)
+from simulation.cut_in import CutInManager
+from simulation.candidates import JoinCandidateIndex
+from simulation.brake_controller import BrakeController
+from simulation.analytics import GapAnalytics
+from simulation.stepping import AdaptiveStepper
+from simulation.commands import CommandQueue
+from simulation.lifecycle import VehicleLifecycle
+from simulation.traffic import TrafficGenerator
+
+# ==== 출발 게이트 설정 (pa_0 출구 위치 기준) ====
+# pa_0이 lane="E0_0"에 있다면 EDGE는 "E0" 입니다.
+START_GATE_EDGE = "E0"   # 출발 게이트가 위치한 엣지 ID
+MANEUVER_TICK_S = 0.5     # 보조 스케줄러(예약 합류/차선 모드 복구/쿨다운/이탈 가드) 주기 [sim s]
+PA0_END_POS     = 30
+START_SPACING   = 3.0   # 앞차가 게이트 통과 후 최소 이 거리(m) 이상 벌어졌을 때 다음 차 출발
+
+# ======= 메트릭 수집 (스크레이프 시점에만 호출) =======
+def _state_samples():
+    rt = runtime.current()
+    yield ("platoon_followers", "gauge", {}, len(rt.followers))
+    yield ("cutin_active_pairs", "gauge", {}, len(rt.cut_in_active_pairs))
+    yield ("guards_active", "gauge", {"guard": "join_cooldown"}, len(rt.join_cooldown))
+    yield ("guards_active", "gauge", {"guard": "leave_guard"}, len(rt.leave_guard))
+    yield ("guards_active", "gauge", {"guard": "merge_coordinator"}, len(rt.merge_coordinator))
+    yield ("guards_active", "gauge", {"guard": "merge_yield"}, len(rt.yielding_for_merge))
+    yield ("v2v_messages", "counter", {"result": "sent"}, rt.v2v.sent)
+    yield ("v2v_messages", "counter", {"result": "dropped"}, rt.v2v.dropped)
+
+# ======= 도로망 인덱스 (sumocfg 경로별 프로세스 내 1회 로드) =======
+_nets = {}
+
+def load_net(sumocfg):
+    net = _nets.get(sumocfg)
+    if net is None:
+        net, cached, ms = netindex.load(sumocfg)
+        _nets[sumocfg] = net
+        events.emit("netindex", f"도로망 인덱스 로드 {ms:.1f} ms ({'캐시' if cached else '파싱'})",
+                    edges=len(net.edges), routes=len(net.routes), cached=cached)
+    return net
+
+# ======= SUMO 시작 + 기본값 =======
+_metrics_on = False
+
+def start_sumo(profile=DEFAULT, label=None):
+    """SUMO 1개 시작 → 그 연결의 CachedTraci (활성화된 상태로 반환).
+    label 없으면 기본 연결(GUI 실행), 있으면 traci.start(..., label=label) 연결"""
+    global _metrics_on
+    events.configure(path=cfg.EVENT_LOG_PATH)
+    net = load_net(profile.sumo_cfg)
+    if label is None:
+        # 공용 인덱스도 사본으로: 런타임에 추가되는 경로(r_cut_… 등)가 _nets 캐시에 남으면
+        # 다음 SUMO 에서 _ensure_dynamic_route 가 경로 추가를 건너뜀
+        netindex.set_index(net.fork())
+        traci_cache.default.start(profile.sumo_args())
+        conn = traci_cache.activate(traci_cache.default)
+    else:
+        conn = traci_cache.activate(traci_cache.open_connection(profile.sumo_args(), label))
+    events.emit("profile", f"프로파일 '{profile.name}' ({profile.digest()})",
+                name=profile.name, digest=profile.digest(), label=label)
+    init_safety_defaults()
+    if cfg.METRICS_PORT is not None and not _metrics_on:
+        _metrics_on = True
+        metrics.add_collector(traci.metric_samples)
+        metrics.add_collector(_state_samples)
+        port = metrics.serve(cfg.METRICS_PORT)
+        events.emit("metrics", f"http://127.0.0.1:{port}/metrics", port=port)
+    return conn
+
+# ======= 모든 차량이 주차될 때까지 대기 =======
+# ======= 모든 플래투닝 트럭이 각자 주차장에 들어와야 UI 표시 =======
+def wait_until_all_parked(traci_mod, timeout=180.0):
+    """
+    시뮬레이터에 등장한 '플래투닝 트럭(Veh..)'들만
+    모두 정차(주차) 상태가 될 때까지 대기.
+    일반 차량은 무시.
+    """
+    t0 = time.time()
+    while time.time() - t0 < timeout:
+        traci_mod.simulationStep()
+
+        # 플래투닝 트럭만 필터링
+        ids = [
+            vid for vid in traci_mod.vehicle.getIDList()
+            if is_platoon_truck(vid)
+        ]
+
+        if ids and all(traci_mod.vehicle.isStopped(vid) for vid in ids):
+            events.emit("parking", "모든 플래투닝 트럭 주차 완료.", ok=True, trucks=len(ids))
+            return True
+
+    events.emit("parking", "일부 플래투닝 트럭이 여전히 이동 중입니다. (timeout)", ok=False)
+    return False
+
+
+def default_chain(traci_mod):
+    """headless 실행용 체인: pa_0 에 주차된 플래투닝 트럭 순서 그대로"""
+    try:
+        ids = [v for v in traci_mod.parkingarea.getVehicleIDs("pa_0") if is_platoon_truck(v)]
+    except traci_mod.exceptions.TraCIException:
+        ids = []
+    return ids or sorted(v for v in traci_mod.vehicle.getIDList() if is_platoon_truck(v))
+
+
+class PlatoonEngine:
+    """선택된 체인 하나를 출발시키고 매 스텝 제어하는 엔진 (UI 없이 step()만 반복 호출하면 됨)
+    엔진마다 TraCI 연결 + RuntimeState 를 가지므로 여러 개를 한 프로세스에서 번갈아 step() 가능"""
+
+    def __init__(self, traci_mod, chain, profile=DEFAULT, state=None, label="default"):
+        self.traci = traci_mod
+        self.chain = list(chain)
+        self.label = label
+        self.profile = profile                              # 불변 설정
+        if state is None:
+            # 기본 연결은 공용 인덱스, label 연결은 도로망 공유 + 경로 등록만 분리한 사본
+            net = None if label == "default" else load_net(profile.sumo_cfg).fork()
+            state = RuntimeState(profile, label, net)
+        self.state = state                                  # 이 엔진의 런타임 상태
+        self.steps = 0
+        self.activate()
+
+        # 편성 계획이 있으면 sim time 스케줄로 출발, 없으면 “게이트 + 간격” 조건으로 순차 출발
+        self.plan = None              # formation.FormationPlan
+        self.schedule = None          # [(출발 sim time, vid), ...] 시간순
+        self.release_index = 0        # 게이트 방식: chain[release_index]가 다음 출발 대상 / 스케줄 방식: 다음 항목
+        self.released = []            # 이미 출발한 차량 목록
+        self.gate_cross_dist = {}     # {vid: gate 통과 직후의 누적 거리}
+
+        self.cutin = CutInManager(self.state)              # 끼어들기 상태머신
+        self.candidates = JoinCandidateIndex(self.state)   # 비플래투닝 트럭 참여 후보
+        self.brakes = BrakeController(traci_mod, sim_dt=profile.step_length,
+                                      channel=self.state.brake_channel)  # 리더 제동 (UI 버튼/스크립트)
+        self.gap_stats = GapAnalytics(profile=profile)     # 쌍별 간격/열 안정성 통계
+        self.stepper = AdaptiveStepper(profile)            # 정상 상태 큰 스텝 / 이벤트 근처 미세 스텝
+        self._next_target = None                           # 다음 simulationStep 목표 시각 (None이면 1 미세 스텝)
+        self.chain_now = list(self.chain)                  # 이번 스텝 체인 순서
+        self._maneuver_due = 0.0                           # 다음 보조 스케줄러 실행 sim 시각
+        self.commands = CommandQueue()                     # 다른 스레드(웹 대시보드)에서 온 명령
+        self.safety = self._safety_monitor(profile)        # 전체 차량 TTC/헤드웨이/DRAC (None이면 끔)
+        self.lifecycle = self._lifecycle()                 # 출발/도착 추적 → 도착 차량 상태 정리
+        self.traffic = TrafficGenerator.from_profile(profile, netindex.get_index())  # 배경 교통 (None이면 끔)
+        self.sim_t = 0.0
+        self.finished = False
+
+    @staticmethod
+    def _safety_monitor(profile):
+        if not profile.safety_monitor:
+            return None
+        try:
+            return SafetyMonitor()
+        except ImportError as e:
+            events.emit("warn", f"안전 모니터 비활성 (NumPy 필요): {e}")
+            return None
+
+    def _lifecycle(self):
+        """도착 차량의 차량별 상태를 정리할 곳 등록"""
+        lc = VehicleLifecycle()
+        lc.on_arrival(self.state.forget)
+        lc.on_arrival(self.candidates.forget)
+        lc.on_arrival(lambda vids: netindex.get_index().forget_vehicles(vids))
+        if self.safety is not None:
+            lc.on_arrival(self.safety.forget)
+        lc.on_arrival(events.forget)
+        lc.on_arrival(metrics.forget)
+        return lc
+
+    @classmethod
+    def launch(cls, profile=DEFAULT, label="run0", chain=None, park_timeout=180.0):
+        """headless 실행: label 연결로 SUMO 시작 → 주차 대기 → 체인 구성까지"""
+        conn = start_sumo(profile, label)
+        wait_until_all_parked(conn, timeout=park_timeout)
+        engine = cls(conn, chain or default_chain(conn), profile, label=label)
+        engine.setup()
+        return engine
+
+    def activate(self):
+        """이 엔진의 연결/상태를 모듈 공용 traci, runtime.current() 로 지정"""
+        runtime.activate(self.state)
+        traci_cache.activate(self.traci)
+
+    # -------- 체인 구성 --------
+    def setup(self):
+        self.activate()
+        chain = self.chain
+        # FOLLOW_PAIRS 구성 (선택 차량만)
+        pairs = [(chain[i], chain[i - 1]) for i in range(1, len(chain))]  # (follower, leader)
+        self.state.set_pairs(pairs)
+        events.emit("pairs", f"FOLLOW_PAIRS: {pairs}", pairs=pairs)
+
+        self.brakes.set_leader(chain[0])
+        try:
+            self.traci.vehicle.setType(chain[0], "truckBASIC")
+        except self.traci.exceptions.TraCIException:
+            pass
+
+        # 팔로워는 CACC 타입으로 전환
+        for f, _ in self.state.follow_pairs:
+            switch_to_cacc(f)
+
+        # 주차장별 출발 시각을 미리 계산 (합류 지점에 체인 순서대로 도착)
+        self.plan = formation.plan_for(self.traci, chain, self.profile, self.state.net)
+        if self.plan is not None:
+            t0 = self.traci.simulation.getTime()
+            self.schedule = self.plan.schedule(t0)
+            events.emit("formation",
+                        f"편성 계획: 합류 {self.plan.merge_edge}, 예상 {self.plan.formation_time:.1f}s",
+                        merge_edge=self.plan.merge_edge, formation_s=round(self.plan.formation_time, 2),
+                        releases={s.vid: round(s.release_t, 2) for s in self.plan.slots},
+                        parking={s.vid: s.parking for s in self.plan.slots})
+        else:
+            events.emit("formation", "편성 계획 불가 → 게이트 방식으로 순차 출발")
+
+    # -------- 순차 출발 --------
+    def ready_to_release_next(self):
+        """다음 차량을 출발시켜도 되는지 판단."""
+        # 리더는 바로 출발
+        if self.release_index == 0:
+            return True
+
+        # 앞차 조건 확인
+        prev_id = self.chain[self.release_index - 1]
+        try:
+            road = self.traci.vehicle.getRoadID(prev_id)
+            lane_pos = self.traci.vehicle.getLanePosition(prev_id)
+
+            # (1) 게이트 통과 여부: 아직 pa_0 출구 이전이면 대기
+            if road == START_GATE_EDGE and lane_pos < PA0_END_POS:
+                return False
+
+            # (2) 게이트 통과 순간의 누적거리(distance)를 기준점으로 기록
+            if prev_id not in self.gate_cross_dist:
+                self.gate_cross_dist[prev_id] = self.traci.vehicle.getDistance(prev_id)
+
+            # (3) 간격 조건: 게이트 통과 기준점 대비 START_SPACING 이상 이동했는가
+            d_from_gate = self.traci.vehicle.getDistance(prev_id) - self.gate_cross_dist[prev_id]
+            return d_from_gate >= START_SPACING
+
+        except self.traci.exceptions.TraCIException:
+            return False
+
+    def _resume(self, vid):
+        """주차 중이면 출발 + 팔로워 초기 락. TraCI 오류면 False (다음 스텝 재시도)"""
+        try:
+            if self.traci.vehicle.isStopped(vid):
+                self.traci.vehicle.resume(vid)
+                events.emit("release", f"{vid} 출발", vid=vid, index=self.chain.index(vid))
+                self.released.append(vid)
+
+                # 팔로워 출발 직후 초기 락
+                for f, l in self.state.follow_pairs:
+                    if vid == f:
+                        ensure_initial_gap_lock(f, l)
+        except self.traci.exceptions.TraCIException:
+            return False
+        return True
+
+    def _release_next(self):
+        if self._resume(self.chain[self.release_index]):
+            self.release_index += 1
+
+    def _release_due(self, sim_t):
+        """스케줄 시각이 된 차량 모두 출발 (스텝당 비교 1회)"""
+        schedule = self.schedule
+        while self.release_index < len(schedule) and schedule[self.release_index][0] <= sim_t + 1e-9:
+            if not self._resume(schedule[self.release_index][1]):
+                break
+            self.release_index += 1
+
+    # -------- 메인 스텝 --------
+    def step(self):
+        """시뮬레이션 1스텝 + 제어. 계속 진행하면 True, 종료면 False"""
+        if self.finished:
+            return False
+        t_wall = time.perf_counter()
+        traci_mod = self.traci
+        self.activate()
+        multi_step = self._next_target is not None
+        try:
+            # 정상 상태면 목표 시각까지 여러 미세 스텝을 한 번에 (SUMO 적분 스텝은 그대로)
+            if not multi_step:
+                traci_mod.simulationStep()
+            else:
+                traci_mod.simulationStep(self._next_target)
+        except traci_mod.exceptions.TraCIException:
+            self.finished = True
+            return False
+        self.steps += 1
+        prev_t = self.sim_t
+        sim_t = self.sim_t = traci_mod.simulation.getTime()
+        # 제어기는 실제 진행한 시간 간격 사용
+        self.state.dt = sim_t - prev_t if self.steps > 1 and sim_t > prev_t else self.profile.step_length
+        events.set_sim_time(sim_t)
+        metrics.inc("sim_steps")
+        metrics.set_gauge("sim_time_seconds", sim_t)
+
+        # 출발/도착 반영 (도착 차량의 상태 정리 — 이후 제어 단계는 남은 차량만 봄)
+        self.lifecycle.step(traci_mod, multi_step)
+
+        # 배경 교통 삽입 (batch 간격마다)
+        if self.traffic is not None:
+            self.traffic.step(traci_mod, sim_t)
+
+        # 외부 명령(참여/이탈/제동/끼어들기)은 체인 정렬 전에 반영
+        self.commands.drain(self)
+
+        # --- 동적으로 플래투닝 체인 업데이트 ---
+        current_chain = self.chain_now = _order_chain(self.state.follow_pairs)
+
+        # --- 출발: 편성 스케줄 시각 도달 / (계획 불가 시) 게이트 조건 충족 ---
+        if self.schedule is not None:
+            self._release_due(sim_t)
+        elif self.release_index < len(self.chain) and self.ready_to_release_next():
+            self._release_next()
+
+        # 체인 멤버 V2V 송수신 (제어기는 이 스텝에 도착한 메시지 사용)
+        self.state.v2v.step(traci_mod, current_chain, sim_t)
+
+        # 제동 명령을 먼저 게시 → 같은 스텝의 팔로워 제어가 feed-forward 로 반영
+        brake_channel = self.state.brake_channel
+        brake_channel.set_chain(current_chain)
+        self.brakes.update()
+
+        # 제어 로직
+        boost_followers_once()
+        for f, l in self.state.follow_pairs:
+            if skip_settled(f, l):
+                continue                          # 정상 상태 쌍: 이전 setSpeed 유지
+            maintain_or_release_lock(f, l)
+            control_follower_speed(f, l)
+        metrics.set_gauge("settled_pairs", len(self.state.settled))
+
+        # 대기 중인 합류 일괄 처리 (제어 명령 뒤에 적용 → 양보/합류 속도가 우선)
+        _tick_merge_coordinator(traci_mod)
+
+        # 보조 스케줄러: sim 시간 기준 MANEUVER_TICK_S 마다 (GUI 유무와 무관하게 같은 주기)
+        if sim_t >= self._maneuver_due:
+            self._maneuver_due = sim_t + MANEUVER_TICK_S
+            _tick_pending_merge(traci_mod)
+            _tick_lane_mode_restore(traci_mod)
+            _tick_join_cooldown(traci_mod)
+            _tick_leave_guard(traci_mod)
+
+        # 체인 위치별 제동 반응 지연 측정
+        brake_channel.observe(traci_mod, sim_t)
+
+        # 끼어들기 상태머신 진행
+        self.cutin.tick()
+
+        # 전체 차량 근접 위험(TTC/헤드웨이/DRAC) + 충돌
+        if self.safety is not None:
+            self.safety.step(traci_mod, sim_t, self.state.dt, current_chain)
+            metrics.set_gauge("safety_pairs", self.safety.last_pairs)
+
+        # 쌍별 간격 통계 갱신
+        self.gap_stats.step(traci_mod, self.state.follow_pairs, sim_t)
+
+        # 비플래투닝 트럭의 참여 후보 (경로 기준 거리 + 리더 목적지 겹침)
+        try:
+            self.candidates.update(traci_mod, current_chain)
+        except traci_mod.exceptions.TraCIException:
+            pass
+
+        # --- 종료 조건 ---
+        if traci_mod.simulation.getMinExpectedNumber() <= 0:
+            self.finished = True
+            return False
+
+        # 다음 스텝 크기 결정 (이벤트 근처면 미세 스텝)
+        self._next_target = self.stepper.next_target(self)
+
+        metrics.set_gauge("step_duration_seconds", time.perf_counter() - t_wall)
+        return True
+
+    # -------- 종료 --------
+    def export_gap_stats(self):
+        if not cfg.ANALYTICS_PATH or not self.gap_stats.pairs:
+            return
+        path = cfg.ANALYTICS_PATH
+        if self.label != "default":
+            # label 실행끼리 덮어쓰지 않도록 파일명에 label
+            root, ext = os.path.splitext(path)
+            path = f"{root}.{self.label}{ext}"
+        try:
+            path = self.gap_stats.export(path, meta={"chain": self.chain, "sim_t": self.sim_t, "label": self.label,
+                                                     "profile": self.profile.name, "profile_digest": self.profile.digest()})
+            events.emit("analytics", f"간격 통계 저장: {path}", path=path, **self.gap_stats.summary())
+        except OSError as e:
+            events.emit("warn", f"간격 통계 저장 실패: {e}")
+
+    def result(self):
+        """배치 실행 결과 요약 1행"""
+        out = {"label": self.label, "profile": self.profile.name, "profile_digest": self.profile.digest(),
+               "steps": self.steps, "sim_t": self.sim_t, "summary": self.gap_stats.summary()}
+        if self.stepper.enabled:
+            out["stepping"] = self.stepper.summary()
+        if self.safety is not None:
+            out["safety"] = self.safety.summary()
+        out["vehicles"] = self.lifecycle.summary()
+        if self.traffic is not None:
+            out["traffic"] = self.traffic.summary()
+        return out
+
+    def finish(self, wait=True, close_events=True):
+        self.activate()
+        self.finished = True
+        events.emit("cache", self.traci.report(), label=self.label)
+        self.export_gap_stats()
+        try:
+            self.traci.close(wait)
+        except Exception:
+            pass
+        if close_events:
+            events.close()
@@ -0,0 +1,156 @@
+# simulation/events.py
+# 구조화(JSON) 이벤트 로거
+# - 제어 루프는 큐에 넣기(enqueue)만 하고, 콘솔 출력/파일 기록은 백그라운드 스레드가 담당
+# - key + every(초)로 키별 레이트 리밋 → 매 스텝 호출되는 경로 보호
+import atexit
+import json
+import queue
+import sys
+import threading
+import time
+
+_STOP = object()
+
+
+class EventLogger:
+    def __init__(self, path=None, echo=True, maxsize=10000):
+        self.path = path          # JSON Lines 파일 경로 (None이면 기록 안 함)
+        self.echo = echo          # 콘솔에 한 줄 요약 출력
+        self.sim_time = None      # 메인 루프가 매 스텝 갱신 → 이벤트에 sim_t로 찍힘
+        self.dropped = 0          # 큐가 가득 차서 버린 이벤트 수
+        self._q = queue.Queue(maxsize=maxsize)
+        self._last = {}           # key -> 마지막 기록 시각(monotonic)
+        self._suppressed = {}     # key -> 레이트 리밋으로 생략된 횟수
+        self._thread = None
+        self._lock = threading.Lock()
+
+    # -------- 제어 루프 쪽 API (enqueue만) --------
+    def emit(self, kind, msg=None, key=None, every=0.0, **fields):
+        """이벤트 1건 enqueue. 레이트 리밋/큐 포화로 버려지면 False"""
+        if key is not None and every > 0.0:
+            if not self.should_emit(key, every):
+                return False
+            self._last[key] = time.monotonic()
+            skipped = self._suppressed.pop(key, 0)
+            if skipped:
+                fields["suppressed"] = skipped
+
+        ev = {"ts": round(time.time(), 3), "sim_t": self.sim_time, "kind": kind}
+        if msg is not None:
+            ev["msg"] = msg
+        ev.update(fields)
+
+        try:
+            self._q.put_nowait(ev)
+        except queue.Full:
+            self.dropped += 1
+            return False
+
+        if self._thread is None:
+            self._start()
+        return True
+
+    def should_emit(self, key, every):
+        """key 가 레이트 리밋에 걸리지 않았으면 True. 걸렸으면 생략 횟수만 세고 False
+        - 메시지 포맷 비용이 큰 호출 지점에서 emit 전에 먼저 확인하는 용도"""
+        last = self._last.get(key)
+        if last is not None and time.monotonic() - last < every:
+            self._suppressed[key] = self._suppressed.get(key, 0) + 1
+            return False
+        return True
+
+    def forget(self, ids):
+        """"종류:ID" 형식 레이트 리밋 키 중 ID 가 ids 에 속하는 것 제거 (도착 차량)"""
+        for d in (self._last, self._suppressed):
+            for key in [k for k in d if isinstance(k, str) and k.partition(":")[2] in ids]:
+                d.pop(key, None)
+
+    # -------- 백그라운드 writer --------
+    def _start(self):
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(target=self._run, name="event-writer", daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        fh = open(self.path, "a", encoding="utf-8") if self.path else None
+        try:
+            while True:
+                batch = [self._q.get()]
+                # 쌓여 있는 이벤트는 한 번에 처리
+                while len(batch) < 256:
+                    try:
+                        batch.append(self._q.get_nowait())
+                    except queue.Empty:
+                        break
+
+                stop = False
+                for ev in batch:
+                    if ev is _STOP:
+                        stop = True
+                        continue
+                    if fh:
+                        fh.write(json.dumps(ev, ensure_ascii=False, default=str) + "\n")
+                    if self.echo:
+                        print(self._format(ev), file=sys.stdout)
+                if fh:
+                    fh.flush()
+                if stop:
+                    return
+        finally:
+            if fh:
+                fh.close()
+
+    @staticmethod
+    def _format(ev):
+        tag = ev["kind"].upper()
+        if "msg" in ev:
+            text = ev["msg"]
+        else:
+            text = " ".join(f"{k}={v}" for k, v in ev.items() if k not in ("ts", "sim_t", "kind"))
+        if ev.get("suppressed"):
+            text += f" (+{ev['suppressed']}건 생략)"
+        return f"[{tag}] {text}"
+
+    def close(self, timeout=2.0):
+        """남은 이벤트를 모두 기록하고 writer 종료"""
+        if self._thread is None:
+            return
+        try:
+            self._q.put(_STOP, timeout=timeout)
+        except queue.Full:
+            pass
+        self._thread.join(timeout)
+        self._thread = None
+
+
+# ===== 기본 로거 =====
+logger = EventLogger()
+atexit.register(logger.close)
+
+
+def configure(path=None, echo=True):
+    """기본 로거 출력 설정 (첫 이벤트 전에 호출)"""
+    logger.path = path
+    logger.echo = echo
+
+
+def set_sim_time(t):
+    logger.sim_time = t
+
+
+def emit(kind, msg=None, key=None, every=0.0, **fields):
+    return logger.emit(kind, msg, key=key, every=every, **fields)
+
+
+def should_emit(key, every):
+    return logger.should_emit(key, every)
+
+
+def forget(ids):
+    logger.forget(ids)
+
+
+def close():
+    logger.close()
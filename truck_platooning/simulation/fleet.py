@@ -0,0 +1,59 @@
+# simulation/fleet.py
+# 트럭 1대 요약 (역할/속도/간격/상태) — Tk 비의존
+# - Fleet 표(fleet_ui)와 웹 대시보드(webdash)가 같은 판정 사용
+from simulation.config import is_platoon_truck
+
+LOOKAHEAD = 250.0
+
+
+def fleet_order(ids, chain):
+    """체인 순서(리더 → 팔로워) 다음 나머지 플래투닝 트럭(ID 순) → (순서, 체인 멤버 수)"""
+    trucks = [v for v in ids if is_platoon_truck(v)]
+    present = set(trucks)
+    in_chain = set(chain)
+    head = [v for v in chain if v in present]
+    return head + sorted(v for v in trucks if v not in in_chain), len(head)
+
+
+def vehicle_status(traci_mod, rt, vid, leader_of, leader_id):
+    """(role, speed[m/s], gap[m] or None, 바로 앞이 체인 앞차인지, state) — 차량이 없으면 None"""
+    veh = traci_mod.vehicle
+    try:
+        parked = veh.isStopped(vid)
+        speed = veh.getSpeed(vid)
+    except traci_mod.exceptions.TraCIException:
+        return None
+    if parked:
+        role = "parked"
+    elif vid == leader_id:
+        role = "leader"
+    elif vid in leader_of:
+        role = "follower"
+    else:
+        role = "free"
+
+    gap, direct = None, True
+    front = leader_of.get(vid)
+    if front is not None and not parked:
+        try:
+            info = veh.getLeader(vid, LOOKAHEAD)
+            if info:
+                gap = info[1]
+                direct = info[0] == front      # False: 끼어든 차량 등 체인 밖 차량이 앞에 있음
+        except traci_mod.exceptions.TraCIException:
+            pass
+
+    st = "cruise"
+    if parked:
+        st = "parked"
+    elif front is not None and rt.cut_in_active_pairs.get((front, vid)):
+        st = "cut-in"
+    elif vid in rt.merge_coordinator or vid in rt.pending_merge:
+        st = "merge"
+    elif vid in rt.leave_guard or any(d == vid for _, d in rt.leave_guard.values()):
+        st = "leave"
+    elif rt.brake_channel.active and rt.brake_channel.source == vid:
+        st = "brake"
+    elif vid in rt.yielding_for_merge:
+        st = "yield"
+    return role, speed, gap, direct, st
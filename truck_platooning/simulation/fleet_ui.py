@@ -0,0 +1,142 @@
+# simulation/fleet_ui.py
+# 대규모 차량용 Fleet 대시보드 (캔버스 1개 + 가상화 표)
+# - 차량마다 위젯/계기판을 만들지 않고, 화면에 보이는 행 수만큼의 캔버스 아이템 풀을 재사용
+# - 매 프레임 보이는 행만 TraCI 조회(속도/간격) + 텍스트가 바뀐 아이템만 itemconfig
+#   → 트럭이 수백 대여도 대시보드 비용은 보이는 행 수에 비례 (전체 수와 무관)
+# - 행 순서: 현재 체인 순서(리더 → 팔로워) 다음 나머지 트럭(ID 순)
+import tkinter as tk
+
+from simulation.fleet import fleet_order, vehicle_status
+
+ROW_H = 18
+HEADER_H = 22
+COLUMNS = (            # (제목, x 위치)
+    ("#", 6),
+    ("ID", 40),
+    ("역할", 120),
+    ("속도 km/h", 200),
+    ("간격 m", 290),
+    ("상태", 370),
+)
+WIDTH = 480
+ROLE_COLORS = {"leader": "#ff3b30", "follower": "#1f6fd1", "free": "#555555", "parked": "#999999"}
+STATE_COLORS = {"cut-in": "#d35400", "merge": "#8e44ad", "leave": "#8e44ad", "brake": "#c0392b"}
+
+
+class FleetView(tk.Frame):
+    def __init__(self, parent, traci_mod, state, height_rows=16):
+        super().__init__(parent)
+        self.traci = traci_mod
+        self.rt = state
+        self.title_var = tk.StringVar(value="Fleet")
+        tk.Label(self, textvariable=self.title_var, font=("Arial", 10, "bold")).pack(side="top", anchor="w")
+        self.canvas = tk.Canvas(self, width=WIDTH, height=HEADER_H + ROW_H * height_rows,
+                                bg="white", highlightthickness=0)
+        self.scroll = tk.Scrollbar(self, orient="vertical", command=self._on_scrollbar)
+        self.canvas.pack(side="left", fill="both", expand=True)
+        self.scroll.pack(side="right", fill="y")
+
+        self.top = 0                  # 첫 번째로 보이는 행 인덱스
+        self.order = []               # 전체 행 순서 (vid 목록)
+        self._src_ids = None          # 마지막으로 본 getIDList 결과 (같으면 필터 생략)
+        self._chain_key = None
+        self.n_chain = 0
+        self._pool = []               # [(bg_rect, [text item...], [마지막 텍스트...]), ...]
+
+        for title, x in COLUMNS:
+            self.canvas.create_text(x, HEADER_H // 2, text=title, anchor="w", font=("Arial", 9, "bold"))
+        self.canvas.create_line(0, HEADER_H - 1, WIDTH, HEADER_H - 1, fill="#cccccc")
+
+        self.canvas.bind("<Configure>", lambda e: self._resize_pool(e.height))
+        self.canvas.bind("<MouseWheel>", self._on_wheel)
+        self.canvas.bind("<Button-4>", lambda e: self._scroll_rows(-3))
+        self.canvas.bind("<Button-5>", lambda e: self._scroll_rows(3))
+        self._resize_pool(HEADER_H + ROW_H * height_rows)
+
+    # -------- 아이템 풀 (보이는 행 수만큼) --------
+    def _resize_pool(self, height):
+        n = max(1, (int(height) - HEADER_H) // ROW_H)
+        while len(self._pool) < n:
+            y = HEADER_H + len(self._pool) * ROW_H
+            bg = self.canvas.create_rectangle(0, y, WIDTH, y + ROW_H, width=0,
+                                              fill="#f4f6f8" if len(self._pool) % 2 else "white")
+            texts = [self.canvas.create_text(x, y + ROW_H // 2, text="", anchor="w", font=("Consolas", 9))
+                     for _, x in COLUMNS]
+            self._pool.append((bg, texts, [""] * len(COLUMNS)))
+        while len(self._pool) > n:
+            bg, texts, _ = self._pool.pop()
+            self.canvas.delete(bg, *texts)
+
+    # -------- 스크롤 --------
+    def _visible(self):
+        return len(self._pool)
+
+    def _clamp_top(self):
+        self.top = max(0, min(self.top, len(self.order) - self._visible()))
+
+    def _update_scrollbar(self):
+        total = max(1, len(self.order))
+        self.scroll.set(self.top / total, min(1.0, (self.top + self._visible()) / total))
+
+    def _scroll_rows(self, d):
+        self.top += d
+        self._clamp_top()
+        self._update_scrollbar()
+
+    def _on_wheel(self, event):
+        self._scroll_rows(-3 if event.delta > 0 else 3)
+
+    def _on_scrollbar(self, *args):
+        if args[0] == "moveto":
+            self.top = int(float(args[1]) * len(self.order))
+        elif args[0] == "scroll":
+            step = self._visible() if args[2] == "pages" else 1
+            self.top += int(args[1]) * step
+        self._clamp_top()
+        self._update_scrollbar()
+
+    # -------- 데이터 --------
+    def _refresh_order(self, chain):
+        """전체 트럭 목록/순서 (차량 목록이나 체인이 바뀐 프레임에만 재계산)"""
+        ids = self.traci.vehicle.getIDList()
+        key = tuple(chain)
+        if ids == self._src_ids and key == self._chain_key:
+            return
+        self._src_ids = ids
+        self._chain_key = key
+        self.order, self.n_chain = fleet_order(ids, chain)
+        self._clamp_top()
+
+    def _row(self, i, vid, leader_of, leader_id):
+        """보이는 행 1개 텍스트 (이 행만 TraCI 조회)"""
+        status = vehicle_status(self.traci, self.rt, vid, leader_of, leader_id)
+        if status is None:
+            return (str(i + 1), vid, "—", "—", "—", "gone"), "free", None
+        role, speed, gap, direct, st = status
+        gap_txt = "—" if gap is None else (f"{gap:.1f}" if direct else f"{gap:.1f}*")  # *: 바로 앞이 체인 앞차 아님
+        return (str(i + 1), vid, role, f"{speed * 3.6:6.1f}", gap_txt, st), role, st
+
+    def refresh(self, chain):
+        """프레임마다 1번: 보이는 행만 갱신"""
+        self._refresh_order(chain)
+        leader_of = dict(self.rt.follow_pairs)
+        leader_id = chain[0] if chain else None
+        canvas = self.canvas
+        for k, (bg, texts, last) in enumerate(self._pool):
+            i = self.top + k
+            if i < len(self.order):
+                cells, role, st = self._row(i, self.order[i], leader_of, leader_id)
+            else:
+                cells, role, st = ("",) * len(COLUMNS), None, None
+            for c, (item, text) in enumerate(zip(texts, cells)):
+                if last[c] != text:
+                    last[c] = text
+                    fill = "black"
+                    if c == 2 and role:
+                        fill = ROLE_COLORS.get(role, "black")
+                    elif c == 5 and st:
+                        fill = STATE_COLORS.get(st, "black")
+                    canvas.itemconfig(item, text=text, fill=fill)
+        self.title_var.set(f"Fleet: 트럭 {len(self.order)}대 (체인 {self.n_chain}대) · "
+                           f"{self.top + 1}–{min(len(self.order), self.top + self._visible())} 표시")
+        self._update_scrollbar()
@@ -0,0 +1,139 @@
+# simulation/formation.py
+# 출발 편성 계획 (formation planner)
+# - 여러 주차장(pa_0, pa_1, pa_2)에서 출발하는 트럭들이 체인 순서대로 합류 지점에 도착하도록
+#   출발 시각을 미리 계산 (경로 누적 오프셋 + 가속→순항 주행 시간 모델)
+# - 엔진은 매 스텝 sim time 과 스케줄만 비교 → 앞차 위치 폴링(getRoadID/getLanePosition/getDistance) 불필요
+import math
+
+from simulation.netindex import get_index
+
+EXIT_CLEARANCE = 3.0      # 같은 주차장: 앞차가 차량 길이 + 이만큼 빠져나간 뒤 다음 차 출발 [m]
+DEFAULT_ACCEL = 1.5       # vType 정보가 없을 때 [m/s²]
+DEFAULT_MAX_SPEED = 18.0  # [m/s]
+
+
+def travel_time(d, v, a):
+    """정지 상태에서 가속도 a 로 순항속도 v 까지 올린 뒤 d[m] 이동하는 데 걸리는 시간"""
+    if d <= 0.0:
+        return 0.0
+    d_acc = v * v / (2.0 * a)
+    if d <= d_acc:
+        return math.sqrt(2.0 * d / a)
+    return v / a + (d - d_acc) / v
+
+
+class Slot:
+    """트럭 1대의 편성 정보"""
+    __slots__ = ("vid", "parking", "dist", "speed", "accel", "length", "travel", "release_t", "arrive_t")
+
+    def __init__(self, vid, parking, dist, speed, accel, length):
+        self.vid = vid
+        self.parking = parking    # 출발 주차장 ID
+        self.dist = dist          # 주차장 출구 → 합류 엣지 시작까지 경로 거리 [m]
+        self.speed = speed        # 예상 순항 속도 [m/s]
+        self.accel = accel
+        self.length = length
+        self.travel = travel_time(dist, speed, accel)
+        self.release_t = 0.0      # 계획 시작 기준 출발 시각 [s]
+        self.arrive_t = 0.0       # 합류 엣지 도착 예상 시각 [s]
+
+
+class FormationPlan:
+    def __init__(self, merge_edge, slots, headway):
+        self.merge_edge = merge_edge
+        self.slots = slots        # 체인 순서
+        self.headway = headway    # 합류 지점 도착 간격 [s]
+
+    @property
+    def formation_time(self):
+        """마지막 트럭이 합류 지점에 도착할 때까지 걸리는 예상 시간"""
+        return max((s.arrive_t for s in self.slots), default=0.0)
+
+    def schedule(self, t0=0.0):
+        """[(절대 출발 시각, vid), ...] 시간순"""
+        return sorted((t0 + s.release_t, s.vid) for s in self.slots)
+
+
+def merge_edge_of(routes):
+    """모든 경로가 처음으로 공유하는 엣지 (첫 경로 순서 기준). 없으면 None"""
+    if not routes:
+        return None
+    rest = [set(r) for r in routes[1:]]
+    for eid in routes[0]:
+        if all(eid in r for r in rest):
+            return eid
+    return None
+
+
+def plan(chain, parking_of, routes, net, standstill_gap, time_headway, exit_clearance=EXIT_CLEARANCE):
+    """체인 순서대로 합류 엣지에 도착하도록 출발 시각 계산.
+    parking_of: {vid: pa_id}, routes: {vid: [edges]}. 계획할 수 없으면 None"""
+    if not chain or any(v not in parking_of or v not in routes for v in chain):
+        return None
+    merge = merge_edge_of([routes[v] for v in chain])
+    if merge is None:
+        return None
+
+    slots = []
+    for vid in chain:
+        lane, _, exit_pos = net.parking_areas[parking_of[vid]]
+        route = routes[vid]
+        start_edge = net.lane_edge(lane)
+        offs = net.route_offsets(route)
+        if start_edge not in offs or offs[start_edge] > offs[merge]:
+            return None
+        dist = offs[merge] - (offs[start_edge] + exit_pos)
+
+        vt = net.vtypes.get(net.vehicle_types.get(vid), {})
+        path = route[route.index(start_edge):route.index(merge)] or [start_edge]
+        v_lim = min(net.edge_speed(e) for e in path)
+        speed = min(vt.get("max_speed", DEFAULT_MAX_SPEED), v_lim)
+        slots.append(Slot(vid, parking_of[vid], dist, speed, vt.get("accel", DEFAULT_ACCEL), vt.get("length", 12.0)))
+
+    # 합류 지점 도착 간격: 앞차 길이 + CACC 목표 간격(정지 간격 + 시간 헤드웨이 × 속도)
+    v_merge = min(s.speed for s in slots)
+    length = max(s.length for s in slots)
+    headway = (length + standstill_gap + time_headway * v_merge) / v_merge
+
+    # 1) 이상적인 도착 시각: 첫 차 T0 부터 headway 간격, 모든 출발 시각 >= 0 이 되도록 T0 선택
+    t0 = max(s.travel - k * headway for k, s in enumerate(slots))
+    # 2) 같은 주차장 출구는 한 대씩: 앞차가 빠져나간 뒤에만 다음 차 출발 (필요하면 뒤로 밀기)
+    last_from = {}   # pa_id -> 마지막으로 출발한 Slot
+    prev_arrive = None
+    for k, s in enumerate(slots):
+        arrive = t0 + k * headway
+        if prev_arrive is not None:
+            arrive = max(arrive, prev_arrive + headway)
+        release = max(0.0, arrive - s.travel)
+        before = last_from.get(s.parking)
+        if before is not None:
+            release = max(release, before.release_t + travel_time(before.length + exit_clearance, before.speed, before.accel))
+        s.release_t = release
+        s.arrive_t = release + s.travel
+        prev_arrive = s.arrive_t
+        last_from[s.parking] = s
+    return FormationPlan(merge, slots, headway)
+
+
+def parking_assignments(traci_mod, net=None):
+    """{vid: pa_id} — 도로망 인덱스의 모든 주차장에 현재 주차 중인 차량 (주차장당 1회 조회)"""
+    net = net or get_index()
+    out = {}
+    for pa in net.parking_areas:
+        try:
+            for vid in traci_mod.parkingarea.getVehicleIDs(pa):
+                out[vid] = pa
+        except traci_mod.exceptions.TraCIException:
+            continue
+    return out
+
+
+def plan_for(traci_mod, chain, profile, net=None):
+    """현재 주차 상태로 체인 편성 계획 (계획 불가면 None → 기존 게이트 방식 사용)"""
+    net = net or get_index()
+    parking_of = parking_assignments(traci_mod, net)
+    try:
+        routes = {v: net.vehicle_route(traci_mod, v) for v in chain}
+    except traci_mod.exceptions.TraCIException:
+        return None
+    return plan(chain, parking_of, routes, net, profile.standstill_gap, profile.time_headway)
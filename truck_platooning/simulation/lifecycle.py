@@ -0,0 +1,56 @@
+# simulation/lifecycle.py
+# 차량 수명 주기 추적: 출발(depart) 등록 / 도착(arrive) 시 차량별 상태 정리
+# - 매 스텝 getDepartedIDList / getArrivedIDList 로 증분 갱신 (전체 ID 목록 비교 없이 O(변화량))
+# - 단, 두 목록은 “마지막 SUMO 미세 스텝”분만 담고 있으므로 적응형 큰 스텝(여러 미세 스텝을 한 번에)
+#   뒤에는 getIDList 와 대조해 빠진 출발/도착을 보충
+# - 도착한 차량은 등록된 정리 함수(RuntimeState, 후보 점수, 경로 표, 안전 모니터, 이벤트 키, 게이지)에 일괄 전달
+#   → 연속 교통으로 몇 시간을 돌려도 차량별 dict/set 크기는 “현재 주행 중인 차량 수”에 비례
+from simulation import metrics
+
+
+class VehicleLifecycle:
+    def __init__(self):
+        self.live = set()         # 현재 네트워크 안(출발 후 ~ 도착 전) 차량
+        self.departed = 0         # 누적 출발 수
+        self.arrived = 0          # 누적 도착 수
+        self.reconciles = 0       # getIDList 대조 횟수
+        self._evictors = []       # fn(vids) — 도착한 차량 집합을 받아 상태 정리
+
+    def on_arrival(self, fn):
+        """도착 차량 정리 함수 등록: fn(vids: set)"""
+        self._evictors.append(fn)
+        return fn
+
+    def step(self, traci_mod, multi_step=False):
+        """simulationStep 직후 1회. multi_step=True 면 여러 미세 스텝을 건넌 스텝 → ID 목록 대조.
+        이번 스텝에 도착 처리한 차량 집합 반환"""
+        sim = traci_mod.simulation
+        try:
+            if multi_step or not self.live:
+                # 건너뛴 미세 스텝의 출발/도착은 목록에 없음 → 현재 ID 목록과의 차집합으로 계산
+                ids = set(traci_mod.vehicle.getIDList())
+                departed = ids - self.live
+                arrived = self.live - ids
+                self.reconciles += 1
+            else:
+                departed = set(sim.getDepartedIDList())
+                arrived = set(sim.getArrivedIDList())
+        except traci_mod.exceptions.TraCIException:
+            return set()
+
+        if departed:
+            self.live |= departed
+            self.departed += len(departed)
+            metrics.inc("vehicles_departed", len(departed))
+        if arrived:
+            self.live -= arrived
+            self.arrived += len(arrived)
+            metrics.inc("vehicles_arrived", len(arrived))
+            for fn in self._evictors:
+                fn(arrived)
+        metrics.set_gauge("vehicles_live", len(self.live))
+        return arrived
+
+    def summary(self):
+        return {"live": len(self.live), "departed": self.departed, "arrived": self.arrived,
+                "reconciles": self.reconciles}
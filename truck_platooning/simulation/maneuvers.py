@@ -0,0 +1,443 @@
+# simulation/maneuvers.py
+# 합류/이탈/가드 스케줄러 + 체인/거리 유틸 (UI 비의존)
+# - vehicle_ui(Tk)와 platoon(제어)이 함께 쓰는 상태/함수
+# - Tk를 import 하지 않으므로 headless 실행/워커 프로세스에서도 가볍게 로드됨
+import math
+from bisect import bisect_right
+from simulation import runtime
+from simulation import events
+from simulation import metrics
+from simulation.netindex import get_index, route_gap
+
+# 스케줄러 상태(차선 변경 유지, 합류 대기/코디네이터, 쿨다운, 이탈 보호)는
+# 엔진별 RuntimeState 에 있음 → runtime.current() 로 접근
+
+# --- 재합류 안티-오버테이크 가드 ---
+COOLDOWN_MARGIN = 1.5     # m/s, 앞차보다 이만큼 느리게 유지
+COOLDOWN_SEC = 5.0        # 재합류 후 n초간 적용
+
+# --- 이탈 보호(Leave Guard): 앞차가 빠질 때 뒤차 감속/고정 ---
+LEAVE_GUARD_SEC = 4.0     # 앞차 이탈 보장 시간
+LEAVE_MARGIN = 2.0        # 앞차(이탈 차량/혹은 새 front)보다 최소 이만큼 느리게
+
+# ===== 거리 계산 유틸 =====
+def _euclid_m(traci_mod, a, b):
+    """두 차량의 유클리드 거리(m). SUMO 좌표는 미터 단위."""
+    try:
+        xa, ya = traci_mod.vehicle.getPosition(a)
+        xb, yb = traci_mod.vehicle.getPosition(b)
+        dx, dy = xa - xb, ya - yb
+        return (dx*dx + dy*dy) ** 0.5
+    except Exception:
+        return float('inf')
+
+def _nearby_fallback(traci_mod, me, chain, limit_m):
+    """runtime nearby_platoon이 비어있는 경우 즉석에서 후보 산출."""
+    if not chain:
+        return []
+    cand = []
+    for v in chain:
+        if v == me:
+            continue
+        d = _euclid_m(traci_mod, me, v)
+        if d <= float(limit_m) + 1e-6:
+            cand.append((v, d))
+    cand.sort(key=lambda x: x[1])
+    return cand
+
+# ===== 차선 변경 유틸 =====
+def _adjacent_lane_or_self(traci_mod, lane_id, cur_idx, prefer_right=True):
+    """현재 엣지의 차선 수에 맞춰 인접 차선 인덱스를 고른다."""
+    try:
+        net = get_index()
+        edge_id = net.lane_edge(lane_id)
+        nlanes  = net.lane_count(edge_id)
+    except Exception:
+        return cur_idx
+
+    # 우측(번호 +1) 우선, 없으면 좌측(번호 -1)
+    if prefer_right and cur_idx + 1 < nlanes:
+        return cur_idx + 1
+    if cur_idx - 1 >= 0:
+        return cur_idx - 1
+    # 반대 방향도 안 되면 제자리
+    if not prefer_right and cur_idx + 1 < nlanes:
+        return cur_idx + 1
+    return cur_idx
+
+def _smooth_change_lane(traci_mod, vid, target_lane_index, hold_sec=15.0):
+    """
+    CACC라도 잠깐 laneChange 허용 → changeLane 시도 → hold_sec 뒤에 자동 복구.
+    """
+    rt = runtime.current()
+    try:
+        traci_mod.vehicle.setLaneChangeMode(vid, 1621)  # 잠깐 허용
+        traci_mod.vehicle.changeLane(vid, int(target_lane_index), float(hold_sec))
+        sim_t = traci_mod.simulation.getTime()
+        rt.lane_mode_restore[vid] = sim_t + float(hold_sec)
+    except Exception:
+        pass
+
+def _tick_lane_mode_restore(traci_mod):
+    """laneChangeMode 예약 복구"""
+    rt = runtime.current()
+    try:
+        sim_t = traci_mod.simulation.getTime()
+        for vid, t_restore in list(rt.lane_mode_restore.items()):
+            if sim_t >= t_restore:
+                try:
+                    if traci_mod.vehicle.getTypeID(vid) == "truckCACC":
+                        traci_mod.vehicle.setLaneChangeMode(vid, 0)
+                except Exception:
+                    pass
+                rt.lane_mode_restore.pop(vid, None)
+    except Exception:
+        pass
+
+def _tick_pending_merge(traci_mod):
+    """기존 단순 합류 로직 (MERGE_COORDINATOR가 주로 처리하므로 보조용)"""
+    rt = runtime.current()
+    try:
+        net = get_index()
+        for vid, (front, tgt_idx) in list(rt.pending_merge.items()):
+            if vid in rt.merge_coordinator:
+                rt.pending_merge.pop(vid, None)
+                continue
+
+            try:
+                if (vid not in traci_mod.vehicle.getIDList()) or (front not in traci_mod.vehicle.getIDList()):
+                    rt.pending_merge.pop(vid, None)
+                    continue
+                my_lane_id     = traci_mod.vehicle.getLaneID(vid)
+                front_lane_id  = traci_mod.vehicle.getLaneID(front)
+                my_edge        = net.lane_edge(my_lane_id)
+                front_edge     = net.lane_edge(front_lane_id)
+                if my_edge == front_edge:
+                    nlanes = net.lane_count(my_edge)
+                    tgt_i  = max(0, min(int(tgt_idx), int(nlanes) - 1))
+                    _smooth_change_lane(traci_mod, vid, tgt_i, hold_sec=4.0)
+                    rt.pending_merge.pop(vid, None)
+            except Exception:
+                rt.pending_merge.pop(vid, None)
+                continue
+    except Exception:
+        pass
+
+# ===== 합류 코디네이터 함수 =====
+MERGE_YIELD_DELTA = 5.0   # 양보하는 뒷차 목표 속도: 합류 차량보다 이만큼 느리게 [m/s]
+
+
+def _finish_merge(traci_mod, rt, me, front, rear, lane_change_to=None):
+    """합류 완료 처리: (필요하면) 차선 변경 + 코디네이터 해제 + 쿨다운 시작"""
+    if lane_change_to is not None:
+        _smooth_change_lane(traci_mod, me, lane_change_to, hold_sec=5.0)
+        events.emit("merge", f"{me} merging behind {front}", vid=me, front=front, rear=rear)
+    rt.merge_coordinator.pop(me, None)
+    sim_t = traci_mod.simulation.getTime()
+    rt.join_cooldown[me] = sim_t + COOLDOWN_SEC
+    metrics.inc("guard_activations", guard="join_cooldown")
+    events.emit("guard", guard="join_cooldown", vid=me, until=sim_t + COOLDOWN_SEC)
+
+
+def _tick_merge_coordinator(traci_mod):
+    """
+    대기 중인 모든 합류를 스텝당 한 번에 처리 (차선별 위치 정렬 기반)
+    - 합류 차량(Me)은 앞차(Front)보다 살짝 느리게 → 자연스럽게 뒤로 붙음
+    - 타겟 차선별로 차량을 위치순 정렬 → 각 Me 의 실제 앞/뒤 차량을 이분 탐색으로 찾음
+    - 앞쪽 합류 차량부터 슬롯 배정: 이미 배정된 슬롯과 겹치거나, 뒷차가 다른 Me 에게 양보 중이면 대기
+      (뒷차 하나는 한 Me 에게만 양보 → 두 Me 가 같은 뒷차를 두고 다투지 않음)
+    - 필요한 뒷 간격 = 정지 간격 + 시간 헤드웨이 × 뒷차 속도 (고정 25m 대신 프로파일 기준)
+    - 속도 명령은 차량별 최솟값으로 모아 차량당 setSpeed 1회
+    """
+    rt = runtime.current()
+    coord = rt.merge_coordinator
+    yielding_set = rt.yielding_for_merge
+    if not coord and not yielding_set:
+        return
+    try:
+        prof = rt.profile
+        net = get_index()
+        veh = traci_mod.vehicle
+        alive = set(veh.getIDList())
+        speed_cmd = {}    # vid -> 이번 스텝 목표 속도 (여러 요청이면 최솟값)
+
+        def demand(vid, v):
+            speed_cmd[vid] = min(v, speed_cmd.get(vid, v))
+
+        # 1) 정리 + 앞차 속도 동기화 + 타겟 차선별 묶기
+        by_lane = {}      # 타겟 차선 -> [me, ...]
+        for me, data in list(coord.items()):
+            front = data['front']
+            if me not in alive or front not in alive:
+                # 차량 소멸 또는 앞차가 사라지면 합류 취소
+                coord.pop(me, None)
+                continue
+            demand(me, max(1.0, veh.getSpeed(front) - 1.0))
+            lane_me = veh.getLaneID(me)
+            lane_front = veh.getLaneID(front)
+            if net.lane_edge(lane_me) != net.lane_edge(lane_front):
+                data['state'] = 'aligning'
+                continue
+            if lane_me == lane_front:
+                _finish_merge(traci_mod, rt, me, front, data.get('rear'))
+                continue
+            by_lane.setdefault(lane_front, []).append(me)
+
+        # 2) 차선별 슬롯 배정
+        claimed = set()   # 이번 스텝에 양보 중인 뒷차
+        for lane, mergers in by_lane.items():
+            occ = sorted((veh.getLanePosition(v), v) for v in traci_mod.lane.getLastStepVehicleIDs(lane))
+            positions = [p for p, _ in occ]
+            slots = []    # 이미 배정된 슬롯 [(뒤 경계, 앞 경계)] (앞쪽 합류 차량부터)
+            mergers.sort(key=lambda v: -veh.getLanePosition(v))
+            for me in mergers:
+                data = coord[me]
+                p = veh.getLanePosition(me)
+                length = veh.getLength(me)
+                v_me = veh.getSpeed(me)
+                i = bisect_right(positions, p)
+                rear = occ[i - 1][1] if i > 0 else None
+                ahead = occ[i][1] if i < len(occ) else None
+                data['rear'] = rear
+
+                need_rear = 0.0
+                rear_gap = front_gap = float('inf')
+                if rear is not None:
+                    need_rear = prof.standstill_gap + prof.time_headway * veh.getSpeed(rear)
+                    rear_gap = p - length - positions[i - 1]
+                if ahead is not None:
+                    front_gap = positions[i] - veh.getLength(ahead) - p
+
+                lo, hi = p - length - need_rear, p + prof.standstill_gap
+                if any(lo < s_hi and s_lo < hi for s_lo, s_hi in slots) or rear in claimed:
+                    # 앞쪽 합류 차량이 먼저 → 조금 더 늦춰 뒤 슬롯을 노림
+                    data['state'] = 'queued'
+                    demand(me, max(0.0, v_me - 1.0))
+                    continue
+                slots.append((lo, hi))
+
+                waiting = False
+                if front_gap < prof.standstill_gap:
+                    # 앞 공간 부족 → 타겟 차선 앞차 뒤로 빠지도록 감속
+                    data['state'] = 'aligning'
+                    demand(me, max(0.0, veh.getSpeed(ahead) - 2.0))
+                    waiting = True
+
+                if rear_gap < need_rear:
+                    # === 뒷차 강제 감속 (Active Yield) ===
+                    data['state'] = 'yield'
+                    claimed.add(rear)
+                    if rear not in yielding_set:
+                        metrics.inc("guard_activations", guard="merge_yield")
+                    events.emit("guard", guard="merge_yield", vid=rear, merger=me,
+                                gap=round(rear_gap, 2), key=f"yield:{rear}", every=1.0)
+                    # 내 속도보다 5m/s 느리게, 현재 속도에서 점진적 하강 (0 이하 X)
+                    v_rear = veh.getSpeed(rear)
+                    demand(rear, max(0.0, min(v_rear - 0.5, v_me - MERGE_YIELD_DELTA)))
+                    waiting = True
+
+                if waiting:
+                    continue
+
+                # 공간 확보 → 차선 변경
+                data['state'] = 'merging'
+                _finish_merge(traci_mod, rt, me, data['front'], rear,
+                              lane_change_to=traci_mod.vehicle.getLaneIndex(data['front']))
+
+        # 3) 양보가 끝난 뒷차는 제어권 반환, 나머지 명령은 차량당 1회
+        for vid in yielding_set - claimed:
+            if vid in alive and vid not in speed_cmd:
+                veh.setSpeed(vid, -1)
+        yielding_set.clear()
+        yielding_set.update(claimed)
+        for vid, v in speed_cmd.items():
+            veh.setSpeed(vid, v)
+
+    except Exception:
+        pass
+
+def _tick_join_cooldown(traci_mod):
+    """재합류 직후 일정 시간 동안 추월 금지 + 속도 상한 강제."""
+    rt = runtime.current()
+    try:
+        sim_t = traci_mod.simulation.getTime()
+        pairs = list(rt.follow_pairs)
+        if not pairs:
+            for vid, until_t in list(rt.join_cooldown.items()):
+                if sim_t >= until_t:
+                    rt.join_cooldown.pop(vid, None)
+            return
+
+        f2l = {f: l for (f, l) in pairs}
+
+        for vid, until_t in list(rt.join_cooldown.items()):
+            if (vid not in traci_mod.vehicle.getIDList()):
+                rt.join_cooldown.pop(vid, None)
+                continue
+
+            if sim_t >= until_t:
+                rt.join_cooldown.pop(vid, None)
+                try:
+                    if traci_mod.vehicle.getTypeID(vid) == "truckCACC":
+                        traci_mod.vehicle.setLaneChangeMode(vid, 0)
+                except Exception:
+                    pass
+                continue
+
+            front = f2l.get(vid)
+            if not front or (front not in traci_mod.vehicle.getIDList()):
+                continue
+
+            try:
+                traci_mod.vehicle.setLaneChangeMode(vid, 0)
+            except Exception:
+                pass
+
+            # 쿨다운 중 속도 제한
+            try:
+                vF = traci_mod.vehicle.getSpeed(front)
+                vCap = max(4.0, vF - COOLDOWN_MARGIN)
+                vNow = traci_mod.vehicle.getSpeed(vid)
+                if vNow > vCap:
+                    traci_mod.vehicle.setSpeed(vid, vCap)
+            except Exception:
+                pass
+    except Exception:
+        pass
+
+def _tick_leave_guard(traci_mod):
+    """앞차가 이탈하는 동안 뒤차 감속."""
+    rt = runtime.current()
+    try:
+        sim_t = traci_mod.simulation.getTime()
+        for rear, (until_t, departing) in list(rt.leave_guard.items()):
+            if (rear not in traci_mod.vehicle.getIDList()) or (departing not in traci_mod.vehicle.getIDList()):
+                rt.leave_guard.pop(rear, None)
+                continue
+
+            if sim_t >= until_t:
+                rt.leave_guard.pop(rear, None)
+                try:
+                    if traci_mod.vehicle.getTypeID(rear) == "truckCACC":
+                        traci_mod.vehicle.setLaneChangeMode(rear, 0)
+                except Exception:
+                    pass
+                continue
+
+            try:
+                traci_mod.vehicle.setLaneChangeMode(rear, 0)
+            except Exception:
+                pass
+
+            try:
+                v_dep = traci_mod.vehicle.getSpeed(departing)
+            except Exception:
+                v_dep = 6.0
+
+            try:
+                pairs = list(rt.follow_pairs)
+                f2l = {f:l for (f,l) in pairs}
+                front = f2l.get(rear)
+                v_front = traci_mod.vehicle.getSpeed(front) if front and (front in traci_mod.vehicle.getIDList()) else v_dep
+            except Exception:
+                v_front = v_dep
+
+            v_cap = max(3.0, min(v_dep - LEAVE_MARGIN, v_front - LEAVE_MARGIN))
+            try:
+                v_now = traci_mod.vehicle.getSpeed(rear)
+                if v_now > v_cap:
+                    traci_mod.vehicle.setSpeed(rear, v_cap)
+            except Exception:
+                pass
+    except Exception:
+        pass
+
+# ===== 체인 유틸 =====
+def _order_chain(pairs):
+    pairs = list(pairs)
+    if not pairs:
+        return []
+    followers = {f for f, _ in pairs}
+    leaders   = {l for _, l in pairs}
+    roots = list(leaders - followers)
+    start = roots[0] if roots else pairs[0][1]
+    order = [start]
+    while True:
+        nxt = next((f for f, l in pairs if l == order[-1] and f not in order), None)
+        if not nxt:
+            break
+        order.append(nxt)
+    return order
+
+def _neighbors(chain, vid):
+    if vid not in chain:
+        return (None, None)
+    i = chain.index(vid)
+    front = chain[i-1] if i-1 >= 0 else None
+    rear  = chain[i+1] if i+1 < len(chain) else None
+    return front, rear
+
+# ===== 상태/거리 유틸 =====
+def _has_started(traci_mod, vid):
+    try:
+        return (vid in traci_mod.vehicle.getIDList()) and (not traci_mod.vehicle.isStopped(vid))
+    except Exception:
+        return False
+
+def _euclid_gap(traci_mod, back, front):
+    try:
+        if (back not in traci_mod.vehicle.getIDList()) or (front not in traci_mod.vehicle.getIDList()):
+            return None
+        x1, y1 = traci_mod.vehicle.getPosition(back)
+        x2, y2 = traci_mod.vehicle.getPosition(front)
+        d = math.hypot(x2 - x1, y2 - y1)
+        return d
+    except Exception:
+        return None
+
+def _gap_between(traci_mod, back, front):
+    """도로(경로)상 간격 — 경로 오프셋으로 로컬 계산, 경로가 갈라졌으면 유클리드 거리"""
+    try:
+        if (back not in traci_mod.vehicle.getIDList()) or (front not in traci_mod.vehicle.getIDList()):
+            return None
+        gap = route_gap(traci_mod, back, front)
+        if gap is not None:
+            return max(0.0, gap)
+        return _euclid_gap(traci_mod, back, front)
+    except Exception:
+        return None
+
+# ===== 도로상 순서 기반 front 재선택 =====
+def _pick_best_front_for_merge(traci_mod, me, chain, initial_front):
+    try:
+        info = traci_mod.vehicle.getLeader(me, 2000.0)
+        if info and info[0] in chain:
+            return info[0]
+    except Exception:
+        pass
+
+    try:
+        net = get_index()
+        me_lane = traci_mod.vehicle.getLaneID(me)
+        me_edge = net.lane_edge(me_lane)
+        me_pos  = traci_mod.vehicle.getLanePosition(me)
+
+        candidates = []
+        for v in chain:
+            if v == me:
+                continue
+            v_lane = traci_mod.vehicle.getLaneID(v)
+            v_edge = net.lane_edge(v_lane)
+            if v_edge != me_edge:
+                continue
+            v_pos = traci_mod.vehicle.getLanePosition(v)
+            if v_pos > me_pos + 0.5:
+                candidates.append((v, v_pos - me_pos))
+
+        if candidates:
+            candidates.sort(key=lambda x: x[1])
+            return candidates[0][0]
+    except Exception:
+        pass
+
+    return initial_front
@@ -0,0 +1,193 @@
+# simulation/metrics.py
+# 로컬 메트릭 엔드포인트 (OpenMetrics 텍스트 포맷)
+# - 제어 루프: inc()/set_gauge() 로 dict 값만 갱신 (O(1))
+# - 백그라운드 HTTP 스레드: GET /metrics 요청 시점에만 텍스트 생성
+# - 여러 headless 실행을 한 호스트에서 띄울 때는 port=0 → 빈 포트 자동 선택
+import threading
+
+CONTENT_TYPE = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+
+
+def _labels_key(labels):
+    return tuple(sorted(labels.items())) if labels else ()
+
+
+def _fmt_labels(key):
+    if not key:
+        return ""
+    body = ",".join(
+        '{}="{}"'.format(k, str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"))
+        for k, v in key
+    )
+    return "{" + body + "}"
+
+
+class Metrics:
+    def __init__(self):
+        self._counters = {}    # (name, labels) -> float
+        self._gauges = {}      # (name, labels) -> float
+        self._help = {}        # name -> (type, help)
+        self._collectors = []  # 스크레이프 시점에 호출: fn() -> [(name, type, labels_dict, value), ...]
+
+    # -------- 제어 루프 쪽 API --------
+    def describe(self, name, kind, text):
+        self._help[name] = (kind, text)
+
+    def inc(self, name, value=1.0, **labels):
+        key = (name, _labels_key(labels))
+        self._counters[key] = self._counters.get(key, 0.0) + value
+
+    def set_gauge(self, name, value, **labels):
+        self._gauges[(name, _labels_key(labels))] = float(value)
+
+    def remove_gauge(self, name, **labels):
+        self._gauges.pop((name, _labels_key(labels)), None)
+
+    def forget(self, values, labels=("vid", "follower", "leader")):
+        """labels 중 하나라도 값이 values 에 속하는 게이지 제거 (도착 차량의 쌍별 게이지 등)"""
+        for key in [k for k in self._gauges if any(n in labels and v in values for n, v in k[1])]:
+            self._gauges.pop(key, None)
+
+    def add_collector(self, fn):
+        self._collectors.append(fn)
+
+    # -------- 스크레이프 --------
+    def render(self):
+        families = {}  # name -> (type, [(labels_key, value)])
+
+        def add(name, kind, key, value):
+            fam = families.setdefault(name, (kind, []))
+            fam[1].append((key, value))
+
+        # dict() 복사는 GIL 아래에서 한 번에 이뤄지므로 루프 갱신과 경합해도 안전
+        for (name, key), v in dict(self._counters).items():
+            add(name, "counter", key, v)
+        for (name, key), v in dict(self._gauges).items():
+            add(name, "gauge", key, v)
+        for fn in list(self._collectors):
+            try:
+                for name, kind, labels, v in fn():
+                    add(name, kind, _labels_key(labels), v)
+            except Exception:
+                continue
+
+        lines = []
+        for name in sorted(families):
+            kind, samples = families[name]
+            kind = self._help.get(name, (kind, ""))[0]
+            text = self._help.get(name, ("", ""))[1]
+            lines.append(f"# TYPE {name} {kind}")
+            if text:
+                lines.append(f"# HELP {name} {text}")
+            suffix = "_total" if kind == "counter" else ""
+            for key, v in samples:
+                lines.append(f"{name}{suffix}{_fmt_labels(key)} {float(v):.6g}")
+        lines.append("# EOF")
+        return "\n".join(lines) + "\n"
+
+
+class MetricsServer:
+    """127.0.0.1:port 에서 /metrics 를 서빙하는 데몬 스레드"""
+    def __init__(self, metrics, port=0, host="127.0.0.1"):
+        self.metrics = metrics
+        self.host = host
+        self.port = port
+        self._httpd = None
+        self._thread = None
+
+    def start(self):
+        # http.server 는 무거우므로(~40 ms) 엔드포인트를 실제로 켤 때만 import
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+        metrics = self.metrics
+
+        class _Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] not in ("/", "/metrics"):
+                    self.send_error(404)
+                    return
+                body = metrics.render().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", CONTENT_TYPE)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *_):
+                pass  # 요청마다 콘솔 출력하지 않음
+
+        self._httpd = ThreadingHTTPServer((self.host, self.port), _Handler)
+        self._httpd.daemon_threads = True
+        self.port = self._httpd.server_address[1]
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name="metrics-http", daemon=True)
+        self._thread.start()
+        return self.port
+
+    def stop(self):
+        if self._httpd is not None:
+            self._httpd.shutdown()
+            self._httpd.server_close()
+            self._httpd = None
+
+
+# ===== 기본 레지스트리 =====
+registry = Metrics()
+registry.describe("sim_steps", "counter", "simulationStep 호출 수")
+registry.describe("sim_time_seconds", "gauge", "현재 시뮬레이션 시간")
+registry.describe("step_duration_seconds", "gauge", "마지막 스텝의 제어 루프 처리 시간(wall)")
+registry.describe("real_time_factor", "gauge", "GUI 페이싱 실측 배속 (sim s / wall s)")
+registry.describe("real_time_factor_target", "gauge", "GUI 페이싱 목표 배속 (0 = 최대)")
+registry.describe("collisions", "counter", "SUMO 충돌 차량 수 (getCollidingVehiclesIDList)")
+registry.describe("safety_pairs", "gauge", "안전 모니터가 이번 스텝 평가한 쌍 수")
+registry.describe("vehicles_departed", "counter", "출발(네트워크 진입) 차량 수")
+registry.describe("vehicles_arrived", "counter", "도착(네트워크 이탈) 차량 수 — 차량별 상태 정리")
+registry.describe("vehicles_live", "gauge", "현재 네트워크 안 차량 수 (수명 주기 추적)")
+registry.describe("traffic_inserted", "counter", "배경 교통 생성기가 추가한 차량 수")
+registry.describe("traffic_dropped", "counter", "삽입 대기열 상한으로 생략한 배경 차량 수")
+registry.describe("traffic_pending", "gauge", "SUMO 삽입 대기 차량 수 (배경 교통 배치 시점)")
+registry.describe("settled_pairs", "gauge", "정상 상태로 제어를 건너뛰는 쌍 수")
+registry.describe("settle_wakes", "counter", "정상 상태 쌍 깨우기 (사유별)")
+registry.describe("result_cache_lookups", "counter", "실행 결과 캐시 조회 (outcome=hit/miss)")
+registry.describe("web_clients", "gauge", "웹 대시보드 접속 클라이언트 수")
+registry.describe("web_bytes_sent", "counter", "웹 대시보드 전송 바이트")
+registry.describe("platoon_gap_meters", "gauge", "팔로워-타겟 간 현재 간격")
+registry.describe("platoon_gap_error_meters", "gauge", "CACC 목표 간격 대비 오차")
+registry.describe("guard_activations", "counter", "보호 로직(가드) 발동 횟수")
+registry.describe("traci_calls", "counter", "TraCI 호출 수 (getter hit/miss, command)")
+
+_server = None
+
+
+def inc(name, value=1.0, **labels):
+    registry.inc(name, value, **labels)
+
+
+def set_gauge(name, value, **labels):
+    registry.set_gauge(name, value, **labels)
+
+
+def remove_gauge(name, **labels):
+    registry.remove_gauge(name, **labels)
+
+
+def forget(values):
+    registry.forget(values)
+
+
+def add_collector(fn):
+    registry.add_collector(fn)
+
+
+def serve(port=0, host="127.0.0.1"):
+    """엔드포인트 시작 후 실제 포트 반환 (이미 떠 있으면 그 포트)"""
+    global _server
+    if _server is None:
+        _server = MetricsServer(registry, port=port, host=host)
+        _server.start()
+    return _server.port
+
+
+def shutdown():
+    global _server
+    if _server is not None:
+        _server.stop()
+        _server = None
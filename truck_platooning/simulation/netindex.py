@@ -0,0 +1,304 @@
+# simulation/netindex.py
+# 도로망/경로 사전 컴파일 인덱스
+# - final.sumocfg 가 가리키는 net/route 파일을 시작 시 1회 파싱
+# - 엣지→차선, 차선 길이, 후속 엣지, 경로 엣지 목록을 메모리에 보관
+# - 파일 해시를 키로 map/.netcache/ 에 JSON 캐시 → 다음 실행부터는 파싱 없이 로드
+# - 경로별 누적 엣지 오프셋 → 같은 경로 위 두 차량의 도로상 간격을 O(1) 로컬 계산
+# - 주차장 위치/차량 타입(가속도, 최고속도) → 출발 편성 계획(formation)용
+import hashlib
+import json
+import os
+import time
+import xml.etree.ElementTree as ET
+
+from simulation import runtime
+
+FORMAT_VERSION = 2
+CACHE_DIR_NAME = ".netcache"
+
+
+def _split_files(value):
+    return [v for v in value.replace(",", " ").split() if v]
+
+
+def _sumocfg_inputs(sumocfg_path):
+    """sumocfg 에서 (net 파일, [route 파일들], [additional 파일들]) 경로 추출"""
+    base = os.path.dirname(os.path.abspath(sumocfg_path))
+    root = ET.parse(sumocfg_path).getroot()
+    net_file, route_files, add_files = None, [], []
+    for el in root.iter():
+        tag = el.tag.split("}")[-1]
+        if tag == "net-file":
+            net_file = os.path.join(base, el.get("value"))
+        elif tag == "route-files":
+            route_files = [os.path.join(base, f) for f in _split_files(el.get("value", ""))]
+        elif tag == "additional-files":
+            add_files = [os.path.join(base, f) for f in _split_files(el.get("value", ""))]
+    return net_file, route_files, add_files
+
+
+def _digest(paths):
+    h = hashlib.sha1(f"v{FORMAT_VERSION}".encode())
+    for p in paths:
+        with open(p, "rb") as fh:
+            h.update(fh.read())
+    return h.hexdigest()[:16]
+
+
+def _parse(net_file, route_files, add_files=()):
+    lanes = {}      # lane_id -> [edge_id, index, length, speed]
+    edges = {}      # edge_id -> {"lanes": [...], "succ": [...], "internal": bool}
+    internal = {}   # 내부(교차로) 엣지 -> [from_edge, to_edge]
+
+    for ev, el in ET.iterparse(net_file, events=("end",)):
+        if el.tag == "edge":
+            eid = el.get("id")
+            is_internal = el.get("function") == "internal"
+            lane_ids = []
+            for ln in el.findall("lane"):
+                lid = ln.get("id")
+                idx = int(ln.get("index"))
+                lanes[lid] = [eid, idx, float(ln.get("length")), float(ln.get("speed", 13.89))]
+                lane_ids.append((idx, lid))
+            lane_ids.sort()
+            edges[eid] = {"lanes": [lid for _, lid in lane_ids], "succ": [], "internal": is_internal}
+            el.clear()
+        elif el.tag == "connection":
+            frm, to, via = el.get("from"), el.get("to"), el.get("via")
+            if frm in edges and not edges[frm]["internal"]:
+                if to not in edges[frm]["succ"]:
+                    edges[frm]["succ"].append(to)
+                if via:
+                    internal[via.rsplit("_", 1)[0]] = [frm, to]
+
+    routes = {}           # route_id -> [edges]
+    vehicle_routes = {}   # vehicle_id -> [edges] (인라인/참조 경로)
+    vtypes = {}           # vtype_id -> {"accel", "decel", "length", "max_speed"}
+    vehicle_types = {}    # vehicle_id -> vtype_id
+    for rf in route_files:
+        root = ET.parse(rf).getroot()
+        for el in root:
+            if el.tag == "route" and el.get("id"):
+                routes[el.get("id")] = el.get("edges", "").split()
+            elif el.tag == "vType" and el.get("id"):
+                vtypes[el.get("id")] = {
+                    "accel": float(el.get("accel", 2.6)),
+                    "decel": float(el.get("decel", 4.5)),
+                    "length": float(el.get("length", 5.0)),
+                    "max_speed": float(el.get("maxSpeed", 55.56)),
+                }
+        for el in root:
+            if el.tag not in ("vehicle", "trip", "flow"):
+                continue
+            vid = el.get("id")
+            if el.get("type"):
+                vehicle_types[vid] = el.get("type")
+            if el.get("route") in routes:
+                vehicle_routes[vid] = list(routes[el.get("route")])
+                continue
+            inline = el.find("route")
+            if inline is None:
+                dist = el.find("routeDistribution")
+                inline = dist.find("route") if dist is not None else None
+            if inline is not None:
+                vehicle_routes[vid] = inline.get("edges", "").split()
+
+    parking_areas = {}    # pa_id -> [lane_id, startPos, endPos]
+    for af in add_files:
+        for el in ET.parse(af).getroot().iter("parkingArea"):
+            lane = el.get("lane")
+            length = lanes[lane][2] if lane in lanes else 0.0
+            start = float(el.get("startPos", 0.0))
+            end = float(el.get("endPos", length))
+            parking_areas[el.get("id")] = [lane, start, end]
+
+    return {"lanes": lanes, "edges": edges, "internal": internal,
+            "routes": routes, "vehicle_routes": vehicle_routes,
+            "vtypes": vtypes, "vehicle_types": vehicle_types, "parking_areas": parking_areas}
+
+
+class NetIndex:
+    def __init__(self, data, digest=""):
+        self.digest = digest
+        self.lanes = data["lanes"]
+        self.edges = data["edges"]
+        self.internal = data["internal"]
+        self.routes = data["routes"]
+        self.vehicle_routes = data["vehicle_routes"]
+        self.vtypes = data["vtypes"]
+        self.vehicle_types = data["vehicle_types"]
+        self.parking_areas = data["parking_areas"]
+        self._via = {tuple(ft): iedge for iedge, ft in self.internal.items()}  # (from, to) -> 내부 엣지
+        self._offsets = {}  # tuple(route edges) -> {edge_id: 경로 시작점 기준 누적 오프셋}
+
+    # -------- 차선/엣지 --------
+    def lane_edge(self, lane_id):
+        """차선 ID → 엣지 ID (TraCI lane.getEdgeID 대체)"""
+        info = self.lanes.get(lane_id)
+        if info is not None:
+            return info[0]
+        return lane_id.rsplit("_", 1)[0]
+
+    def lane_count(self, edge_id):
+        """엣지의 차선 수 (TraCI edge.getLaneNumber 대체). 모르는 엣지면 KeyError"""
+        return len(self.edges[edge_id]["lanes"])
+
+    def lane_length(self, lane_id):
+        return self.lanes[lane_id][2]
+
+    def edge_length(self, edge_id):
+        return self.lanes[self.edges[edge_id]["lanes"][0]][2]
+
+    def lane_speed(self, lane_id):
+        return self.lanes[lane_id][3]
+
+    def edge_speed(self, edge_id):
+        """엣지 제한속도 (차선 중 최댓값)"""
+        return max(self.lanes[lid][3] for lid in self.edges[edge_id]["lanes"])
+
+    def successors(self, edge_id):
+        return self.edges[edge_id]["succ"] if edge_id in self.edges else []
+
+    def is_internal(self, edge_id):
+        return edge_id.startswith(":")
+
+    # -------- 경로 --------
+    def route_edges(self, route_id):
+        """경로 ID → 엣지 목록. 파일에 없던(런타임 추가) 경로면 None"""
+        return self.routes.get(route_id)
+
+    def register_route(self, route_id, edges):
+        """traci.route.add 로 추가한 경로도 로컬 조회 가능하게 등록"""
+        self.routes[route_id] = list(edges)
+
+    # -------- 경로 누적 오프셋 --------
+    def route_offsets(self, edges):
+        """경로를 누적 오프셋 표로 컴파일 (경로당 1회).
+        교차로 내부 엣지(:J..)도 앞뒤 엣지 사이에 끼워 넣는다."""
+        key = tuple(edges)
+        offs = self._offsets.get(key)
+        if offs is not None:
+            return offs
+        offs = {}
+        acc = 0.0
+        for i, eid in enumerate(key):
+            if eid not in offs:
+                offs[eid] = acc
+            acc += self.edge_length(eid)
+            if i + 1 < len(key):
+                iedge = self._via.get((eid, key[i + 1]))
+                if iedge is not None:
+                    offs.setdefault(iedge, acc)
+                    acc += self.edge_length(iedge)
+        self._offsets[key] = offs
+        return offs
+
+    def route_pos(self, edges, edge_id, lane_pos):
+        """(엣지, 차선 위치) → 경로 시작점 기준 주행 거리. 경로 밖이면 None"""
+        off = self.route_offsets(edges).get(edge_id)
+        return None if off is None else off + lane_pos
+
+    def fork(self):
+        """같은 도로망을 쓰는 다른 실행용 사본: 도로망/오프셋 표는 공유,
+        런타임에 추가되는 경로/차량 경로만 분리"""
+        twin = NetIndex.__new__(NetIndex)
+        twin.__dict__.update(self.__dict__)
+        twin.routes = dict(self.routes)
+        twin.vehicle_routes = dict(self.vehicle_routes)
+        return twin
+
+    def vehicle_route(self, traci_mod, vid):
+        """차량 경로 엣지 목록 (파일/등록값 우선, 없으면 TraCI 1회 조회 후 기억)"""
+        edges = self.vehicle_routes.get(vid)
+        if edges is None:
+            edges = list(traci_mod.vehicle.getRoute(vid))
+            self.vehicle_routes[vid] = edges
+        return edges
+
+    def forget_vehicles(self, vids):
+        """도착 차량 경로 정리 (같은 ID 로 다시 나오면 vehicle_route 가 TraCI 로 다시 조회)"""
+        for vid in vids:
+            self.vehicle_routes.pop(vid, None)
+
+
+def load(sumocfg_path="map/final.sumocfg", use_cache=True):
+    """인덱스 로드. 반환: (NetIndex, 캐시 적중 여부, 소요 ms)"""
+    t0 = time.perf_counter()
+    net_file, route_files, add_files = _sumocfg_inputs(sumocfg_path)
+    digest = _digest([net_file] + route_files + add_files)
+    cache_dir = os.path.join(os.path.dirname(net_file), CACHE_DIR_NAME)
+    cache_file = os.path.join(cache_dir, f"{os.path.basename(net_file)}.{digest}.json")
+
+    if use_cache and os.path.exists(cache_file):
+        try:
+            with open(cache_file, "r", encoding="utf-8") as fh:
+                data = json.load(fh)
+            return NetIndex(data, digest), True, (time.perf_counter() - t0) * 1000.0
+        except (OSError, ValueError, KeyError):
+            pass  # 손상된 캐시는 다시 만든다
+
+    data = _parse(net_file, route_files, add_files)
+    if use_cache:
+        try:
+            os.makedirs(cache_dir, exist_ok=True)
+            tmp = cache_file + ".tmp"
+            with open(tmp, "w", encoding="utf-8") as fh:
+                json.dump(data, fh, separators=(",", ":"))
+            os.replace(tmp, cache_file)
+            # 예전 해시의 캐시 정리
+            prefix = os.path.basename(net_file) + "."
+            for name in os.listdir(cache_dir):
+                if name.startswith(prefix) and name != os.path.basename(cache_file):
+                    os.remove(os.path.join(cache_dir, name))
+        except OSError:
+            pass
+    return NetIndex(data, digest), False, (time.perf_counter() - t0) * 1000.0
+
+
+# ===== 경로 기반 거리 (TraCI 거리 질의 없이 로컬 계산) =====
+def route_distance(traci_mod, back, front, net=None):
+    """back 경로를 따라 back 앞범퍼 → front 앞범퍼 거리(m).
+    getDrivingDistance(back, roadF, posF) 와 같은 의미. 같은 경로 위가 아니면 None"""
+    net = net or get_index()
+    try:
+        edges = net.vehicle_route(traci_mod, back)
+        pb = net.route_pos(edges, traci_mod.vehicle.getRoadID(back), traci_mod.vehicle.getLanePosition(back))
+        pf = net.route_pos(edges, traci_mod.vehicle.getRoadID(front), traci_mod.vehicle.getLanePosition(front))
+    except (KeyError, traci_mod.exceptions.TraCIException):
+        return None
+    if pb is None or pf is None:
+        return None
+    return pf - pb
+
+
+def route_gap(traci_mod, back, front, net=None):
+    """경로상 범퍼 간 간격(m) = 앞범퍼 거리 - front 차량 길이. 같은 경로 위가 아니면 None"""
+    d = route_distance(traci_mod, back, front, net)
+    if d is None:
+        return None
+    try:
+        return d - traci_mod.vehicle.getLength(front)
+    except traci_mod.exceptions.TraCIException:
+        return None
+
+
+# ===== 공용 인덱스 =====
+_index = None
+
+
+def get_index():
+    """현재 실행의 인덱스 (엔진별 RuntimeState.net).
+    없으면 공용 인덱스 (처음 호출 시 기본 프로파일의 sumocfg 경로로 로드)"""
+    global _index
+    net = runtime.current().net
+    if net is not None:
+        return net
+    if _index is None:
+        from simulation.profile import DEFAULT
+        _index, _, _ = load(DEFAULT.sumo_cfg)
+    return _index
+
+
+def set_index(index):
+    global _index
+    _index = index
@@ -0,0 +1,128 @@
+# simulation/pacing.py
+# 실시간 페이싱 (목표 실시간 배속 RTF: 1×, 2×, 10×, 최대)
+# - 벽시계 기준점(wall0, sim0)에서 "지금 도달해야 할 sim time"을 계산 → 스텝 계산 시간을 뺀 나머지만 대기
+#   (고정 root.after(50) + sumo-gui --delay 처럼 계산 시간만큼 누적 지연(drift)되지 않음)
+# - 뒤처지면 UI 프레임 1번에 여러 스텝 실행 (프레임 스킵, 프레임당 최대 max_steps_per_frame)
+# - max_lag 초 이상 밀리면 따라잡기를 포기하고 기준점 재설정 (부하가 잠깐 튄 뒤 폭주 방지)
+# - rtf <= 0 이면 최대 속도: 프레임 예산(frame_s) 동안 계속 스텝, UI 는 프레임마다 1번만 갱신
+import time
+
+from simulation import events
+from simulation import metrics
+
+RTF_CHOICES = (("1×", 1.0), ("2×", 2.0), ("10×", 10.0), ("max", 0.0))
+
+
+def parse_rtf(text):
+    """'2', '2x', '2×', 'max' → 배속 (최대 = 0.0)"""
+    s = str(text).strip().lower().rstrip("x×")
+    if s in ("max", "0", ""):
+        return 0.0
+    rtf = float(s)
+    if rtf < 0:
+        raise ValueError(f"real-time factor must be >= 0 (got {text})")
+    return rtf
+
+
+def rtf_label(rtf):
+    return "max" if rtf <= 0 else f"{rtf:g}×"
+
+
+class Pacer:
+    def __init__(self, rtf=1.0, frame_s=0.05, max_steps_per_frame=50, max_lag=1.0, clock=time.perf_counter):
+        self.rtf = rtf
+        self.frame_s = frame_s                  # UI 프레임 주기 [s] (최대 속도 모드의 프레임당 계산 예산)
+        self.max_steps_per_frame = max_steps_per_frame
+        self.max_lag = max_lag                  # 이만큼(벽시계 초) 뒤처지면 기준점 재설정
+        self.clock = clock
+        self._wall0 = None
+        self._sim0 = 0.0
+        self.frames = 0
+        self.steps = 0
+        self.compute_s = 0.0                    # 누적 스텝 계산 시간 (벽시계)
+        self.step_ema = 0.0                     # 스텝 1회 계산 시간 지수평균 [s]
+        self.slips = 0                          # 기준점 재설정 횟수
+        self._rate_wall = None                  # 실측 배속 계산 구간 시작
+        self._rate_sim = 0.0
+        self.achieved = None                    # 실측 배속 (sim s / wall s)
+
+    def set_rtf(self, rtf, sim_t=None):
+        """배속 변경 → 현재 시점에서 기준점 재설정"""
+        self.rtf = rtf
+        self._wall0 = None
+        if sim_t is not None:
+            self._rebase(sim_t)
+        events.emit("pacing", f"실시간 배속 {rtf_label(rtf)}", rtf=rtf)
+
+    def _rebase(self, sim_t):
+        self._wall0 = self.clock()
+        self._sim0 = sim_t
+
+    def _due_sim(self, now):
+        """지금 벽시계 기준 도달해야 할 sim time"""
+        return self._sim0 + (now - self._wall0) * self.rtf
+
+    def _step(self, engine):
+        t0 = self.clock()
+        alive = engine.step()
+        dt = self.clock() - t0
+        self.steps += 1
+        self.compute_s += dt
+        self.step_ema = dt if self.steps == 1 else 0.9 * self.step_ema + 0.1 * dt
+        return alive
+
+    def frame(self, engine):
+        """UI 프레임 1번: 밀린 만큼 스텝 실행 → (계속 여부, 다음 프레임까지 대기 ms)"""
+        self.frames += 1
+        if self._wall0 is None:
+            self._rebase(engine.sim_t)
+        start = self.clock()
+
+        if self.rtf <= 0:
+            # 최대 속도: 프레임 예산 동안 계속 (최소 1스텝)
+            while True:
+                if not self._step(engine):
+                    return False, 0
+                if self.clock() - start >= self.frame_s:
+                    break
+            self._update_rate(engine.sim_t)
+            return True, 1
+
+        n = 0
+        while engine.sim_t < self._due_sim(self.clock()) and n < self.max_steps_per_frame:
+            if not self._step(engine):
+                return False, 0
+            n += 1
+        now = self.clock()
+        lag = (self._due_sim(now) - engine.sim_t) / self.rtf     # 뒤처진 벽시계 초
+        if lag > self.max_lag:
+            self.slips += 1
+            events.emit("pacing", f"실시간 {rtf_label(self.rtf)} 유지 불가: {lag:.2f}s 지연 → 기준점 재설정",
+                        key="pacing:slip", every=5.0, lag=round(lag, 3), step_ms=round(self.step_ema * 1000, 2))
+            self._rebase(engine.sim_t)
+            lag = 0.0
+        self._update_rate(engine.sim_t)
+
+        # 다음 스텝 예정 시각까지 남은 시간만 대기 (뒤처져 있으면 바로)
+        nxt = engine.sim_t + engine.profile.step_length
+        wait = self._wall0 + (nxt - self._sim0) / self.rtf - now
+        wait = min(max(0.0, wait), self.frame_s)
+        return True, max(1, int(wait * 1000))
+
+    def _update_rate(self, sim_t):
+        """약 1초 구간마다 실측 배속 갱신"""
+        now = self.clock()
+        if self._rate_wall is None:
+            self._rate_wall, self._rate_sim = now, sim_t
+            return
+        span = now - self._rate_wall
+        if span >= 1.0:
+            self.achieved = (sim_t - self._rate_sim) / span
+            self._rate_wall, self._rate_sim = now, sim_t
+            metrics.set_gauge("real_time_factor", self.achieved)
+            metrics.set_gauge("real_time_factor_target", self.rtf)
+
+    def summary(self):
+        return {"rtf": self.rtf, "achieved_rtf": None if self.achieved is None else round(self.achieved, 3),
+                "frames": self.frames, "steps": self.steps, "slips": self.slips,
+                "step_ms_mean": round(self.compute_s / self.steps * 1000, 3) if self.steps else None}
@@ -1,29 +1,22 @@
 # simulation/platoon.py
-import traci
-import simulation.config as cfg
-from .config import (
-    DESIRED_GAP,
-    CATCH_GAIN,
-    V_MAX_FOLLOW,
-    CUT_IN_EXPAND_GAP,
-    CUT_IN_ACTIVE_PAIRS,
-    CUT_IN_APPROACH_DISTANCE,
-    CUT_IN_DECELERATION,
-    STANDSTILL_GAP,
-    TIME_HEADWAY,
-)
-
-# --- 전역 상태(팔로워별 초기 락) ---
-startup_lock_done  = {}  # follower_id -> bool
-startup_lock_until = {}  # follower_id -> float
-_boosted = set()         # 출발 1회 상한 풀기 마킹
+from simulation.traci_cache import traci
+from simulation import events
+from simulation import metrics
+from simulation.netindex import route_distance
+from simulation import runtime
+from simulation.stepping import SETTLE_ACCEL, SETTLE_DV, SETTLE_GAP_ERR
+
+SETTLE_STEPS = 20         # 연속 이 횟수만큼 대역 안이면 정상 상태 쌍으로 표시 (제어 건너뛰기 시작)
+
+# 팔로워별 초기 락/부스트 상태는 엔진별 RuntimeState 에 있음 (runtime.current())
 
 
 def _ensure_lock_keys(fid):
-    if fid not in startup_lock_done:
-        startup_lock_done[fid] = False
-    if fid not in startup_lock_until:
-        startup_lock_until[fid] = 0.0
+    rt = runtime.current()
+    if fid not in rt.startup_lock_done:
+        rt.startup_lock_done[fid] = False
+    if fid not in rt.startup_lock_until:
+        rt.startup_lock_until[fid] = 0.0
 
 
 def _get_leader_info(follower_id: str, max_dist=1000.0):
@@ -54,16 +47,11 @@ def _pick_front_target(follower_id: str, designated_leader_id: str, lookahead: f
         front_id, gap = info
         return front_id, float(gap)
 
-    # 앞차 정보가 없으면 지정 리더 기준으로 거리 추정
-    try:
-        if designated_leader_id in traci.vehicle.getIDList():
-            roadL = traci.vehicle.getRoadID(designated_leader_id)
-            posL  = traci.vehicle.getLanePosition(designated_leader_id)
-            d_road = traci.vehicle.getDrivingDistance(follower_id, roadL, posL)
-            if d_road is not None and d_road > 0:
-                return designated_leader_id, float(d_road)
-    except traci.exceptions.TraCIException:
-        pass
+    # 앞차 정보가 없으면 지정 리더 기준으로 거리 추정 (경로 오프셋으로 로컬 계산)
+    if designated_leader_id in traci.vehicle.getIDList():
+        d_road = route_distance(traci, follower_id, designated_leader_id)
+        if d_road is not None and d_road > 0:
+            return designated_leader_id, float(d_road)
     return designated_leader_id, None
 
 
@@ -71,20 +59,22 @@ def _pick_front_target(follower_id: str, designated_leader_id: str, lookahead: f
 # 출발 직후 '초기 락' 지정
 def ensure_initial_gap_lock(follower_id: str, leader_id: str, lock_duration: float = 0.7):
     """팔로워가 방금 출발했을 때 1회 호출: 리더 뒤 안정화 구간 확보"""
+    rt = runtime.current()
     try:
         _ensure_lock_keys(follower_id)
         t_now = traci.simulation.getTime()
-        startup_lock_done[follower_id]  = True
-        startup_lock_until[follower_id] = t_now + lock_duration
+        rt.startup_lock_done[follower_id]  = True
+        rt.startup_lock_until[follower_id] = t_now + lock_duration
 
         # 안전한 기본 모드 유지, 속도는 리더에 동기화
         if follower_id in traci.vehicle.getIDList() and leader_id in traci.vehicle.getIDList():
             vL = traci.vehicle.getSpeed(leader_id)
             traci.vehicle.setSpeed(follower_id, vL)   # 즉시 동기화
-            traci.vehicle.setMaxSpeed(follower_id, max(V_MAX_FOLLOW, vL + 5.0))
+            v_max = rt.profile.v_max_follow
+            traci.vehicle.setMaxSpeed(follower_id, max(v_max, vL + 5.0))
 
     except traci.exceptions.TraCIException as e:
-        print(f"[LOCK] init failed for {follower_id}: {e}")
+        events.emit("lock", f"init failed for {follower_id}: {e}", vid=follower_id)
     pass
 
 
@@ -94,13 +84,15 @@ def maintain_or_release_lock(follower_id: str, leader_id: str):
     """락 시간 동안은 리더 속도에 바짝 동기화 + 간단한 거리 보정
        끼어들기 동안(타겟이 지정 리더가 아님)에는 락 개입하지 않음
     """
+    rt = runtime.current()
     try:
         _ensure_lock_keys(follower_id)
         t_now = traci.simulation.getTime()
-        if not startup_lock_done.get(follower_id, False):
+        if not rt.startup_lock_done.get(follower_id, False):
             return
+        prof = rt.profile
 
-        if t_now <= startup_lock_until.get(follower_id, 0.0):
+        if t_now <= rt.startup_lock_until.get(follower_id, 0.0):
             if follower_id not in traci.vehicle.getIDList() or leader_id not in traci.vehicle.getIDList():
                 return
 
@@ -120,47 +112,105 @@ def maintain_or_release_lock(follower_id: str, leader_id: str):
                 return
 
             # 보정: 너무 멀면 +2, 너무 가까우면 -2
-            if gap > DESIRED_GAP + 1.0:
+            if gap > prof.desired_gap + 1.0:
                 v_cmd = vL + 2.0
-            elif gap < DESIRED_GAP - 1.0:
+            elif gap < prof.desired_gap - 1.0:
                 v_cmd = max(0.0, vL - 2.0)
             else:
                 v_cmd = vL
 
-            v_cmd = max(0.0, min(V_MAX_FOLLOW, v_cmd))
+            v_cmd = max(0.0, min(prof.v_max_follow, v_cmd))
             traci.vehicle.setSpeed(follower_id, v_cmd)
         else:
             # 락 기간 종료 → 다음부터는 정상 추종 제어가 담당
-            startup_lock_done[follower_id] = False
+            rt.startup_lock_done[follower_id] = False
     except traci.exceptions.TraCIException:
         pass
 
 
+# -----------------------------------------------------------------------------
+# 정상 상태 쌍 건너뛰기 (profile.settle_every > 1 일 때)
+# - 간격 오차/상대 속도/앞차 가속도가 SETTLE_STEPS 번 연속 대역 안 → settled: 마지막 setSpeed 를 유지한 채
+#   settle_every 스텝마다 한 번만 전체 제어 (그 사이 TraCI 호출 없음)
+# - 깨우기: 체인 구성 변경(set_pairs), 끼어들기 플래그, 합류/이탈/쿨다운/락, 제동 채널, 앞차 V2V 가속도 변화
+def _settle_wake_reason(rt, follower_id, leader_id, s):
+    if s["leader"] != leader_id:
+        return "topology"
+    if (leader_id, follower_id) in rt.cut_in_active_pairs:
+        return "cut_in"
+    if (follower_id in rt.merge_coordinator or leader_id in rt.merge_coordinator
+            or follower_id in rt.pending_merge or follower_id in rt.yielding_for_merge
+            or follower_id in rt.leave_guard or leader_id in rt.join_cooldown
+            or rt.startup_lock_done.get(follower_id)):
+        return "maneuver"
+    if rt.brake_channel.active:
+        return "brake"
+    msg = rt.v2v.receive(leader_id)
+    if msg is not None and abs(msg[1] - s["aL"]) > SETTLE_ACCEL:
+        return "leader_accel"
+    return None
+
+
+def skip_settled(follower_id, leader_id):
+    """이번 스텝 이 쌍의 제어를 건너뛰면 True (정상 상태 유지 중)"""
+    rt = runtime.current()
+    s = rt.settled.get(follower_id)
+    if s is None:
+        return False
+    reason = _settle_wake_reason(rt, follower_id, leader_id, s)
+    if reason is None:
+        s["left"] -= 1
+        if s["left"] > 0:
+            return True
+        # 주기 재평가: 이번 제어에서 여전히 대역 안이면 곧바로 다시 settled
+        rt.settled.pop(follower_id, None)
+        rt.settle_count[follower_id] = SETTLE_STEPS - 1
+        return False
+    rt.settled.pop(follower_id, None)
+    rt.settle_count.pop(follower_id, None)
+    metrics.inc("settle_wakes", reason=reason)
+    return False
+
+
+def _update_settled(rt, follower_id, leader_id, target_id, err, vrel, aL, count):
+    """정상 추종 제어 끝에서 호출: 대역 안이면 연속 횟수 증가, 충분하면 settled 표시"""
+    k = rt.profile.settle_every
+    if (k <= 1 or target_id != leader_id or abs(err) > SETTLE_GAP_ERR or abs(vrel) > SETTLE_DV
+            or abs(aL) > SETTLE_ACCEL):
+        return
+    count += 1
+    if count >= SETTLE_STEPS:
+        rt.settled[follower_id] = {"leader": leader_id, "aL": aL, "left": k}
+    rt.settle_count[follower_id] = count
+
+
 # -----------------------------------------------------------------------------
 # 정상 추종 제어 (매 스텝 호출)
-# 끼어든 차량 포함 '실제 앞차'를 타겟으로 TIME_HEADWAY 기준 유지 (PD + catch-up)
-_KP = 0.8
-_KD = 0.4
-_DT = 0.05   # config의 --step-length와 일치(여기선 0.05s)
+# 끼어든 차량 포함 '실제 앞차'를 타겟으로 time_headway 기준 유지 (PD + catch-up)
+# 게인(kp/kd)은 프로파일, 제어 주기는 실제 스텝 간격(rt.dt, 적응형 스텝이면 가변)에서 읽음
 
 
 def control_follower_speed(follower_id, leader_id):
+    rt = runtime.current()
+    # 정상 상태 연속 횟수: 이번 호출이 일반 주행 경로 끝까지 가서 대역 안일 때만 이어짐
+    settle_count = rt.settle_count.pop(follower_id, 0)
     try:
         if follower_id not in traci.vehicle.getIDList():
             return
+        prof = rt.profile
+        V_MAX_FOLLOW = prof.v_max_follow
 
         # 공통 key 
         pair_key = (leader_id, follower_id)
 
         # -----------------------------------------------------------------
-        # 재합류 쿨다운(JOIN_COOLDOWN) 보호
+        # 재합류 쿨다운(join_cooldown) 보호
         # 리더가 재합류 쿨다운 중 - 바로 뒷 차 팔로워가 확실히 감속
         # -----------------------------------------------------------------
         try:
-            from simulation.vehicle_ui import JOIN_COOLDOWN
             sim_t = traci.simulation.getTime()
-            if leader_id in JOIN_COOLDOWN:
-                until_t = JOIN_COOLDOWN.get(leader_id, 0)
+            if leader_id in rt.join_cooldown:
+                until_t = rt.join_cooldown.get(leader_id, 0)
                 if sim_t < until_t:
                     try:
                         vL = traci.vehicle.getSpeed(leader_id)
@@ -168,6 +218,9 @@ def control_follower_speed(follower_id, leader_id):
                         target_speed = max(5.0, vL - 3.0)
                         if vF > target_speed + 0.2:
                             traci.vehicle.setSpeed(follower_id, target_speed)
+                            metrics.inc("guard_activations", guard="join_cooldown")
+                            events.emit("guard", guard="join_cooldown", vid=follower_id, leader=leader_id,
+                                        key=f"cooldown:{follower_id}", every=1.0)
                             return  
                     except:
                         pass
@@ -184,18 +237,22 @@ def control_follower_speed(follower_id, leader_id):
         # -----------------------------------------------------------------
         try:
             # 끼어들기 플래그가 켜져 있으면 합류지원 스킵
-            if pair_key not in CUT_IN_ACTIVE_PAIRS and leader_id in traci.vehicle.getIDList():
+            if pair_key not in rt.cut_in_active_pairs and leader_id in traci.vehicle.getIDList():
                 f_lane = traci.vehicle.getLaneID(follower_id)
                 l_lane = traci.vehicle.getLaneID(leader_id)
 
                 # 리더와 내가 다른 차선(= 합류 대기 중)
                 if f_lane and l_lane and (f_lane != l_lane):
-                    # 유클리드 거리 직접 계산
-                    f_pos = traci.vehicle.getPosition(follower_id)
-                    l_pos = traci.vehicle.getPosition(leader_id)
-                    dx = f_pos[0] - l_pos[0]
-                    dy = f_pos[1] - l_pos[1]
-                    dist_direct = (dx * dx + dy * dy) ** 0.5
+                    # 도로상 거리 (경로가 갈라졌으면 유클리드 거리)
+                    d_road = route_distance(traci, follower_id, leader_id)
+                    if d_road is not None:
+                        dist_direct = abs(d_road)
+                    else:
+                        f_pos = traci.vehicle.getPosition(follower_id)
+                        l_pos = traci.vehicle.getPosition(leader_id)
+                        dx = f_pos[0] - l_pos[0]
+                        dy = f_pos[1] - l_pos[1]
+                        dist_direct = (dx * dx + dy * dy) ** 0.5
 
                     MERGE_GAP_REQUIRED = 35.0  # 합류를 위해 확보해야 할 거리
 
@@ -237,9 +294,9 @@ def control_follower_speed(follower_id, leader_id):
         # 일반 끼어들기(Cut-In) 양보 - CUT_IN_ACTIVE_PAIRS 기반
         # -----------------------------------------------------------------
         pair_key = (leader_id, follower_id)
-        if pair_key in CUT_IN_ACTIVE_PAIRS:
-            # config 값과 통일
-            YIELD_TARGET_GAP = float(CUT_IN_EXPAND_GAP)
+        if pair_key in rt.cut_in_active_pairs:
+            # 프로파일 값과 통일
+            YIELD_TARGET_GAP = float(prof.cut_in_expand_gap)
             MARGIN = 5.0  # 목표 ±5m 안쪽이면 강제 제어 X
 
             target_id, gap_m = _pick_front_target(follower_id, leader_id, lookahead=250.0)
@@ -289,7 +346,19 @@ def control_follower_speed(follower_id, leader_id):
         # 일반 주행 (Normal CACC) - PD + Catch-up
         # -----------------------------------------------------------------
         target_id, gap_m = _pick_front_target(follower_id, leader_id, lookahead=250.0)
-        vT = traci.vehicle.getSpeed(target_id) if target_id in traci.vehicle.getIDList() else vF
+        # 앞차 속도/가속도: V2V 마지막 수신값 (체인 밖 차량이거나 아직 수신 없으면 센서값)
+        msg = rt.v2v.receive(target_id)
+        if msg is not None:
+            vT, aL = msg[0], msg[1]
+        else:
+            vT = traci.vehicle.getSpeed(target_id) if target_id in traci.vehicle.getIDList() else vF
+            try:
+                if target_id in traci.vehicle.getIDList():
+                    aL = traci.vehicle.getAcceleration(target_id)
+                else:
+                    aL = 0.0
+            except:
+                aL = 0.0
 
         # 앞차를 못 찾는 경우 → 보수적으로 감속
         if gap_m is None:
@@ -298,22 +367,20 @@ def control_follower_speed(follower_id, leader_id):
             return
 
         # CACC 기준 간격
-        base_ref_gap = STANDSTILL_GAP + TIME_HEADWAY * max(vF, 0.0)
+        base_ref_gap = prof.standstill_gap + prof.time_headway * max(vF, 0.0)
         target_gap = base_ref_gap
 
         err  = gap_m - target_gap
         vrel = vT - vF
+        metrics.set_gauge("platoon_gap_meters", gap_m, follower=follower_id, leader=leader_id)
+        metrics.set_gauge("platoon_gap_error_meters", err, follower=follower_id, leader=leader_id)
 
-        try:
-            if target_id in traci.vehicle.getIDList():
-                aL = traci.vehicle.getAcceleration(target_id)
-            else:
-                aL = 0.0
-        except:
-            aL = 0.0
+        # 같은 스텝 제동 채널: 체인 앞쪽 제동 명령을 (한 스텝 늦은) 측정 가속도보다 먼저 반영
+        if prof.brake_feed_forward:
+            aL = min(aL, rt.brake_channel.feed_forward(follower_id, traci.simulation.getTime()))
 
-        a_cmd = aL + _KP * err + _KD * vrel
-        v_cmd = vF + a_cmd * _DT
+        a_cmd = aL + prof.kp * err + prof.kd * vrel
+        v_cmd = vF + a_cmd * rt.dt
 
         # --- Catch-up: 너무 멀어지면 상한 푼 후, 추격---
         if err > 10.0:
@@ -322,7 +389,7 @@ def control_follower_speed(follower_id, leader_id):
                 traci.vehicle.setMaxSpeed(follower_id, 40.0)
             except:
                 pass
-            catch_bonus = min(6.0, err * CATCH_GAIN * 0.25)
+            catch_bonus = min(6.0, err * prof.catch_gain * 0.25)
             v_cmd = max(v_cmd, vT + catch_bonus)
             v_cap = 40.0
             v_cmd = max(0.0, min(v_cmd, v_cap))
@@ -344,6 +411,7 @@ def control_follower_speed(follower_id, leader_id):
             v_cmd = min(v_cmd, vT - 1.0)
 
         traci.vehicle.setSpeed(follower_id, v_cmd)
+        _update_settled(rt, follower_id, leader_id, target_id, err, vrel, aL, settle_count)
 
     except traci.exceptions.TraCIException:
         pass
@@ -352,14 +420,15 @@ def control_follower_speed(follower_id, leader_id):
 # -----------------------------------------------------------------------------
 def boost_followers_once():
     """출발 직후 상한 풀기(모든 팔로워 대상) — 끼어들기 중이면 스킵"""
+    rt = runtime.current()
     try:
-        current_followers = set(cfg.FOLLOWERS) 
+        current_followers = set(rt.followers)
         for vid in traci.simulation.getDepartedIDList():
-            if vid in current_followers and vid not in _boosted:
+            if vid in current_followers and vid not in rt.boosted:
                 # 끼어들기 중이면 부스트 금지
                 # FOLLOW_PAIRS에서 내 지정 리더를 찾아 타겟 비교
                 try:
-                    designated = next((l for (f, l) in cfg.FOLLOW_PAIRS if f == vid), None)
+                    designated = next((l for (f, l) in rt.follow_pairs if f == vid), None)
                 except Exception:
                     designated = None
                 if designated:
@@ -368,11 +437,11 @@ def boost_followers_once():
                         continue
 
                 try:
-                    traci.vehicle.setMaxSpeed(vid, V_MAX_FOLLOW)  
+                    traci.vehicle.setMaxSpeed(vid, rt.profile.v_max_follow)
                     traci.vehicle.setSpeedMode(vid, 31)        
                 except traci.exceptions.TraCIException:
                     pass
-                _boosted.add(vid)
+                rt.boosted.add(vid)
     except traci.exceptions.TraCIException:
         pass
 
@@ -404,7 +473,7 @@ def switch_to_cacc(veh_id: str) -> bool:
             traci.vehicle.setMinGap(veh_id, 3.0)
         except traci.exceptions.TraCIException:
             pass
-        print(f"[DEBUG] {veh_id} -> {traci.vehicle.getTypeID(veh_id)} 전환 완료")
+        events.emit("vtype", f"{veh_id} -> truckCACC 전환 완료", vid=veh_id, vtype="truckCACC")
         return True
     except traci.exceptions.TraCIException:
         return False
@@ -434,7 +503,7 @@ def switch_to_basic(veh_id: str) -> bool:
         except traci.exceptions.TraCIException:
             pass
 
-        print(f"[CACC 이탈] {veh_id} 차량 타입 복귀 완료 → {traci.vehicle.getTypeID(veh_id)}")
+        events.emit("vtype", f"{veh_id} 차량 타입 복귀 완료 → truckBASIC", vid=veh_id, vtype="truckBASIC")
         return True
     except traci.exceptions.TraCIException:
         return False
@@ -0,0 +1,163 @@
+# simulation/plots_ui.py
+# 속도/간격 시계열 플롯 창 (Tk 캔버스 2개)
+# - 계열마다 create_line 1개를 만들어 두고 좌표만 교체 (아이템 수 = 계열 수, 고정)
+# - 좌표는 TimeSeriesBuffer.decimate() 의 칸별 min/max → 계열당 점 2 × 폭 (샘플 수와 무관)
+# - 샘플링은 app 메인 루프에서 프레임마다 (sim time 기준 sample_dt 간격), 다시 그리기는 REDRAW_MS 마다
+import tkinter as tk
+
+import numpy as np
+
+from simulation.timeseries import TimeSeriesBuffer
+
+REDRAW_MS = 500
+PALETTE = ("#ff3b30", "#ffaa34", "#d4b800", "#23d750", "#1f6fd1", "#8e44ad", "#e91e63",
+           "#00897b", "#6d4c41", "#546e7a")
+PAD_L, PAD_R, PAD_T, PAD_B = 44, 10, 18, 20
+
+
+class SeriesPlot:
+    """캔버스 1개 = 지표 1개 (여러 계열)"""
+    def __init__(self, parent, title, unit, width=720, height=200):
+        self.canvas = tk.Canvas(parent, width=width, height=height, bg="white", highlightthickness=0)
+        self.title = title
+        self.unit = unit
+        self.lines = {}        # key -> line item
+        self.labels = []
+        self.canvas.create_text(PAD_L, 2, text=f"{title} [{unit}]", anchor="nw", font=("Arial", 9, "bold"))
+        self.axis = self.canvas.create_rectangle(0, 0, 0, 0, outline="#cccccc")
+        self.y_text = (self.canvas.create_text(PAD_L - 4, 0, anchor="e", font=("Consolas", 8)),
+                       self.canvas.create_text(PAD_L - 4, 0, anchor="e", font=("Consolas", 8)))
+        self.x_text = self.canvas.create_text(0, 0, anchor="ne", font=("Consolas", 8))
+
+    def _line(self, key, color):
+        item = self.lines.get(key)
+        if item is None:
+            item = self.lines[key] = self.canvas.create_line(0, 0, 0, 0, fill=color, width=1)
+        return item
+
+    def draw(self, buf, keys, names, window_s):
+        c = self.canvas
+        w, h = max(50, c.winfo_width()), max(50, c.winfo_height())
+        x0, x1, y0, y1 = PAD_L, w - PAD_R, PAD_T, h - PAD_B
+        c.coords(self.axis, x0, y0, x1, y1)
+        t_hi = buf.latest_t()
+        for key in [k for k in self.lines if k not in keys]:
+            c.delete(self.lines.pop(key))
+        if t_hi is None:
+            return
+        t_lo = t_hi - window_s
+        width = int(x1 - x0)
+        keys, lo, hi = buf.decimate(keys, t_lo, t_hi, width)
+        if not keys or np.isnan(lo).all():
+            return
+        v_min = float(np.nanmin(lo))
+        v_max = float(np.nanmax(hi))
+        if v_max - v_min < 1e-6:
+            v_max = v_min + 1.0
+        scale = (y1 - y0) / (v_max - v_min)
+        xs = x0 + np.arange(width, dtype=float)
+        for i, key in enumerate(keys):
+            item = self._line(key, PALETTE[i % len(PALETTE)])
+            ok = ~np.isnan(lo[i])
+            if ok.sum() < 1:
+                c.coords(item, 0, 0, 0, 0)
+                continue
+            x = xs[ok]
+            ya = y1 - (lo[i][ok] - v_min) * scale
+            yb = y1 - (hi[i][ok] - v_min) * scale
+            # 칸마다 min→max 세로선을 지그재그로 이어 한 폴리라인으로
+            pts = np.empty((x.size * 2, 2))
+            pts[0::2, 0] = x
+            pts[1::2, 0] = x
+            pts[0::2, 1] = ya
+            pts[1::2, 1] = yb
+            flat = pts.ravel().tolist()
+            if len(flat) < 4:
+                flat += flat
+            c.coords(item, *flat)
+        c.itemconfig(self.y_text[0], text=f"{v_max:.1f}")
+        c.coords(self.y_text[0], x0 - 4, y0)
+        c.itemconfig(self.y_text[1], text=f"{v_min:.1f}")
+        c.coords(self.y_text[1], x0 - 4, y1)
+        c.itemconfig(self.x_text, text=f"t={t_lo:.0f}…{t_hi:.0f}s")
+        c.coords(self.x_text, x1, y1 + 4)
+        self._legend(keys, names, x0, y0)
+
+    def _legend(self, keys, names, x0, y0):
+        c = self.canvas
+        text = [names.get(k, k) for k in keys]
+        while len(self.labels) < len(text):
+            self.labels.append(c.create_text(0, 0, anchor="nw", font=("Consolas", 8)))
+        x = x0 + 120
+        for i, item in enumerate(self.labels):
+            if i < len(text) and i < len(PALETTE):
+                c.itemconfig(item, text=text[i], fill=PALETTE[i % len(PALETTE)])
+                c.coords(item, x, 3)
+                x += 8 * len(text[i]) + 10
+            else:
+                c.itemconfig(item, text="")
+
+
+class PlotWindow(tk.Toplevel):
+    """체인 멤버 속도 + 쌍별 간격 (최근 window_s 초)"""
+    def __init__(self, parent, traci_mod, state, window_s=300.0, max_series=50):
+        super().__init__(parent)
+        self.title("Truck Platooning – Speed / Gap History")
+        self.geometry("+100+640")
+        self.traci = traci_mod
+        self.rt = state
+        self.window_s = window_s
+        self.max_series = max_series
+        # 속도(차량) + 간격(쌍) 계열이 같은 시간축 공유
+        self.buf = TimeSeriesBuffer(window_s=window_s, slots=2 * max_series)
+        self.speed = SeriesPlot(self, "속도", "km/h")
+        self.gap = SeriesPlot(self, "간격", "m")
+        self.speed.canvas.pack(fill="both", expand=True)
+        self.gap.canvas.pack(fill="both", expand=True)
+        self._speed_keys = []
+        self._gap_keys = []
+        self._names = {}
+        self.after(REDRAW_MS, self._redraw)
+
+    def sample(self, sim_t, chain):
+        """메인 루프에서 프레임마다 호출 (sample_dt 보다 촘촘하면 무시)"""
+        buf = self.buf
+        if buf.count and sim_t - buf.latest_t() < buf.sample_dt - 1e-9:
+            return
+        veh = self.traci.vehicle
+        exc = self.traci.exceptions.TraCIException
+        chain = list(chain)[:self.max_series]
+        samples = {}
+        for vid in chain:
+            try:
+                samples[("v", vid)] = veh.getSpeed(vid) * 3.6
+            except exc:
+                pass
+        for f, l in self.rt.follow_pairs:
+            if f not in chain:
+                continue
+            try:
+                info = veh.getLeader(f, 250.0)
+            except exc:
+                continue
+            if info and info[0] == l:
+                samples[("g", f)] = info[1]
+        # 체인에서 빠진 키는 슬롯 반납 (히스토리도 함께 사라짐)
+        live = set(samples) | {("v", v) for v in chain} | {("g", v) for v in chain[1:]}
+        for key in [k for k in buf.slot_of if k not in live]:
+            buf.release(key)
+        buf.push(sim_t, samples)
+        self._speed_keys = [("v", v) for v in chain]
+        self._gap_keys = [("g", v) for v in chain[1:]]
+        self._names = {**{("v", v): v for v in chain}, **{("g", f): f"{l}→{f}" for f, l in self.rt.follow_pairs}}
+
+    def _redraw(self):
+        try:
+            self.speed.draw(self.buf, self._speed_keys, self._names, self.window_s)
+            self.gap.draw(self.buf, self._gap_keys, self._names, self.window_s)
+        finally:
+            self.after(REDRAW_MS, self._redraw)
+
+
+def open_plot_window(parent, traci_mod, state, window_s=300.0):
+    return PlotWindow(parent, traci_mod, state, window_s=window_s)
@@ -0,0 +1,146 @@
+# simulation/profile.py
+# 시나리오 프로파일 (불변 설정 객체)
+# - SUMO 인자, 스텝 길이, 간격/게인, 끼어들기 상수를 한 곳에 묶은 frozen dataclass
+# - TOML/JSON 파일에서 로드 → 엔진에 명시적으로 전달 (모듈 전역을 바꾸지 않음)
+# - 해시 가능 + digest() 로 내용 해시 → 병렬 워커/결과 캐시 키로 사용
+import dataclasses
+import hashlib
+import json
+import os
+from dataclasses import dataclass
+from typing import Optional, Tuple
+
+from simulation import config as _defaults
+
+
+@dataclass(frozen=True)
+class ScenarioProfile:
+    name: str = "default"
+
+    # --- SUMO 실행 ---
+    sumo_binary: str = "sumo-gui"
+    sumo_cfg: str = "map/final.sumocfg"
+    step_length: float = 0.05                 # [s] SUMO 적분 스텝 (미세 스텝)
+    coarse_step: float = 0.0                  # [s] 정상 상태에서 한 번에 진행할 시간 (0이면 항상 step_length)
+    delay_ms: int = 0                         # sumo-gui --delay (기본 0: 속도는 app 의 실시간 페이싱이 맞춤)
+    lateral_resolution: float = 0.1
+    collision_action: str = "warn"
+    collision_mingap_factor: float = 1.0
+    seed: Optional[int] = None                # None이면 SUMO 기본 시드
+    extra_args: Tuple[str, ...] = ()
+
+    # --- 간격/게인 ---
+    desired_gap: float = _defaults.DESIRED_GAP
+    catch_gain: float = _defaults.CATCH_GAIN
+    brake_gain: float = _defaults.BRAKE_GAIN
+    v_max_follow: float = _defaults.V_MAX_FOLLOW
+    standstill_gap: float = _defaults.STANDSTILL_GAP
+    time_headway: float = _defaults.TIME_HEADWAY
+    kp: float = 0.8                           # CACC PD 게인 (간격 오차)
+    kd: float = 0.4                           # CACC PD 게인 (상대 속도)
+    platoon_join_distance: float = _defaults.PLATOON_JOIN_DISTANCE
+    brake_feed_forward: bool = True           # 리더 제동을 같은 스텝에 팔로워 제어에 반영
+    safety_monitor: bool = True               # 전체 차량 TTC/헤드웨이/DRAC 모니터 (NumPy 필요)
+    settle_every: int = 0                     # 정상 상태 쌍은 이 스텝마다 한 번만 제어 (0/1이면 매 스텝)
+
+    # --- V2V 통신 (기본값 = 지연/손실 없음, 매 스텝 송신) ---
+    v2v_delay_steps: int = 0                  # 지연 = 기본 스텝 수 × step_length [s] (적응형 스텝과 무관)
+    v2v_drop_prob: float = 0.0
+    v2v_rate_hz: float = 0.0                  # 0이면 매 스텝 송신
+
+    # --- 배경 교통 생성기 (traffic.py, 수요가 비어 있으면 끔) ---
+    traffic_demand: Tuple[Tuple[float, float], ...] = ()   # [(sim t [s], veh/h/lane), ...] 구간 선형
+    traffic_routes: Tuple[str, ...] = ()      # 사용할 route ID (비우면 도로망의 모든 경로)
+    traffic_vtype: str = "DEFAULT_VEHTYPE"
+    traffic_batch_s: float = 1.0              # [s] 삽입 주기 (이 간격마다 모아서 add)
+    traffic_max_pending: int = 500            # SUMO 삽입 대기열 상한 (넘으면 배치 생략)
+
+    # --- 끼어들기 대응 ---
+    cut_in_expand_gap: float = _defaults.CUT_IN_EXPAND_GAP
+    cut_in_approach_distance: float = _defaults.CUT_IN_APPROACH_DISTANCE
+    cut_in_deceleration: float = _defaults.CUT_IN_DECELERATION
+    cut_in_expansion_rate: float = _defaults.CUT_IN_EXPANSION_RATE
+
+    def __post_init__(self):
+        # 불변/해시 보장: 리스트로 들어와도 튜플로 고정
+        if not isinstance(self.extra_args, tuple):
+            object.__setattr__(self, "extra_args", tuple(self.extra_args))
+        object.__setattr__(self, "traffic_routes", tuple(self.traffic_routes))
+        demand = tuple((float(t), float(r)) for t, r in self.traffic_demand)
+        object.__setattr__(self, "traffic_demand", demand)
+        if self.step_length <= 0:
+            raise ValueError(f"step_length must be > 0 (got {self.step_length})")
+        if not 0.0 <= self.v2v_drop_prob < 1.0:
+            raise ValueError(f"v2v_drop_prob must be in [0, 1) (got {self.v2v_drop_prob})")
+        if any(r < 0 for _, r in demand) or any(a[0] > b[0] for a, b in zip(demand, demand[1:])):
+            raise ValueError(f"traffic_demand must be [(t, veh/h/lane >= 0), ...] sorted by t (got {demand})")
+
+    # -------- SUMO --------
+    def sumo_args(self, binary=None):
+        """traci.start 에 넘길 명령행"""
+        args = [
+            binary or self.sumo_binary,
+            "-c", self.sumo_cfg,
+            "--step-length", f"{self.step_length:g}",
+            "--lateral-resolution", f"{self.lateral_resolution:g}",
+            "--collision.action", self.collision_action,
+            "--collision.mingap-factor", f"{self.collision_mingap_factor:g}",
+        ]
+        if (binary or self.sumo_binary).endswith("sumo-gui") and self.delay_ms:
+            args += ["--delay", str(self.delay_ms)]
+        if self.seed is not None:
+            args += ["--seed", str(self.seed)]
+        return args + list(self.extra_args)
+
+    # -------- 변환/해시 --------
+    def replace(self, **changes):
+        """일부 값만 바꾼 새 프로파일"""
+        return dataclasses.replace(self, **changes)
+
+    def to_dict(self):
+        d = {f.name: getattr(self, f.name) for f in dataclasses.fields(self) if f.init}
+        d["extra_args"] = list(self.extra_args)
+        d["traffic_demand"] = [list(p) for p in self.traffic_demand]
+        d["traffic_routes"] = list(self.traffic_routes)
+        return d
+
+    def digest(self):
+        """내용 해시 (이름 제외) — 같은 설정이면 같은 값"""
+        d = self.to_dict()
+        d.pop("name", None)
+        blob = json.dumps(d, sort_keys=True, separators=(",", ":"))
+        return hashlib.sha1(blob.encode("utf-8")).hexdigest()[:16]
+
+    @classmethod
+    def from_dict(cls, data):
+        """평평한 dict 또는 [sumo]/[gains]/[v2v]/[traffic]/[cut_in] 섹션 dict 모두 허용"""
+        flat = {}
+        for k, v in data.items():
+            if isinstance(v, dict):
+                flat.update(v)
+            else:
+                flat[k] = v
+        known = {f.name for f in dataclasses.fields(cls) if f.init}
+        unknown = sorted(set(flat) - known)
+        if unknown:
+            raise ValueError(f"unknown profile keys: {', '.join(unknown)}")
+        return cls(**flat)
+
+
+DEFAULT = ScenarioProfile()
+
+
+def load_profile(path):
+    """TOML(.toml) 또는 JSON 파일 → ScenarioProfile (name 없으면 파일명)"""
+    if path.endswith(".toml"):
+        try:
+            import tomllib
+        except ImportError:  # Python < 3.11
+            raise ValueError("TOML 프로파일은 Python 3.11 이상 필요 (JSON을 사용하세요)")
+        with open(path, "rb") as fh:
+            data = tomllib.load(fh)
+    else:
+        with open(path, "r", encoding="utf-8") as fh:
+            data = json.load(fh)
+    data.setdefault("name", os.path.splitext(os.path.basename(path))[0])
+    return ScenarioProfile.from_dict(data)
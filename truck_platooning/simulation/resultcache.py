@@ -0,0 +1,156 @@
+# simulation/resultcache.py
+# 내용 주소 실행 결과 캐시 (스윕/회귀 실행에서 같은 설정 재계산 방지)
+# - 키 = sha1(도로망/경로/추가 파일 + sumocfg 내용, 결과에 영향 주는 프로파일 값(시드 포함), 체인, max_steps, 코드 버전)
+#   · 화면/속도만 바꾸는 값(name, sumo_binary, delay_ms)은 키에서 제외
+#   · 코드 버전 = simulation/*.py 소스 내용 해시 (git 없이도 코드가 바뀌면 키가 바뀜)
+# - 항목 = <root>/<키>/result.json (+ 선택 traces.json: 쌍별 간격 통계 행)
+# - LRU: 조회 시 항목 mtime 갱신, 전체 크기가 max_bytes 를 넘으면 오래된 항목부터 삭제
+import hashlib
+import json
+import os
+import shutil
+import time
+
+from simulation import metrics
+from simulation import netindex
+
+DEFAULT_ROOT = "results/cache"
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+KEY_VERSION = 1
+_NON_RESULT_FIELDS = ("name", "sumo_binary", "delay_ms")
+
+_code_version = None
+
+
+def code_version():
+    """simulation 패키지 소스 해시 (프로세스당 1회 계산)"""
+    global _code_version
+    if _code_version is None:
+        pkg = os.path.dirname(os.path.abspath(__file__))
+        h = hashlib.sha1()
+        for name in sorted(os.listdir(pkg)):
+            if name.endswith(".py"):
+                h.update(name.encode("utf-8"))
+                with open(os.path.join(pkg, name), "rb") as fh:
+                    h.update(fh.read())
+        _code_version = h.hexdigest()[:16]
+    return _code_version
+
+
+def scenario_digest(sumocfg_path):
+    """sumocfg + net/route/additional 파일 내용 해시"""
+    net_file, route_files, add_files = netindex._sumocfg_inputs(sumocfg_path)
+    return netindex._digest([sumocfg_path, net_file] + route_files + add_files)
+
+
+def run_key(profile, chain=None, max_steps=None):
+    """실행 1회의 캐시 키 (같은 입력 → 같은 결과가 나오는 설정이면 같은 키)"""
+    config = profile.to_dict()
+    for k in _NON_RESULT_FIELDS:
+        config.pop(k, None)
+    blob = json.dumps({"v": KEY_VERSION, "scenario": scenario_digest(profile.sumo_cfg), "profile": config,
+                       "chain": list(chain) if chain else None, "max_steps": max_steps,
+                       "code": code_version()}, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha1(blob.encode("utf-8")).hexdigest()
+
+
+class ResultCache:
+    def __init__(self, root=DEFAULT_ROOT, max_bytes=DEFAULT_MAX_BYTES):
+        self.root = root
+        self.max_bytes = int(max_bytes)
+        self.hits = 0
+        self.misses = 0
+        self.evicted = 0
+        self.saved_s = 0.0        # 적중으로 아낀 시간 (저장된 실행 wall 시간 합)
+
+    def _dir(self, key):
+        return os.path.join(self.root, key)
+
+    def get(self, key):
+        """저장된 결과 dict (없거나 손상이면 None). 적중하면 LRU 시각 갱신"""
+        path = os.path.join(self._dir(key), "result.json")
+        try:
+            with open(path, "r", encoding="utf-8") as fh:
+                entry = json.load(fh)
+        except (OSError, ValueError):
+            self.misses += 1
+            metrics.inc("result_cache_lookups", outcome="miss")
+            return None
+        now = time.time()
+        try:
+            os.utime(self._dir(key), (now, now))
+        except OSError:
+            pass
+        self.hits += 1
+        self.saved_s += entry.get("wall_s") or 0.0
+        metrics.inc("result_cache_lookups", outcome="hit")
+        result = entry["result"]
+        result["cached"] = True
+        traces = os.path.join(self._dir(key), "traces.json")
+        if os.path.exists(traces):
+            result["traces_path"] = traces
+        return result
+
+    def put(self, key, result, wall_s=None, traces=None):
+        """결과 저장 (임시 디렉터리에 쓰고 rename → 동시 실행이 반쯤 쓴 항목을 읽지 않음) 후 크기 제한 적용"""
+        final = self._dir(key)
+        tmp = f"{final}.tmp{os.getpid()}"
+        try:
+            os.makedirs(tmp, exist_ok=True)
+            with open(os.path.join(tmp, "result.json"), "w", encoding="utf-8") as fh:
+                json.dump({"key": key, "stored": time.time(), "wall_s": wall_s, "result": result},
+                          fh, ensure_ascii=False, default=str)
+            if traces is not None:
+                with open(os.path.join(tmp, "traces.json"), "w", encoding="utf-8") as fh:
+                    json.dump(traces, fh, ensure_ascii=False, default=str)
+            if os.path.isdir(final):
+                shutil.rmtree(final, ignore_errors=True)
+            os.replace(tmp, final)
+        except OSError:
+            shutil.rmtree(tmp, ignore_errors=True)
+            return False
+        self.evict()
+        return True
+
+    # -------- LRU --------
+    def entries(self):
+        """[(마지막 사용 시각, 크기 bytes, 키)] 오래된 순"""
+        out = []
+        try:
+            names = os.listdir(self.root)
+        except OSError:
+            return out
+        for name in names:
+            d = os.path.join(self.root, name)
+            if ".tmp" in name or not os.path.isdir(d):
+                continue
+            try:
+                size = sum(e.stat().st_size for e in os.scandir(d) if e.is_file())
+                out.append((os.stat(d).st_mtime, size, name))
+            except OSError:
+                continue
+        out.sort()
+        return out
+
+    def evict(self):
+        """전체 크기가 max_bytes 이하가 될 때까지 가장 오래 안 쓴 항목 삭제. 삭제 수 반환"""
+        entries = self.entries()
+        total = sum(size for _, size, _ in entries)
+        n = 0
+        for _, size, key in entries:
+            if total <= self.max_bytes:
+                break
+            shutil.rmtree(self._dir(key), ignore_errors=True)
+            total -= size
+            n += 1
+        self.evicted += n
+        return n
+
+    def report(self):
+        entries = self.entries()
+        lookups = self.hits + self.misses
+        return {"root": self.root, "hits": self.hits, "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else None,
+                "saved_wall_s": round(self.saved_s, 2), "evicted": self.evicted,
+                "entries": len(entries), "bytes": sum(size for _, size, _ in entries),
+                "max_bytes": self.max_bytes}
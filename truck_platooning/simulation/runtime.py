@@ -0,0 +1,79 @@
+# simulation/runtime.py
+# 실행 중 바뀌는 상태 (불변 프로파일과 분리)
+# - 체인 구성, 참여 후보, 끼어들기/합류 양보 플래그 등
+# - 엔진 하나당 RuntimeState 하나. 제어 모듈은 current() 로 현재 엔진의 상태를 읽음
+#   (traci.switch 처럼 엔진이 스텝 전에 activate)
+from simulation import metrics
+from simulation.profile import DEFAULT
+from simulation.brake_controller import BrakeChannel
+from simulation.v2v import V2VChannel
+
+
+class RuntimeState:
+    def __init__(self, profile=DEFAULT, label="default", net=None):
+        self.profile = profile            # 읽기 전용 참조 (ScenarioProfile)
+        self.label = label                # TraCI 연결 label
+        self.net = net                    # 이 실행의 NetIndex (None이면 공용 인덱스)
+        self.dt = profile.step_length     # 마지막 스텝의 실제 sim 시간 간격 (적응형 스텝이면 가변)
+        self.follow_pairs = []            # [(follower, leader), ...]
+        self.followers = []
+        self.vehicle_distances = {}       # 비플래투닝 트럭 -> 가장 가까운 체인 멤버까지 경로 거리 [m]
+        self.started = set()              # '출발' 버튼으로 출발한 차량
+        self.nearby_platoon = {}          # 참여 후보: {미참여 차량: [(플래투닝 차량, 거리), ...]} (candidates.py)
+        self.join_scores = {}             # 미참여 차량 -> 리더 목적지까지 경로 겹침 비율 (0~1)
+        self.cut_in_active_pairs = {}     # {(leader_id, follower_id): True} - 끼어들기 접근 중인 쌍
+        self.yielding_for_merge = set()   # 합류 차량에게 양보 중인 뒷차
+        self.brake_channel = BrakeChannel()  # 같은 스텝 제동 전파 (리더 제동 → 팔로워 feed-forward)
+        self.v2v = V2VChannel.from_profile(profile)  # 체인 멤버 간 모의 V2V (지연/손실/주기)
+
+        # 제어/스케줄러 상태 (platoon, maneuvers)
+        self.startup_lock_done = {}       # follower_id -> bool
+        self.startup_lock_until = {}      # follower_id -> float
+        self.boosted = set()              # 출발 1회 상한 풀기 마킹
+        self.lane_mode_restore = {}       # vid -> restore_time (sim time)
+        self.pending_merge = {}           # vid -> (front_id, target_lane_idx)
+        self.merge_coordinator = {}       # vid -> {'front', 'rear', 'state'}
+        self.join_cooldown = {}           # vid -> until_time (sim time)
+        self.leave_guard = {}             # rear_vid -> (until_time, departing_vid)
+        self.settle_count = {}            # follower -> 연속으로 정상 상태 대역 안에 든 제어 횟수
+        self.settled = {}                 # follower -> {'leader', 'aL', 'left'} (제어 건너뛰는 쌍, platoon.skip_settled)
+
+    def set_pairs(self, pairs):
+        """체인 구성 교체 (follow_pairs/followers 함께 갱신)"""
+        # 이탈/재합류/순서 변경으로 사라진 쌍의 간격 게이지 제거 (안 지우면 마지막 값으로 남음)
+        for f, l in set(self.follow_pairs) - set(pairs):
+            metrics.remove_gauge("platoon_gap_meters", follower=f, leader=l)
+            metrics.remove_gauge("platoon_gap_error_meters", follower=f, leader=l)
+        self.follow_pairs = list(pairs)
+        self.followers = [f for f, _ in self.follow_pairs]
+        # 구성이 바뀌면 건너뛰던 쌍 모두 깨움
+        self.settled.clear()
+        self.settle_count.clear()
+
+    def forget(self, vids):
+        """도착(네트워크 이탈)한 차량의 차량별 상태 정리 (체인 구성 follow_pairs 는 그대로)"""
+        for d in (self.vehicle_distances, self.nearby_platoon, self.join_scores, self.startup_lock_done,
+                  self.startup_lock_until, self.lane_mode_restore, self.pending_merge,
+                  self.merge_coordinator, self.join_cooldown, self.leave_guard, self.settle_count,
+                  self.settled):
+            for vid in vids:
+                d.pop(vid, None)
+        self.started -= vids
+        self.yielding_for_merge -= vids
+        self.boosted -= vids
+        for key in [k for k in self.cut_in_active_pairs if k[0] in vids or k[1] in vids]:
+            del self.cut_in_active_pairs[key]
+
+
+_active = RuntimeState()
+
+
+def current():
+    """현재 활성 엔진의 런타임 상태"""
+    return _active
+
+
+def activate(state):
+    global _active
+    _active = state
+    return state
@@ -1,5 +1,10 @@
 # simulation/safety.py
-import traci
+# 안전 기본값(SpeedMode/비상 감속도) + 전체 차량 근접 위험 모니터
+import time
+
+from simulation.traci_cache import traci
+from simulation import events
+from simulation import metrics
 
 def init_safety_defaults():
     """
@@ -23,4 +28,175 @@ def init_safety_defaults():
                 pass
 
     except traci.exceptions.TraCIException:
-        pass
\ No newline at end of file
+        pass
+
+# ===== 안전 모니터 (TTC / 헤드웨이 / DRAC, 전체 차량) =====
+# - 차량 상태는 변수 구독(subscribe) → 스텝마다 getAllSubscriptionResults() 1회 왕복으로 전체 스냅샷
+# - 같은 차선에서 바로 앞 차량을 리더로 보고 (차선, 위치) 정렬 한 번으로 모든 쌍을 만든 뒤
+#   TTC/헤드웨이/DRAC 를 NumPy 배열 연산 한 번에 계산 (쌍 수천 개도 파이썬 루프 없음)
+#   · 차선 경계를 넘는 쌍(리더가 다음 엣지에 있는 경우)은 그 스텝에는 제외
+# - 임계값을 넘은 쌍은 레이트 리밋 이벤트, 실행 단위 KPI(최소 TTC, TET/TIT, 최대 DRAC, 충돌) 누적
+# - NumPy 는 모니터를 만들 때만 import (엔진 import 경로에 넣지 않음)
+TTC_CRIT = 3.0            # [s] 이 미만이면 근접 위험 (TET/TIT 기준)
+HEADWAY_CRIT = 0.3        # [s] 시간 간격 하한 (플래투닝 목표 헤드웨이보다 작게)
+DRAC_CRIT = 3.35          # [m/s²] 충돌 회피에 필요한 감속도 상한
+EVENT_EVERY = 2.0         # 같은 쌍 위험 이벤트 최소 간격 (벽시계 초)
+
+np = None
+
+
+def _numpy():
+    global np
+    if np is None:
+        import numpy
+        np = numpy
+    return np
+
+
+def pair_metrics(lane_code, pos, length, speed):
+    """차량 배열 → (follower 인덱스, leader 인덱스, gap, ttc, headway, drac) (모두 NumPy 배열)
+    lane_code: 차선 정수 코드, pos: 차선 위치(앞 범퍼), length: 차량 길이, speed: 속도"""
+    n = _numpy()
+    order = n.lexsort((pos, lane_code))
+    same = lane_code[order[1:]] == lane_code[order[:-1]]
+    fol = order[:-1][same]
+    lead = order[1:][same]
+    gap = pos[lead] - length[lead] - pos[fol]
+    vf = speed[fol]
+    dv = vf - speed[lead]                          # >0 이면 접근 중
+    closing = (dv > 0.0) & (gap > 0.0)
+    with n.errstate(divide="ignore", invalid="ignore"):
+        ttc = n.where(closing, gap / dv, n.inf)
+        headway = n.where(vf > 0.1, gap / vf, n.inf)
+        drac = n.where(closing, dv * dv / (2.0 * gap), 0.0)
+    ttc = n.where(gap <= 0.0, 0.0, ttc)            # 겹침(충돌 직전/직후)
+    return fol, lead, gap, ttc, headway, drac
+
+
+class SafetyMonitor:
+    VARS = None   # 구독 변수 (traci.constants, 처음 생성 시 설정)
+
+    def __init__(self):
+        _numpy()
+        if SafetyMonitor.VARS is None:
+            from traci import constants as tc
+            SafetyMonitor.VARS = (tc.VAR_LANE_ID, tc.VAR_LANEPOSITION, tc.VAR_SPEED, tc.VAR_LENGTH)
+        self._subscribed = set()
+        self._lane_codes = {}     # lane id -> 정수 코드
+        self.alert = False        # 이번 스텝 임계값 초과 쌍 존재 (적응형 스텝이 미세 스텝 유지)
+        self.last_pairs = 0
+        self.cost_s = 0.0         # 누적 계산 시간 (스냅샷 변환 + 배열 연산, TraCI 왕복 제외)
+        self.steps = 0
+        self.collisions = set()
+        # KPI (전체 / 플래투닝 쌍)
+        self.kpi = {scope: {"min_ttc": None, "min_headway": None, "max_drac": 0.0,
+                            "tet_s": 0.0, "tit_s2": 0.0, "alerts": 0}
+                    for scope in ("all", "platoon")}
+
+    def forget(self, vids):
+        """도착 차량 정리 (SUMO 가 구독도 함께 해제)"""
+        self._subscribed -= vids
+
+    def _subscribe_new(self, traci_mod, results):
+        """구독 안 된 차량(새로 출발/삽입) 구독 — 적응형 큰 스텝에서도 빠짐없이 getIDList 와 대조"""
+        ids = traci_mod.vehicle.getIDList()
+        if len(results) >= len(ids):
+            return
+        for vid in ids:
+            if vid not in results:
+                try:
+                    traci_mod.vehicle.subscribe(vid, self.VARS)
+                    self._subscribed.add(vid)
+                except traci_mod.exceptions.TraCIException:
+                    pass
+
+    def step(self, traci_mod, sim_t, dt, chain):
+        """매 스텝 1회 (제어 뒤): 스냅샷 → 전체 쌍 지표 → 이벤트/KPI"""
+        results = traci_mod.vehicle.getAllSubscriptionResults()
+        self._subscribe_new(traci_mod, results)
+        self._collisions(traci_mod, sim_t)
+
+        t0 = time.perf_counter()
+
+        v_lane, v_pos, v_speed, v_len = self.VARS
+        codes = self._lane_codes
+        ids, rows = [], []
+        for vid, r in results.items():
+            lid = r.get(v_lane)
+            if not lid:                       # 주차 중 / 교차로 내부 정보 없음
+                continue
+            c = codes.get(lid)
+            if c is None:
+                c = codes[lid] = len(codes)
+            ids.append(vid)
+            rows.append((c, r[v_pos], r[v_len], r[v_speed]))
+        n = len(ids)
+        self.alert = False
+        self.last_pairs = 0
+        if n < 2:
+            return
+
+        snap = np.array(rows, dtype=float)            # (n, 4) 한 번에 변환
+        fol, lead, gap, ttc, headway, drac = pair_metrics(snap[:, 0], snap[:, 1], snap[:, 2], snap[:, 3])
+        members = set(chain)
+        in_platoon = np.fromiter((v in members for v in ids), dtype=bool, count=n)
+        plat = in_platoon[fol] & in_platoon[lead]
+        risky = (ttc < TTC_CRIT) | (headway < HEADWAY_CRIT) | (drac > DRAC_CRIT)
+        self._accumulate("all", ttc, headway, drac, dt)
+        if plat.any():
+            self._accumulate("platoon", ttc[plat], headway[plat], drac[plat], dt)
+        self.cost_s += time.perf_counter() - t0
+        self.steps += 1
+        self.last_pairs = int(fol.size)
+
+        if risky.any():
+            self.alert = True
+            for k in np.flatnonzero(risky):
+                f, l = ids[fol[k]], ids[lead[k]]
+                key = f"near_miss:{f}"
+                if not events.should_emit(key, EVENT_EVERY):
+                    continue
+                if events.emit("near_miss", f"{f}→{l} TTC {ttc[k]:.2f}s, 헤드웨이 {headway[k]:.2f}s, DRAC {drac[k]:.2f}",
+                               key=key, every=EVENT_EVERY, vid=f, leader=l,
+                               gap=round(float(gap[k]), 2), ttc=round(float(ttc[k]), 3),
+                               headway=round(float(headway[k]), 3), drac=round(float(drac[k]), 3),
+                               platoon=bool(plat[k])):
+                    self.kpi["all"]["alerts"] += 1
+                    if plat[k]:
+                        self.kpi["platoon"]["alerts"] += 1
+
+    def _accumulate(self, scope, ttc, headway, drac, dt):
+        k = self.kpi[scope]
+        if ttc.size == 0:
+            return
+        m = float(ttc.min())
+        if np.isfinite(m) and (k["min_ttc"] is None or m < k["min_ttc"]):
+            k["min_ttc"] = m
+        h = float(headway.min())
+        if np.isfinite(h) and (k["min_headway"] is None or h < k["min_headway"]):
+            k["min_headway"] = h
+        k["max_drac"] = max(k["max_drac"], float(drac.max()))
+        low = ttc < TTC_CRIT
+        if low.any():
+            # TET: TTC 임계 미만 노출 시간(쌍 합), TIT: (임계 - TTC) 적분
+            k["tet_s"] += float(low.sum()) * dt
+            k["tit_s2"] += float((TTC_CRIT - ttc[low]).sum()) * dt
+
+    def _collisions(self, traci_mod, sim_t):
+        try:
+            colliding = traci_mod.simulation.getCollidingVehiclesIDList()
+        except traci_mod.exceptions.TraCIException:
+            return
+        for vid in colliding:
+            if vid not in self.collisions:
+                self.collisions.add(vid)
+                metrics.inc("collisions")
+                events.emit("collision", f"{vid} 충돌 (t={sim_t:.2f})", vid=vid)
+
+    def summary(self):
+        out = {"ttc_crit_s": TTC_CRIT, "collisions": sorted(self.collisions),
+               "pairs_last_step": self.last_pairs,
+               "monitor_us_per_step": round(self.cost_s / self.steps * 1e6, 1) if self.steps else None}
+        for scope, k in self.kpi.items():
+            out[scope] = {key: (round(v, 3) if isinstance(v, float) else v) for key, v in k.items()}
+        return out
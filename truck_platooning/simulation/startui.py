@@ -2,12 +2,19 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
 
-def _get_pa0_ids(traci_mod):
-    """pa_0에 실제로 주차 중인 차량 ID만 반환"""
-    try:
-        return list(traci_mod.parkingarea.getVehicleIDs("pa_0"))
-    except Exception:
-        return []
+# 출발 주차장 (편성 계획이 주차장별 출발 시각을 계산하므로 모두 후보)
+PARKING_AREAS = ("pa_0", "pa_1", "pa_2")
+
+
+def _get_parked_ids(traci_mod):
+    """주차장에 실제로 주차 중인 차량 → [(vid, pa_id), ...]"""
+    out = []
+    for pa in PARKING_AREAS:
+        try:
+            out.extend((vid, pa) for vid in traci_mod.parkingarea.getVehicleIDs(pa))
+        except Exception:
+            continue
+    return out
 
 class StartUI(tk.Tk):
     def __init__(self, traci_mod):
@@ -20,8 +27,10 @@ class StartUI(tk.Tk):
         self.resizable(False, False)
         self.traci = traci_mod
 
-        # pa_0 차량만 후보에 포함
-        self.candidates = _get_pa0_ids(self.traci)
+        # pa_0/pa_1/pa_2 주차 차량을 후보에 포함
+        parked = _get_parked_ids(self.traci)
+        self.candidates = [vid for vid, _ in parked]
+        self.parking_of = dict(parked)
 
         # 상태 변수
         self.leader_var = tk.StringVar(value="")
@@ -42,24 +51,24 @@ class StartUI(tk.Tk):
         main = ttk.Frame(self, padding=10)
         main.pack(fill="both", expand=True)
 
-        L_select = ttk.LabelFrame(main, text="Leader (pa_0만 표시)", padding=10)
+        L_select = ttk.LabelFrame(main, text="Leader (주차 중인 차량)", padding=10)
         L_select.pack(side=tk.LEFT, fill="both", expand=True)
 
         ttk.Separator(main, orient="vertical").pack(side=tk.LEFT, fill=tk.Y, padx=8)
 
-        R_select = ttk.LabelFrame(main, text="Follower (pa_0만 표시)", padding=10)
+        R_select = ttk.LabelFrame(main, text="Follower (주차 중인 차량)", padding=10)
         R_select.pack(side=tk.LEFT, fill="both", expand=True)
 
         if not self.candidates:
-            ttk.Label(L_select, text="(pa_0에 차량이 없습니다)").pack(anchor="w", pady=2)
-            ttk.Label(R_select, text="(pa_0에 차량이 없습니다)").pack(anchor="w", pady=2)
+            ttk.Label(L_select, text="(주차 중인 차량이 없습니다)").pack(anchor="w", pady=2)
+            ttk.Label(R_select, text="(주차 중인 차량이 없습니다)").pack(anchor="w", pady=2)
         else:
             for vid in self.candidates:
-                ttk.Radiobutton(L_select, text=vid, value=vid, variable=self.leader_var)\
+                ttk.Radiobutton(L_select, text=f"{vid} ({self.parking_of[vid]})", value=vid, variable=self.leader_var)\
                     .pack(anchor="w", pady=2)
 
             for vid in self.candidates:
-                cb = ttk.Checkbutton(R_select, text=vid, variable=self.follower_vars[vid])
+                cb = ttk.Checkbutton(R_select, text=f"{vid} ({self.parking_of[vid]})", variable=self.follower_vars[vid])
                 cb.pack(anchor="w", pady=2)
                 self.cb_widgets[vid] = cb
 
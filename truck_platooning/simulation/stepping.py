@@ -0,0 +1,127 @@
+# simulation/stepping.py
+# 적응형 스텝 길이 (이벤트 트리거 세분화)
+# - SUMO 의 --step-length 는 실행 중 바꿀 수 없으므로 SUMO 는 항상 미세 스텝(profile.step_length)으로 적분하고,
+#   정상 상태에서는 simulationStep(t + coarse_step) 한 번으로 여러 미세 스텝을 건너뜀
+#   → TraCI 왕복 + 제어 계산이 coarse_step / step_length 배 줄어듦 (그 사이 setSpeed 명령은 유지)
+# - 출발 예정, 참여/이탈/합류, 끼어들기(접근 포함), 제동 중, 안전 모니터 경고, 간격 미수렴이면 미세 스텝
+# - 트리거가 사라진 뒤에도 REFINE_HOLD 초 동안은 미세 스텝 유지 (히스테리시스)
+SETTLE_GAP_ERR = 1.0      # 정상 상태: |간격 오차| 이하 [m]
+SETTLE_DV = 0.3           # 정상 상태: |앞차와 속도차| 이하 [m/s]
+SETTLE_ACCEL = 0.3        # 정상 상태: |앞차 가속도| 이하 [m/s²]
+REFINE_HOLD = 2.0         # 마지막 트리거 후 미세 스텝 유지 시간 [s]
+
+
+class AdaptiveStepper:
+    def __init__(self, profile):
+        self.fine = profile.step_length
+        # coarse_step 은 미세 스텝의 정수배로 맞춤 (0 이하면 항상 미세 스텝)
+        n = int(round(profile.coarse_step / self.fine)) if profile.coarse_step > 0 else 1
+        self.ratio = max(1, n)
+        self.approach = profile.cut_in_approach_distance
+        self.standstill = profile.standstill_gap
+        self.headway = profile.time_headway
+        self.hold_until = 0.0
+        self.coarse_steps = 0
+        self.fine_steps = 0
+        self.reasons = {}         # 미세 스텝 사유 -> 횟수
+
+    @property
+    def enabled(self):
+        return self.ratio > 1
+
+    # -------- 트리거 --------
+    def _pairs_settled(self, traci_mod, pairs):
+        """주행 중인 모든 쌍이 목표 간격/속도에 수렴했는지 (제어 단계에서 캐시된 값 재사용)"""
+        veh = traci_mod.vehicle
+        for f, l in pairs:
+            try:
+                if veh.isStopped(f) or veh.isStopped(l):
+                    continue
+                info = veh.getLeader(f, 250.0)
+                if not info or info[0] != l:
+                    return False
+                vF = veh.getSpeed(f)
+                vL = veh.getSpeed(l)
+                err = info[1] - (self.standstill + self.headway * max(vF, 0.0))
+                if abs(err) > SETTLE_GAP_ERR or abs(vF - vL) > SETTLE_DV or abs(veh.getAcceleration(l)) > SETTLE_ACCEL:
+                    return False
+            except traci_mod.exceptions.TraCIException:
+                return False
+        return True
+
+    def _traffic_near_chain(self, traci_mod, chain):
+        """체인 멤버와 같은 엣지에서 approach 거리 안에 있는 비멤버 차량 (끼어들기 접근 후보)"""
+        veh = traci_mod.vehicle
+        members = set(chain)
+        by_edge = {}
+        for vid in chain:
+            try:
+                if veh.isStopped(vid):
+                    continue
+                by_edge.setdefault(veh.getRoadID(vid), []).append(veh.getLanePosition(vid))
+            except traci_mod.exceptions.TraCIException:
+                continue
+        for edge, spots in by_edge.items():
+            if edge.startswith(":"):
+                continue
+            for other in traci_mod.edge.getLastStepVehicleIDs(edge):
+                if other in members:
+                    continue
+                p = veh.getLanePosition(other)
+                if any(abs(p - q) <= self.approach for q in spots):
+                    return True
+        return False
+
+    def _trigger(self, engine):
+        """미세 스텝이 필요한 사유 (없으면 None)"""
+        rt = engine.state
+        sim_t = engine.sim_t
+        if engine.schedule is not None:
+            if engine.release_index < len(engine.schedule):
+                if engine.schedule[engine.release_index][0] <= sim_t + self.ratio * self.fine:
+                    return "release"
+        elif engine.release_index < len(engine.chain):
+            return "release"
+        if rt.merge_coordinator or rt.pending_merge or rt.yielding_for_merge:
+            return "merge"
+        if rt.leave_guard or any(t > sim_t for t in rt.join_cooldown.values()):
+            return "join_leave"
+        if any(t > sim_t for t in rt.startup_lock_until.values()):
+            return "startup"
+        if rt.cut_in_active_pairs or not engine.cutin.ready():
+            return "cut_in"
+        if engine.brakes.braking or engine.brakes.factor < 1.0 or rt.brake_channel.active:
+            return "brake"
+        if engine.safety is not None and engine.safety.alert:
+            return "safety"
+        traci_mod = engine.traci
+        if not self._pairs_settled(traci_mod, rt.follow_pairs):
+            return "unsettled"
+        if self._traffic_near_chain(traci_mod, engine.chain_now):
+            return "approach"
+        return None
+
+    # -------- 다음 스텝 --------
+    def next_target(self, engine):
+        """다음 simulationStep 목표 시각 (미세 스텝이면 None → simulationStep())"""
+        if not self.enabled:
+            return None
+        reason = self._trigger(engine)
+        sim_t = engine.sim_t
+        if reason is not None:
+            self.hold_until = sim_t + REFINE_HOLD
+            self.reasons[reason] = self.reasons.get(reason, 0) + 1
+        if reason is not None or sim_t < self.hold_until:
+            self.fine_steps += 1
+            return None
+        n = self.ratio
+        # 예정된 출발 시각을 건너뛰지 않도록 자름
+        if engine.schedule is not None and engine.release_index < len(engine.schedule):
+            due = engine.schedule[engine.release_index][0]
+            n = max(1, min(n, int((due - sim_t) / self.fine)))
+        self.coarse_steps += 1
+        return sim_t + n * self.fine
+
+    def summary(self):
+        return {"coarse_ratio": self.ratio, "coarse_steps": self.coarse_steps,
+                "fine_steps": self.fine_steps, "fine_reasons": dict(self.reasons)}
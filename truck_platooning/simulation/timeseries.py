@@ -0,0 +1,91 @@
+# simulation/timeseries.py
+# 속도/간격 시계열 링 버퍼 + min/max 데시메이션 (NumPy)
+# - 시간축 1개(링) + 값 2차원 배열(슬롯 × 용량)을 처음에 한 번만 할당 → 차량 수/실행 시간과 무관한 고정 메모리
+# - 키(차량/쌍)는 슬롯에 배정, 사라진 키의 슬롯은 비워서 재사용 (없는 구간은 NaN)
+# - 렌더링: 보이는 시간 구간을 픽셀 폭 W 칸으로 나눠 칸마다 min/max → 계열당 점 2W 개 (샘플 수와 무관)
+# - NumPy 는 이 모듈(플롯 창)에서만 사용, 엔진 import 경로에는 넣지 않음
+import numpy as np
+
+
+class TimeSeriesBuffer:
+    def __init__(self, window_s=300.0, sample_dt=0.1, slots=64):
+        self.sample_dt = sample_dt                 # 이 간격(sim s)보다 촘촘한 샘플은 버림
+        self.capacity = int(np.ceil(window_s / sample_dt)) + 1
+        self.t = np.full(self.capacity, np.nan)
+        self.values = np.full((slots, self.capacity), np.nan)
+        self.head = 0                              # 다음에 쓸 열
+        self.count = 0
+        self.slot_of = {}                          # key -> 슬롯
+        self._free = list(range(slots - 1, -1, -1))
+
+    # -------- 기록 --------
+    def _slot(self, key):
+        s = self.slot_of.get(key)
+        if s is None and self._free:
+            s = self.slot_of[key] = self._free.pop()
+            self.values[s, :] = np.nan
+        return s
+
+    def release(self, key):
+        """키 제거 (슬롯 재사용)"""
+        s = self.slot_of.pop(key, None)
+        if s is not None:
+            self._free.append(s)
+
+    def push(self, t, samples):
+        """samples: {key: value}. 이번 열에 없는 키는 NaN. 기록했으면 True"""
+        if self.count and t - self.t[(self.head - 1) % self.capacity] < self.sample_dt - 1e-9:
+            return False
+        col = self.head
+        self.t[col] = t
+        self.values[:, col] = np.nan
+        for key, v in samples.items():
+            s = self._slot(key)
+            if s is not None and v is not None:
+                self.values[s, col] = v
+        self.head = (col + 1) % self.capacity
+        self.count = min(self.count + 1, self.capacity)
+        return True
+
+    def latest_t(self):
+        return None if not self.count else float(self.t[(self.head - 1) % self.capacity])
+
+    # -------- 조회 --------
+    def ordered(self, keys):
+        """(시간순 t, keys 순서 값 행렬) — 링을 펼친 복사본"""
+        rows = [self.slot_of[k] for k in keys]
+        if self.count < self.capacity:
+            return self.t[:self.count], self.values[rows, :self.count]
+        order = np.r_[self.head:self.capacity, 0:self.head]
+        return self.t[order], self.values[np.ix_(rows, order)]
+
+    def decimate(self, keys, t_lo, t_hi, width):
+        """[t_lo, t_hi] 를 width 칸으로 나눈 칸별 (min, max) → 각각 (len(keys), width), 빈 칸 NaN"""
+        keys = [k for k in keys if k in self.slot_of]
+        width = max(1, int(width))
+        empty = np.full((len(keys), width), np.nan)
+        if not keys or not self.count or t_hi <= t_lo:
+            return keys, empty, empty.copy()
+        t, y = self.ordered(keys)
+        edges = np.linspace(t_lo, t_hi, width + 1)
+        idx = np.searchsorted(t, edges)
+        idx[-1] = np.searchsorted(t, t_hi, side="right")   # 마지막 칸은 t_hi 샘플 포함
+        starts, ends = idx[:-1], idx[1:]
+        filled = ends > starts
+        if not filled.any():
+            return keys, empty, empty.copy()
+        # reduceat 은 빈 구간에서 다음 원소를 돌려주므로 채워진 칸만 계산 후 배치
+        s = starts[filled]
+        lo = empty.copy()
+        hi = empty.copy()
+        with np.errstate(invalid="ignore"):
+            lo[:, filled] = np.fmin.reduceat(y, s, axis=1)
+            hi[:, filled] = np.fmax.reduceat(y, s, axis=1)
+        # 마지막 채워진 칸 이후(끝 구간 밖) 샘플이 섞이지 않도록 ends 로 자른 구간만 사용
+        last = np.flatnonzero(filled)[-1]
+        if ends[last] < t.size:
+            seg = y[:, starts[last]:ends[last]]
+            with np.errstate(invalid="ignore"):
+                lo[:, last] = np.fmin.reduce(seg, axis=1)
+                hi[:, last] = np.fmax.reduce(seg, axis=1)
+        return keys, lo, hi
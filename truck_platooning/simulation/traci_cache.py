@@ -0,0 +1,252 @@
+# simulation/traci_cache.py
+# 스텝 단위 TraCI getter 캐시
+# - 같은 스텝 안에서 반복되는 get* 호출은 메모리에서 응답
+# - simulationStep() 호출 시 자동 무효화
+# - getLeader(vid, d)는 더 긴 lookahead 결과로 대신 응답 가능하면 재사용
+# - 연결(label)마다 CachedTraci 1개, 모듈들이 쓰는 `traci` 는 현재 활성 연결로 전달하는 스위치
+import traci as _traci
+
+# 캐시를 감싸는 TraCI 도메인
+DOMAINS = ("vehicle", "simulation", "lane", "edge", "route", "vehicletype", "parkingarea")
+
+# 다음 simulationStep 에서야 효과가 나는 명령 → 같은 스텝의 getter 값은 그대로 유효
+_DEFERRED = {"setSpeed", "slowDown", "changeLane", "changeLaneRelative", "changeSublane"}
+
+# 차량 집합/위치 자체를 바꾸는 명령 → 모든 도메인 캐시 무효화
+_STRUCTURAL = {
+    "add", "remove", "moveTo", "moveToXY", "resume", "setRoute", "setRouteID",
+    "changeTarget", "setStop", "replaceStop", "insertStop", "rerouteTraveltime",
+}
+
+# 캐시하면 안 되는 getter (구독 결과 등)
+_UNCACHED = {"getSubscriptionResults", "getContextSubscriptionResults", "getAllSubscriptionResults"}
+
+_LEADER_KEY = ("getLeader",)
+
+
+class _DomainCache:
+    """TraCI 도메인 하나(vehicle, lane ...)를 감싸는 read-through 캐시.
+    저장 구조: {객체ID(첫 번째 인자, 없으면 None): {(메서드, 나머지 인자): 값}}
+    """
+    def __init__(self, owner, name, domain):
+        self._owner = owner
+        self._name = name
+        self._domain = domain
+        self._store = {}
+
+    def clear(self):
+        self._store.clear()
+
+    def forget(self, obj_id):
+        self._store.pop(obj_id, None)
+
+    def __getattr__(self, attr):
+        fn = getattr(self._domain, attr)
+        if not callable(fn):
+            return fn
+        if attr in _UNCACHED:
+            wrapper = fn        # 구독 결과: 캐시도 무효화도 하지 않음 (상태를 바꾸지 않는 조회)
+        elif attr == "getLeader":
+            wrapper = self._wrap_leader(fn)
+        elif attr.startswith("get"):
+            wrapper = self._wrap_getter(attr, fn)
+        else:
+            wrapper = self._wrap_command(attr, fn)
+        # 다음 접근부터는 __getattr__ 를 거치지 않도록 바인딩
+        setattr(self, attr, wrapper)
+        return wrapper
+
+    def _wrap_getter(self, attr, fn):
+        stat = self._owner._stat(f"{self._name}.{attr}")
+        store = self._store
+
+        def getter(*args, **kwargs):
+            if kwargs:
+                stat[1] += 1
+                return fn(*args, **kwargs)
+            obj_id = args[0] if args else None
+            key = (attr, args[1:])
+            bucket = store.get(obj_id)
+            if bucket is not None and key in bucket:
+                stat[0] += 1
+                return bucket[key]
+            stat[1] += 1
+            value = fn(*args)
+            store.setdefault(obj_id, {})[key] = value
+            return value
+        return getter
+
+    def _wrap_leader(self, fn):
+        stat = self._owner._stat(f"{self._name}.getLeader")
+        store = self._store
+
+        def get_leader(veh_id, dist=100.0):
+            dist = float(dist)
+            bucket = store.get(veh_id)
+            known = bucket.get(_LEADER_KEY) if bucket is not None else None
+            if known:
+                if dist in known:
+                    stat[0] += 1
+                    return known[dist]
+                # 더 긴 lookahead 결과로 대신 응답:
+                #  - 앞차 없음 → 짧은 lookahead 에서도 없음
+                #  - 찾은 앞차의 gap <= dist → 가장 가까운 앞차이므로 동일
+                for look, res in known.items():
+                    if look < dist:
+                        continue
+                    if not res or not res[0] or res[1] <= dist:
+                        stat[0] += 1
+                        return res
+            stat[1] += 1
+            res = fn(veh_id, dist)
+            store.setdefault(veh_id, {}).setdefault(_LEADER_KEY, {})[dist] = res
+            return res
+        return get_leader
+
+    def _wrap_command(self, attr, fn):
+        owner = self._owner
+        stat = owner._cmd_stat(f"{self._name}.{attr}")
+
+        def command(*args, **kwargs):
+            stat[0] += 1
+            res = fn(*args, **kwargs)
+            if attr in _DEFERRED:
+                pass
+            elif attr in _STRUCTURAL:
+                owner.invalidate()
+            elif args:
+                self.forget(args[0])
+            else:
+                self.clear()
+            return res
+        return command
+
+
+class CachedTraci:
+    """traci 모듈(또는 traci.getConnection(label) 연결)을 감싸는 스텝 캐시.
+    traci 모듈과 같은 방식으로 사용: cached.vehicle.getSpeed(vid), cached.simulationStep()
+    """
+    def __init__(self, backend=_traci):
+        self._backend = backend
+        self._domains = {}
+        self._stats = {}
+        self._cmds = {}
+        self.steps = 0
+
+    # --- 내부 ---
+    def _stat(self, key):
+        return self._stats.setdefault(key, [0, 0])  # [hits, misses]
+
+    def _cmd_stat(self, key):
+        return self._cmds.setdefault(key, [0])
+
+    def __getattr__(self, name):
+        if name in DOMAINS:
+            dom = _DomainCache(self, name, getattr(self._backend, name))
+            self._domains[name] = dom
+            setattr(self, name, dom)
+            return dom
+        # exceptions, TraCIException 등은 그대로 전달
+        # (traci.getConnection(label) 연결 객체에는 없으므로 traci 모듈에서)
+        try:
+            return getattr(self._backend, name)
+        except AttributeError:
+            return getattr(_traci, name)
+
+    # --- 무효화 ---
+    def invalidate(self):
+        for dom in self._domains.values():
+            dom.clear()
+
+    def simulationStep(self, step=0.0):
+        try:
+            return self._backend.simulationStep(step)
+        finally:
+            self.steps += 1
+            self.invalidate()
+
+    def start(self, cmd, *args, **kwargs):
+        self.invalidate()
+        return self._backend.start(cmd, *args, **kwargs)
+
+    def close(self, *args, **kwargs):
+        self.invalidate()
+        return self._backend.close(*args, **kwargs)
+
+    # --- 통계 ---
+    def hit_rates(self):
+        """{'vehicle.getSpeed': (hits, misses, hit_rate), ...}"""
+        out = {}
+        for key, (hits, misses) in self._stats.items():
+            total = hits + misses
+            out[key] = (hits, misses, hits / total if total else 0.0)
+        return out
+
+    def backend_calls(self):
+        """캐시를 통과해 실제 TraCI로 나간 getter 호출 수"""
+        return sum(m for _, m in self._stats.values())
+
+    def report(self, top=10):
+        rows = sorted(self.hit_rates().items(), key=lambda kv: -(kv[1][0] + kv[1][1]))
+        hits = sum(h for h, _, _ in self.hit_rates().values())
+        total = hits + self.backend_calls()
+        lines = [f"[CACHE] steps={self.steps} getter={total} hit={hits / total * 100 if total else 0.0:.1f}%"]
+        for key, (h, m, rate) in rows[:top]:
+            lines.append(f"  {key:<32} {h + m:>8} calls  hit {rate * 100:5.1f}%")
+        return "\n".join(lines)
+
+    def command_calls(self):
+        """setSpeed 등 명령 호출 수 (항상 TraCI로 전달)"""
+        return sum(c for c, in self._cmds.values())
+
+    def metric_samples(self):
+        """metrics.add_collector 용: [(name, type, labels, value), ...]"""
+        out = []
+        for key, (hits, misses) in list(self._stats.items()):
+            out.append(("traci_calls", "counter", {"method": key, "result": "hit"}, hits))
+            out.append(("traci_calls", "counter", {"method": key, "result": "miss"}, misses))
+        for key, (count,) in list(self._cmds.items()):
+            out.append(("traci_calls", "counter", {"method": key, "result": "command"}, count))
+        return out
+
+    def reset_stats(self):
+        for stat in self._stats.values():
+            stat[0] = stat[1] = 0
+        for stat in self._cmds.values():
+            stat[0] = 0
+
+
+def open_connection(cmd, label):
+    """label 이 붙은 SUMO 연결을 새로 시작하고 그 연결을 감싼 캐시 반환
+    (traci.start(cmd, label=label) + traci.getConnection(label))"""
+    _traci.start(cmd, label=label)
+    return CachedTraci(_traci.getConnection(label))
+
+
+class TraciSwitch:
+    """현재 활성 CachedTraci 로 모든 접근을 전달 (traci.switch 의 캐시 버전).
+    한 프로세스에서 여러 시뮬레이션을 돌릴 때 엔진이 스텝 전에 activate() 한다."""
+    def __init__(self, active):
+        self.__dict__["_active"] = active
+
+    def __getattr__(self, name):
+        return getattr(self._active, name)
+
+    def activate(self, cached):
+        if isinstance(cached, TraciSwitch):
+            cached = cached.active
+        self.__dict__["_active"] = cached
+        return cached
+
+    @property
+    def active(self):
+        return self._active
+
+
+# 기본 연결 캐시 + 공용 스위치 (모듈에서 `from simulation.traci_cache import traci` 로 사용)
+default = CachedTraci(_traci)
+traci = TraciSwitch(default)
+
+
+def activate(cached):
+    return traci.activate(cached)
@@ -0,0 +1,144 @@
+# simulation/traffic.py
+# 연속 배경 교통 생성기 (traci.vehicle.add)
+# - 수요: 시작 엣지 차선당 veh/h, sim 시간에 따라 구간 선형 보간 (profile.traffic_demand = [(t, veh/h/lane), ...])
+# - 경로: 도로망의 경로(route 파일의 <route> + 배경 차량의 인라인 경로, 중복 제거) 중 시작 엣지별 무작위 선택
+#   → 경로 객체는 처음 쓸 때 traci.route.add 1회, 이후 차량은 route ID 로 재사용 (차량마다 엣지 목록 전송 안 함)
+# - 삽입: 시작 엣지마다 지수 분포 도착 시각을 쌓아 두고 traffic_batch_s 마다 한 번에 add (매 스텝 TraCI 호출 없음)
+# - SUMO 삽입 대기열(getPendingVehicles)이 traffic_max_pending 이상이면 그 배치는 버림 (수요 > 용량일 때 무한 적체 방지)
+import random
+
+from simulation import events
+from simulation import metrics
+from simulation.config import is_platoon_truck
+
+ID_PREFIX = "bg."
+ROUTE_PREFIX = "bg_route_"
+
+
+def demand_at(points, t):
+    """[(t, veh/h/lane), ...] 구간 선형 보간 (첫 점 이전/마지막 점 이후는 끝값 유지)"""
+    if not points:
+        return 0.0
+    if t <= points[0][0]:
+        return points[0][1]
+    for (t0, r0), (t1, r1) in zip(points, points[1:]):
+        if t < t1:
+            return r0 + (r1 - r0) * (t - t0) / (t1 - t0) if t1 > t0 else r1
+    return points[-1][1]
+
+
+def route_pool(net, only=()):
+    """{시작 엣지: [(route_id 또는 None, edges), ...]} — None 이면 처음 쓸 때 route.add 필요한 인라인 경로"""
+    pool, seen = {}, set()
+    for rid, edges in net.routes.items():
+        if only and rid not in only:
+            continue
+        if edges and tuple(edges) not in seen:
+            seen.add(tuple(edges))
+            pool.setdefault(edges[0], []).append([rid, list(edges)])
+    if not only:
+        for vid, edges in net.vehicle_routes.items():
+            if is_platoon_truck(vid) or not edges or tuple(edges) in seen:
+                continue
+            seen.add(tuple(edges))
+            pool.setdefault(edges[0], []).append([None, list(edges)])
+    return pool
+
+
+class TrafficGenerator:
+    def __init__(self, net, demand, routes=(), vtype="DEFAULT_VEHTYPE", batch_s=1.0, max_pending=500, seed=None):
+        self.demand = tuple(demand)
+        self.vtype = vtype
+        self.batch_s = max(0.0, float(batch_s))
+        self.max_pending = int(max_pending)
+        self._rng = random.Random(seed)
+        self.pool = route_pool(net, routes)
+        self.lanes = {e: net.lane_count(e) for e in self.pool}   # 시작 엣지 차선 수
+        self._next = {}           # 시작 엣지 -> 다음 도착 시각 (sim s)
+        self._next_batch = None
+        self._n = 0
+        self._route_n = 0
+        self.inserted = 0
+        self.dropped = 0
+        self.batches = 0
+
+    @classmethod
+    def from_profile(cls, profile, net):
+        """수요가 비어 있으면 None (배경 교통 생성 안 함)"""
+        if not profile.traffic_demand:
+            return None
+        gen = cls(net, profile.traffic_demand, profile.traffic_routes, profile.traffic_vtype,
+                  profile.traffic_batch_s, profile.traffic_max_pending, profile.seed)
+        if not gen.pool:
+            events.emit("warn", "배경 교통: 사용할 경로 없음 → 생성 안 함")
+            return None
+        return gen
+
+    def _route_id(self, traci_mod, entry):
+        """경로 객체 ID (인라인 경로는 처음 한 번만 route.add)"""
+        if entry[0] is None:
+            rid = f"{ROUTE_PREFIX}{self._route_n}"
+            self._route_n += 1
+            traci_mod.route.add(rid, entry[1])
+            entry[0] = rid
+        return entry[0]
+
+    def _draw(self, edge, t):
+        """t 이후 다음 도착 시각 (수요 0 이면 None → 다음 배치에서 다시 뽑음)"""
+        rate = demand_at(self.demand, t) * self.lanes[edge] / 3600.0     # veh/s
+        return t + self._rng.expovariate(rate) if rate > 0.0 else None
+
+    def _arrivals(self, sim_t):
+        """이번 배치까지 도착한 시작 엣지 목록 (시작 엣지별 포아송 과정, 수요는 직전 도착 시점 값)"""
+        out = []
+        for edge in self.lanes:
+            t = self._next.get(edge)
+            if t is None:
+                t = self._draw(edge, sim_t)
+            while t is not None and t <= sim_t:
+                out.append(edge)
+                t = self._draw(edge, t)
+            self._next[edge] = t
+        return out
+
+    def step(self, traci_mod, sim_t):
+        """매 스텝 호출 (batch_s 간격으로만 실제 삽입). 이번에 넣은 차량 수 반환"""
+        if self._next_batch is not None and sim_t < self._next_batch:
+            return 0
+        self._next_batch = sim_t + self.batch_s
+        arrivals = self._arrivals(sim_t)
+        if not arrivals:
+            return 0
+        self.batches += 1
+        try:
+            pending = len(traci_mod.simulation.getPendingVehicles())
+        except traci_mod.exceptions.TraCIException:
+            pending = 0
+        metrics.set_gauge("traffic_pending", pending)
+        room = max(0, self.max_pending - pending)
+        if len(arrivals) > room:
+            self.dropped += len(arrivals) - room
+            metrics.inc("traffic_dropped", len(arrivals) - room)
+            events.emit("traffic", f"삽입 대기 {pending}대 → {len(arrivals) - room}대 생략",
+                        key="traffic:backlog", every=10.0, pending=pending)
+            arrivals = arrivals[:room]
+
+        added = 0
+        choice = self._rng.choice
+        for edge in arrivals:
+            entry = choice(self.pool[edge])
+            vid = f"{ID_PREFIX}{self._n}"
+            self._n += 1
+            try:
+                traci_mod.vehicle.add(vid, self._route_id(traci_mod, entry), typeID=self.vtype,
+                                      depart="now", departLane="free", departSpeed="max")
+                added += 1
+            except traci_mod.exceptions.TraCIException as e:
+                events.emit("warn", f"배경 차량 추가 실패: {e}", key="traffic:add", every=10.0)
+        self.inserted += added
+        metrics.inc("traffic_inserted", added)
+        return added
+
+    def summary(self):
+        return {"inserted": self.inserted, "dropped": self.dropped, "batches": self.batches,
+                "sources": len(self.pool), "routes": sum(len(v) for v in self.pool.values())}
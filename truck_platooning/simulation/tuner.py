@@ -0,0 +1,183 @@
+# simulation/tuner.py
+# 게인 자동 튜닝: 무작위 후보 + successive halving (headless 병렬 실행)
+# - 라운드마다 후보를 --workers 개 프로세스에 나눠 각 워커가 batch.run_many (워커 안에서는 엔진 교대 실행)
+# - 탐색 공간: kp, kd, catch_gain, time_headway (SPACE 범위 안 균등 샘플, 시드 고정)
+#   · cut_in_expansion_rate 는 제외: 프로파일/설정에만 있고 제어 코드가 읽지 않음
+#     (끼어들기 간격 확장은 cut_in_expand_gap 목표 + platoon.py 고정 감속 계수) → 탐색해도 점수 차이 없음
+# - 라운드(rung) r: 남은 후보를 min_steps × eta^r 스텝씩 실행 → 점수 상위 1/eta 만 다음 라운드로
+# - 실행 중 check_every 스텝마다 스트리밍 간격 통계(GapAnalytics)를 보고 목표를 명백히 벗어나면 조기 종료
+#   (최소 간격 < abort_gap_min, warmup 이후 |평균 간격 오차| > abort_err, 충돌) → 점수 inf, 남은 스텝은 다른 후보에
+# - 점수(낮을수록 좋음) = |간격 오차| p95 최댓값 + 정지 간격 미만 시간 × 5 + 속도 오차 증폭(>1) × 10
+# - 출력: <out>/best.json (load_profile 로 바로 쓸 수 있는 프로파일), <out>/history.json (모든 시도)
+#
+# 사용법 (truck_platooning 폴더에서, SUMO 필요):
+#   python -m simulation.tuner profiles/headless.toml --trials 16 --eta 2 --min-steps 2000 --workers 4
+#   python -m simulation.tuner --trials 8 --rungs 2 --cache results/cache
+import argparse
+import json
+import math
+import multiprocessing
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+from simulation import events
+from simulation.batch import run_many
+from simulation.profile import DEFAULT, load_profile
+from simulation.resultcache import DEFAULT_MAX_BYTES, ResultCache
+
+# 게인 -> (하한, 상한)
+SPACE = {
+    "kp": (0.2, 1.5),
+    "kd": (0.1, 1.0),
+    "catch_gain": (0.2, 0.8),
+    "time_headway": (0.4, 1.0),
+}
+ABORT_GAP_MIN = 1.0       # [m] 이보다 가까워지면 조기 종료
+ABORT_ERR = 25.0          # [m] warmup 이후 쌍별 |평균 간격 오차| 상한
+ABORT_WARMUP = 60.0       # [s] 편성(출발/합류) 구간은 오차가 크므로 이 시간 이후부터 오차 기준 적용
+
+
+def sample(rng, space=SPACE):
+    return {k: round(rng.uniform(lo, hi), 3) for k, (lo, hi) in space.items()}
+
+
+def score(result):
+    """낮을수록 좋음. 조기 종료/통계 없음이면 inf"""
+    s = result.get("summary") or {}
+    if result.get("aborted") or not s:
+        return math.inf
+    if (result.get("safety") or {}).get("collisions"):
+        return math.inf
+    amp = s.get("max_amplification") or 0.0
+    return s["abs_gap_error_p95_max"] + 5.0 * s["below_standstill_s"] + 10.0 * max(0.0, amp - 1.0)
+
+
+def violation(engine, gap_min=ABORT_GAP_MIN, max_err=ABORT_ERR, warmup=ABORT_WARMUP):
+    """run_many 의 stop 콜백: 목표를 명백히 벗어났으면 사유 문자열"""
+    if engine.safety is not None and engine.safety.collisions:
+        return "collision"
+    for st in engine.gap_stats.pairs.values():
+        if st.gap.n and st.gap.min < gap_min:
+            return f"gap_min {st.gap.min:.2f} m ({st.leader}→{st.follower})"
+        if engine.sim_t >= warmup and st.gap_err.n > 100 and abs(st.gap_err.mean) > max_err:
+            return f"gap_err_mean {st.gap_err.mean:.1f} m ({st.leader}→{st.follower})"
+    return None
+
+
+def _run_chunk(profiles, label_prefix, kwargs):
+    """워커 프로세스: 맡은 후보들을 run_many 로 실행 (반환 전에 이벤트 모두 기록)"""
+    try:
+        return run_many(profiles, label_prefix=label_prefix, **kwargs)
+    finally:
+        events.close()
+
+
+def run_parallel(profiles, workers=1, label_prefix="run", **kwargs):
+    """profiles 를 workers 개 프로세스에 연속 구간으로 나눠 run_many. 반환: 입력 순서대로 result() 목록
+    - workers 1 이면 현재 프로세스에서 그대로 run_many
+    - stop 콜백은 피클 가능해야 함 (모듈 함수 또는 functools.partial)
+    - spawn 사용: 이벤트 writer 스레드/TraCI 연결을 fork 로 물려받지 않음"""
+    workers = max(1, min(workers, len(profiles)))
+    if workers == 1:
+        return run_many(profiles, label_prefix=label_prefix, **kwargs)
+    size = -(-len(profiles) // workers)
+    chunks = [profiles[i:i + size] for i in range(0, len(profiles), size)]
+    with ProcessPoolExecutor(len(chunks), mp_context=multiprocessing.get_context("spawn")) as pool:
+        futures = [pool.submit(_run_chunk, chunk, f"{label_prefix}w{w}_", kwargs) for w, chunk in enumerate(chunks)]
+        return [res for fut in futures for res in fut.result()]
+
+
+def successive_halving(base, trials=16, eta=2, rungs=3, min_steps=2000, chain=None, seed=0,
+                       batch=20, cache=None, stop=violation, check_every=200, workers=1):
+    """반환: (최고 후보 gains, 그 라운드 점수, 기록 목록) — 모두 조기 종료면 (None, inf, 기록)"""
+    rng = random.Random(seed)
+    alive = [sample(rng) for _ in range(trials)]
+    history = []
+    best, best_score = None, math.inf
+    for rung in range(rungs):
+        steps = int(min_steps * eta ** rung)
+        profiles = [base.replace(name=f"tune{rung}_{i}", **g) for i, g in enumerate(alive)]
+        t0 = time.perf_counter()
+        results = run_parallel(profiles, workers=workers, label_prefix=f"tune{rung}_", chain=chain, batch=batch,
+                               max_steps=steps, cache=cache, stop=stop, check_every=check_every)
+        wall = time.perf_counter() - t0
+        scored = []
+        for g, res in zip(alive, results):
+            sc = score(res)
+            scored.append((sc, g))
+            history.append({"rung": rung, "max_steps": steps, "gains": g, "score": None if math.isinf(sc) else sc,
+                            "steps": res.get("steps"), "sim_t": res.get("sim_t"), "aborted": res.get("aborted"),
+                            "cached": bool(res.get("cached")), "summary": res.get("summary")})
+        scored.sort(key=lambda x: x[0])
+        # 라운드마다 스텝 수가 달라 점수는 같은 라운드 안에서만 비교 → 가장 늦은 라운드의 1위가 최고
+        if scored and not math.isinf(scored[0][0]):
+            best_score, best = scored[0]
+        n_abort = sum(1 for r in results if r.get("aborted"))
+        events.emit("tuner", f"rung {rung}: {len(alive)}개 × {steps} 스텝, 조기 종료 {n_abort}, "
+                             f"최고 {scored[0][0]:.2f}" if scored else f"rung {rung}: 후보 없음",
+                    rung=rung, candidates=len(alive), steps=steps, aborted=n_abort, wall_s=round(wall, 2),
+                    workers=min(workers, len(alive)))
+        # 유한 점수 후보 중 상위 1/eta 만 다음 라운드로
+        keep = max(1, len(scored) // eta)
+        alive = [g for sc, g in scored[:keep] if not math.isinf(sc)]
+        if len(alive) <= 1:
+            break                                 # 후보 1개 이하: 더 긴 실행으로 가릴 대상 없음
+    return best, best_score, history
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="게인 자동 튜닝 (successive halving + 조기 종료)")
+    ap.add_argument("profile", nargs="?", help="기준 프로파일 (.toml/.json). 없으면 기본 프로파일 (sumo)")
+    ap.add_argument("--trials", type=int, default=16, help="첫 라운드 후보 수")
+    ap.add_argument("--eta", type=int, default=2, help="라운드마다 남기는 비율의 역수 / 스텝 증가 배수 (최소 2)")
+    ap.add_argument("--rungs", type=int, default=3, help="최대 라운드 수")
+    ap.add_argument("--min-steps", type=int, default=2000, help="첫 라운드 실행당 스텝")
+    ap.add_argument("--seed", type=int, default=0, help="후보 샘플링 시드")
+    ap.add_argument("--batch", type=int, default=20, help="엔진을 바꾸기 전 연속 스텝 수")
+    ap.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                    help="라운드당 워커 프로세스 수 (기본: CPU 수, 1이면 한 프로세스에서 교대 실행)")
+    ap.add_argument("--chain", default=None, help="쉼표로 구분한 체인 (예: Veh0,Veh1,Veh2)")
+    ap.add_argument("--abort-gap-min", type=float, default=ABORT_GAP_MIN, help="조기 종료 최소 간격 [m]")
+    ap.add_argument("--abort-err", type=float, default=ABORT_ERR, help="조기 종료 |평균 간격 오차| [m]")
+    ap.add_argument("--abort-warmup", type=float, default=ABORT_WARMUP, help="오차 기준 적용 시작 sim 시간 [s]")
+    ap.add_argument("--cache", default=None, metavar="DIR", help="결과 캐시 디렉터리 (반복 튜닝 시 재사용)")
+    ap.add_argument("--out", default="results/tuner", help="best.json / history.json 저장 폴더")
+    args = ap.parse_args(argv)
+    eta = max(2, args.eta)                    # 1 이하면 후보가 줄지 않음 → 최소 2
+
+    base = load_profile(args.profile) if args.profile else DEFAULT.replace(sumo_binary="sumo", delay_ms=0, seed=42)
+    chain = args.chain.split(",") if args.chain else None
+    cache = ResultCache(args.cache, max_bytes=DEFAULT_MAX_BYTES) if args.cache else None
+
+    # 워커 프로세스로 넘어가므로 클로저 대신 partial (피클 가능)
+    stop = partial(violation, gap_min=args.abort_gap_min, max_err=args.abort_err, warmup=args.abort_warmup)
+
+    t0 = time.perf_counter()
+    best, best_score, history = successive_halving(
+        base, trials=args.trials, eta=eta, rungs=args.rungs, min_steps=args.min_steps,
+        chain=chain, seed=args.seed, batch=args.batch, cache=cache, stop=stop, workers=args.workers)
+    wall = time.perf_counter() - t0
+    events.close()
+
+    os.makedirs(args.out, exist_ok=True)
+    with open(os.path.join(args.out, "history.json"), "w", encoding="utf-8") as fh:
+        json.dump({"base": base.to_dict(), "space": SPACE, "seed": args.seed, "eta": eta, "workers": args.workers,
+                   "wall_s": round(wall, 2), "trials": history}, fh, ensure_ascii=False, indent=2, default=str)
+    print(f"{len(history)} runs ({sum(1 for h in history if h['aborted'])} aborted), {wall:.1f} s wall")
+    if best is None:
+        print("유효한 후보 없음 (모두 조기 종료) — 조기 종료 기준이나 탐색 범위를 확인하세요")
+        return 1
+    tuned = base.replace(name=f"{base.name}-tuned", **best)
+    path = os.path.join(args.out, "best.json")
+    with open(path, "w", encoding="utf-8") as fh:
+        json.dump(tuned.to_dict(), fh, ensure_ascii=False, indent=2)
+    print(f"best score {best_score:.3f}: {json.dumps(best)}")
+    print(f"saved {path} (profile digest {tuned.digest()})")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
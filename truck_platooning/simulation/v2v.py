@@ -0,0 +1,125 @@
+# simulation/v2v.py
+# 모의 V2V 통신 채널
+# - 체인 멤버(송신자)마다 상태 메시지(속도, 가속도) 링 버퍼, 송신 시각은 슬롯별로 공유
+# - 지연, 패킷 손실 확률, 송신 주기(Hz) 설정 → 제어기는 ground truth 대신 마지막 수신 메시지 사용
+# - 지연/송신 주기는 sim 시간 기준 → 적응형 스텝으로 스텝이 길어져도 100 ms 지연이 1 s 로 늘지 않음
+#   (지연은 기본 스텝 수로 설정: v2v_delay_steps * step_length 초)
+# - 링 버퍼/수신 슬롯은 송신자가 처음 등장할 때만 할당, 매 스텝은 제자리 갱신 (수백 대 규모 대응)
+# - 손실은 송신 단위(브로드캐스트 1건이 모든 수신자에게 같이 손실)
+import random
+
+_EPS = 1e-9                             # sim 시간 비교 오차 (step_length 누적 부동소수)
+
+
+class _Ring:
+    """송신자 1대의 메시지 링 버퍼 (depth = 지연 스텝 + 1)"""
+    __slots__ = ("speed", "accel", "ok", "latest")
+
+    def __init__(self, depth):
+        self.speed = [0.0] * depth
+        self.accel = [0.0] * depth
+        self.ok = [False] * depth       # 해당 슬롯에 유효한 메시지가 있는지 (미송신/손실이면 False)
+        self.latest = None              # 마지막 수신 메시지 [speed, accel, t] (제자리 갱신)
+
+
+class V2VChannel:
+    def __init__(self, delay_steps=0, drop_prob=0.0, rate_hz=0.0, step_length=0.05, seed=None):
+        self.delay = max(0, int(delay_steps))
+        self.delay_s = self.delay * step_length       # 지연 [s]
+        # 스텝이 기본 길이 이상이면 지연 구간 안에 송신은 최대 delay+1 회
+        self.depth = self.delay + 1
+        self.drop_prob = float(drop_prob)
+        # 송신 주기 [s]: rate_hz <= 0 이면 0 (매 스텝)
+        self.period = 1.0 / rate_hz if rate_hz > 0 else 0.0
+        self._rng = random.Random(seed)
+        self._rings = {}                # sender -> _Ring
+        self._senders = []
+        self._slot_t = [0.0] * self.depth   # 슬롯별 송신 시각 (모든 송신자 공통)
+        self._w = 0                     # 다음 송신 슬롯
+        self._r = 0                     # 아직 도착 안 한 가장 오래된 슬롯
+        self._n = 0                     # 전송 중(미도착) 슬롯 수
+        self._next_send = None          # 다음 송신 시각 (sim time)
+        self.sent = 0
+        self.dropped = 0
+
+    @classmethod
+    def from_profile(cls, profile):
+        return cls(profile.v2v_delay_steps, profile.v2v_drop_prob, profile.v2v_rate_hz,
+                   profile.step_length, profile.seed)
+
+    def _set_senders(self, senders):
+        if senders == self._senders:
+            return
+        self._senders = list(senders)
+        for vid in self._senders:
+            if vid not in self._rings:
+                self._rings[vid] = _Ring(self.depth)
+        for vid in [v for v in self._rings if v not in self._senders]:
+            del self._rings[vid]
+
+    def step(self, traci_mod, senders, sim_t):
+        """매 스텝 1회 (제어 전): 송신 시각이 됐으면 송신자 상태 송신 + 지연이 지난 메시지 수신"""
+        self._set_senders(senders)
+        depth = self.depth
+
+        send = self._next_send is None or sim_t + _EPS >= self._next_send
+        if send:
+            self._next_send = sim_t + self.period
+            if self._n == depth:            # 기본 스텝보다 짧은 스텝으로 가득 참 → 가장 오래된 것부터 도착 처리
+                self._deliver(self._r, 1)
+                self._r = (self._r + 1) % depth
+                self._n -= 1
+            w = self._w
+            self._slot_t[w] = sim_t
+            self._w = (w + 1) % depth
+            self._n += 1
+
+        # 이번 스텝에 도착하는 슬롯 수 (송신 시각 + 지연 <= 현재)
+        due = 0
+        limit = sim_t + _EPS - self.delay_s
+        while due < self._n and self._slot_t[(self._r + due) % depth] <= limit:
+            due += 1
+
+        drop = self.drop_prob
+        rand = self._rng.random
+        veh = traci_mod.vehicle
+        if send:
+            for vid in self._senders:
+                ring = self._rings[vid]
+                if drop > 0.0 and rand() < drop:
+                    ring.ok[w] = False
+                    self.dropped += 1
+                else:
+                    try:
+                        ring.speed[w] = veh.getSpeed(vid)
+                        ring.accel[w] = veh.getAcceleration(vid)
+                        ring.ok[w] = True
+                        self.sent += 1
+                    except traci_mod.exceptions.TraCIException:
+                        ring.ok[w] = False
+        if due:
+            self._deliver(self._r, due)
+            self._r = (self._r + due) % depth
+            self._n -= due
+
+    def _deliver(self, r, count):
+        """슬롯 r 부터 count 개 도착 → 송신자별로 그중 가장 최근 유효 메시지를 latest 로"""
+        depth = self.depth
+        for ring in self._rings.values():
+            ok = ring.ok
+            for i in range(count - 1, -1, -1):
+                j = (r + i) % depth
+                if ok[j]:
+                    latest = ring.latest
+                    if latest is None:
+                        ring.latest = [ring.speed[j], ring.accel[j], self._slot_t[j]]
+                    else:
+                        latest[0] = ring.speed[j]
+                        latest[1] = ring.accel[j]
+                        latest[2] = self._slot_t[j]
+                    break
+
+    def receive(self, vid):
+        """마지막 수신 메시지 [speed, accel, 송신 시각] (V2V 미탑재/아직 수신 없음이면 None)"""
+        ring = self._rings.get(vid)
+        return ring.latest if ring is not None else None
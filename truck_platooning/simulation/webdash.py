@@ -0,0 +1,350 @@
+# simulation/webdash.py
+# 브라우저 대시보드 (로컬 웹소켓, 표준 라이브러리만 사용)
+# - 백그라운드 스레드의 HTTP 서버: GET / → 대시보드 페이지, GET /ws → RFC 6455 웹소켓
+# - 제어 스레드는 publish() 에서 스냅샷 캡처만 (TraCI 는 제어 스레드에서만 호출)
+#   · 접속한 클라이언트가 없으면 아무것도 안 함
+#   · 캡처 간격은 캡처 비용에 맞춰 자동 조절 (캡처 시간이 벽시계의 CAPTURE_BUDGET 이하)
+# - 클라이언트별 스레드가 최신 스냅샷과 자기가 마지막으로 보낸 상태를 비교해 바뀐 행만 전송 (delta)
+#   → 느린 클라이언트는 중간 스냅샷을 건너뛰고 최신 상태로 바로 따라잡음, 제어 루프는 기다리지 않음
+# - 브라우저의 참여/이탈/출발/제동/끼어들기 버튼 → JSON 명령 → engine.commands 큐 → 다음 스텝에 실행
+# 사용법: python main.py --web 8765 (Tk 창과 함께) / python main.py --web 8765 --no-gui --chain Veh0,Veh1,Veh2
+import base64
+import hashlib
+import json
+import select
+import struct
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from simulation import events
+from simulation import metrics
+from simulation.fleet import fleet_order, vehicle_status
+
+WS_GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+MIN_INTERVAL = 0.1        # 최대 10 Hz
+MAX_INTERVAL = 1.0        # 최소 1 Hz
+CAPTURE_BUDGET = 0.05     # 캡처 시간 / 벽시계 상한 (5%)
+MAX_MESSAGE = 64 * 1024   # 클라이언트 → 서버 메시지 상한 [bytes]
+
+OP_TEXT, OP_CLOSE, OP_PING, OP_PONG = 0x1, 0x8, 0x9, 0xA
+
+
+# ===== RFC 6455 프레이밍 =====
+def accept_key(key):
+    digest = hashlib.sha1((key.strip() + WS_GUID).encode("ascii")).digest()
+    return base64.b64encode(digest).decode("ascii")
+
+
+def encode_frame(payload, opcode=OP_TEXT):
+    """서버 → 클라이언트 프레임 (FIN=1, 마스크 없음)"""
+    n = len(payload)
+    if n < 126:
+        head = struct.pack("!BB", 0x80 | opcode, n)
+    elif n < 65536:
+        head = struct.pack("!BBH", 0x80 | opcode, 126, n)
+    else:
+        head = struct.pack("!BBQ", 0x80 | opcode, 127, n)
+    return head + payload
+
+
+def _recv_exact(sock, n):
+    buf = bytearray()
+    while len(buf) < n:
+        chunk = sock.recv(n - len(buf))
+        if not chunk:
+            raise ConnectionError("socket closed")
+        buf += chunk
+    return bytes(buf)
+
+
+def read_frame(sock):
+    """클라이언트 프레임 1개 → (opcode, fin, payload). 클라이언트 프레임은 반드시 마스크됨"""
+    b0, b1 = _recv_exact(sock, 2)
+    fin = bool(b0 & 0x80)
+    opcode = b0 & 0x0F
+    masked = bool(b1 & 0x80)
+    n = b1 & 0x7F
+    if n == 126:
+        n = struct.unpack("!H", _recv_exact(sock, 2))[0]
+    elif n == 127:
+        n = struct.unpack("!Q", _recv_exact(sock, 8))[0]
+    if not masked or n > MAX_MESSAGE:
+        raise ConnectionError("protocol error")
+    mask = _recv_exact(sock, 4)
+    data = bytearray(_recv_exact(sock, n))
+    for i in range(n):
+        data[i] ^= mask[i & 3]
+    return opcode, fin, bytes(data)
+
+
+# ===== 스냅샷 / delta =====
+def _row(status):
+    role, speed, gap, direct, st = status
+    return [role, round(speed * 3.6, 1), None if gap is None else round(gap, 1), direct, st]
+
+
+def delta(prev, cur):
+    """prev/cur: {vid: row} → (바뀐/새 행, 사라진 vid)"""
+    upd = {vid: row for vid, row in cur.items() if prev.get(vid) != row}
+    gone = [vid for vid in prev if vid not in cur]
+    return upd, gone
+
+
+class _Client:
+    def __init__(self, sock, addr):
+        self.sock = sock
+        self.addr = addr
+        self.sent = {}            # 마지막으로 보낸 행 {vid: row}
+        self.order = None
+        self.seq = -1
+        self.lock = threading.Lock()
+
+    def send(self, obj):
+        data = encode_frame(json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8"))
+        with self.lock:
+            self.sock.sendall(data)
+        metrics.inc("web_bytes_sent", len(data))
+
+
+class WebDashboard:
+    def __init__(self, engine, port=0, host="127.0.0.1"):
+        self.engine = engine
+        self.host = host
+        self.port = port
+        self.interval = MIN_INTERVAL
+        self.clients = set()
+        self._cond = threading.Condition()
+        self._snap = None         # (seq, meta, order, rows)
+        self._seq = 0
+        self._last_capture = 0.0
+        self._server = None
+        self._thread = None
+
+    # -------- 서버 --------
+    def start(self):
+        dash = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"     # 웹소켓 업그레이드는 HTTP/1.1 응답 필요
+
+            def do_GET(self):
+                if self.path.split("?")[0] == "/ws" and "websocket" in self.headers.get("Upgrade", "").lower():
+                    dash._upgrade(self)
+                elif self.path in ("/", "/index.html"):
+                    body = PAGE.encode("utf-8")
+                    self.send_response(200)
+                    self.send_header("Content-Type", "text/html; charset=utf-8")
+                    self.send_header("Content-Length", str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+                else:
+                    self.send_error(404)
+
+            def log_message(self, fmt, *args):
+                pass
+
+        self._server = ThreadingHTTPServer((self.host, self.port), Handler)
+        self._server.daemon_threads = True
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(target=self._server.serve_forever, name="webdash", daemon=True)
+        self._thread.start()
+        events.emit("webdash", f"웹 대시보드: http://{self.host}:{self.port}/", port=self.port)
+        return self.port
+
+    def stop(self):
+        if self._server is None:
+            return
+        with self._cond:
+            self._snap = None
+            self._cond.notify_all()
+        for c in list(self.clients):
+            try:
+                c.sock.close()
+            except OSError:
+                pass
+        self._server.shutdown()
+        self._server.server_close()
+        self._server = None
+
+    # -------- 제어 스레드: 스냅샷 캡처 --------
+    def publish(self):
+        """제어 루프에서 매 프레임/스텝 호출 (클라이언트 없거나 간격 전이면 즉시 반환)"""
+        if not self.clients:
+            return
+        now = time.perf_counter()
+        if now - self._last_capture < self.interval:
+            return
+        self._last_capture = now
+        eng = self.engine
+        rt = eng.state
+        traci_mod = eng.traci
+        chain = list(eng.chain_now)
+        leader_of = dict(rt.follow_pairs)
+        leader_id = chain[0] if chain else None
+        order, _ = fleet_order(traci_mod.vehicle.getIDList(), chain)
+        rows = {}
+        for vid in order:
+            status = vehicle_status(traci_mod, rt, vid, leader_of, leader_id)
+            if status is not None:
+                rows[vid] = _row(status)
+        meta = {"sim_t": round(eng.sim_t, 2), "steps": eng.steps, "chain": chain,
+                "cutin": eng.cutin.state, "braking": bool(eng.brakes.braking),
+                "hz": round(1.0 / self.interval, 1)}
+        cost = time.perf_counter() - now
+        # 캡처 비용이 커지면(차량 수 증가) 간격을 늘려 제어 루프 부하를 예산 안으로
+        self.interval = min(MAX_INTERVAL, max(MIN_INTERVAL, cost / CAPTURE_BUDGET))
+        with self._cond:
+            self._seq += 1
+            self._snap = (self._seq, meta, order, rows)
+            self._cond.notify_all()
+
+    # -------- 클라이언트 스레드 --------
+    def _upgrade(self, handler):
+        key = handler.headers.get("Sec-WebSocket-Key")
+        if not key:
+            handler.send_error(400)
+            return
+        # 다른 사이트 페이지가 브라우저로 /ws 에 붙는 것 차단 (cross-site WebSocket hijacking)
+        origin = handler.headers.get("Origin")
+        if origin is not None and origin != f"http://{self.host}:{self.port}":
+            handler.send_error(403)
+            return
+        handler.send_response(101, "Switching Protocols")
+        handler.send_header("Upgrade", "websocket")
+        handler.send_header("Connection", "Upgrade")
+        handler.send_header("Sec-WebSocket-Accept", accept_key(key))
+        handler.end_headers()
+        handler.wfile.flush()
+        handler.close_connection = True
+
+        client = _Client(handler.connection, handler.client_address)
+        self.clients.add(client)
+        metrics.set_gauge("web_clients", len(self.clients))
+        events.emit("webdash", f"클라이언트 접속 {client.addr[0]}:{client.addr[1]}", clients=len(self.clients))
+        try:
+            self._serve_client(client)
+        except (ConnectionError, OSError, ValueError):
+            pass
+        finally:
+            self.clients.discard(client)
+            metrics.set_gauge("web_clients", len(self.clients))
+            events.emit("webdash", f"클라이언트 종료 {client.addr[0]}:{client.addr[1]}", clients=len(self.clients))
+
+    def _serve_client(self, client):
+        sock = client.sock
+        pending = bytearray()
+        while self._server is not None:
+            # 1) 들어온 명령 처리 (블로킹 없이)
+            while select.select([sock], [], [], 0)[0]:
+                opcode, fin, payload = read_frame(sock)
+                if opcode == OP_CLOSE:
+                    with client.lock:
+                        sock.sendall(encode_frame(payload[:2], OP_CLOSE))
+                    return
+                if opcode == OP_PING:
+                    with client.lock:
+                        sock.sendall(encode_frame(payload, OP_PONG))
+                    continue
+                if opcode in (OP_TEXT, 0x0):
+                    # 조각(continuation) 프레임 합계도 MAX_MESSAGE 까지만
+                    if len(pending) + len(payload) > MAX_MESSAGE:
+                        raise ConnectionError("message too large")
+                    pending += payload
+                    if fin:
+                        self._on_message(client, bytes(pending))
+                        pending.clear()
+
+            # 2) 새 스냅샷이 있으면 delta 전송 (없으면 잠깐 대기)
+            with self._cond:
+                if self._snap is None or self._snap[0] == client.seq:
+                    self._cond.wait(0.1)
+                snap = self._snap
+            if snap is None or snap[0] == client.seq:
+                continue
+            seq, meta, order, rows = snap
+            if client.seq < 0:
+                msg = {"t": "full", "seq": seq, "meta": meta, "order": order, "rows": rows}
+            else:
+                upd, gone = delta(client.sent, rows)
+                msg = {"t": "delta", "seq": seq, "meta": meta, "upd": upd, "del": gone}
+                if order != client.order:
+                    msg["order"] = order
+            client.send(msg)
+            client.sent = rows
+            client.order = order
+            client.seq = seq
+
+    def _on_message(self, client, data):
+        try:
+            cmd = json.loads(data.decode("utf-8"))
+        except (UnicodeDecodeError, ValueError):
+            return
+        if not isinstance(cmd, dict):
+            return
+        cmd["source"] = f"web:{client.addr[0]}"
+        ok = self.engine.commands.put(cmd)
+        client.send({"t": "ack", "op": cmd.get("op"), "queued": ok})
+
+
+def serve(engine, port=0, host="127.0.0.1"):
+    """대시보드 시작 → WebDashboard (제어 루프에서 publish() 호출 필요)"""
+    dash = WebDashboard(engine, port=port, host=host)
+    dash.start()
+    return dash
+
+
+PAGE = """<!doctype html>
+<html lang="ko"><head><meta charset="utf-8"><title>Truck Platooning – Web Dashboard</title>
+<style>
+body{font:13px system-ui,sans-serif;margin:12px}
+table{border-collapse:collapse}td,th{padding:2px 8px;text-align:left}
+tr:nth-child(even){background:#f4f6f8}th{border-bottom:1px solid #ccc}
+.leader{color:#ff3b30}.follower{color:#1f6fd1}.parked{color:#999}
+.cut-in{color:#d35400}.merge,.leave{color:#8e44ad}.brake{color:#c0392b}
+#bar>*{margin-right:8px}#log{color:#555;margin-top:6px}
+</style></head><body>
+<div id="bar"><b>Truck Platooning</b><span id="meta">연결 중…</span>
+<button onclick="send({op:'brake',seconds:3})">리더 제동 3s</button>
+리더 <select id="cl"></select> 팔로워 <select id="cf"></select>
+<button onclick="send({op:'cut_in_spawn',leader:cl.value,follower:cf.value})">일반차 생성&amp;접근</button>
+<button onclick="send({op:'cut_in'})">끼어들기</button>
+<button onclick="send({op:'cut_out'})">나가기</button></div>
+<div id="log"></div>
+<table><thead><tr><th>#</th><th>ID</th><th>역할</th><th>속도 km/h</th><th>간격 m</th><th>상태</th><th></th></tr></thead>
+<tbody id="rows"></tbody></table>
+<script>
+let ws, rows = {}, order = [], chain = [];
+function send(o){ if (ws && ws.readyState === 1) ws.send(JSON.stringify(o)); }
+function opts(sel, ids){ const v = sel.value; sel.innerHTML = ids.map(i => `<option>${i}</option>`).join("");
+  if (ids.includes(v)) sel.value = v; }
+function render(){
+  const out = [];
+  order.forEach((vid, i) => { const r = rows[vid]; if (!r) return;
+    const [role, kmh, gap, direct, st] = r;
+    const act = role === "parked" ? `<button onclick="send({op:'start',vid:'${vid}'})">출발</button>`
+      : chain.includes(vid) ? `<button onclick="send({op:'leave',vid:'${vid}'})">나가기</button>`
+      : `<button onclick="send({op:'join',vid:'${vid}'})">참여</button>`;
+    out.push(`<tr><td>${i+1}</td><td>${vid}</td><td class="${role}">${role}</td><td>${kmh.toFixed(1)}</td>`
+      + `<td>${gap === null ? "—" : gap.toFixed(1) + (direct ? "" : "*")}</td><td class="${st}">${st}</td><td>${act}</td></tr>`);
+  });
+  document.getElementById("rows").innerHTML = out.join("");
+}
+function connect(){
+  ws = new WebSocket(`ws://${location.host}/ws`);
+  ws.onmessage = ev => { const m = JSON.parse(ev.data);
+    if (m.t === "ack") { document.getElementById("log").textContent = `${m.op}: ${m.queued ? "전송됨" : "거부"}`; return; }
+    if (m.t === "full") { rows = m.rows; }
+    else { Object.assign(rows, m.upd); m.del.forEach(v => delete rows[v]); }
+    if (m.order) order = m.order;
+    chain = m.meta.chain;
+    opts(cl, chain); opts(cf, chain);
+    document.getElementById("meta").textContent =
+      `t=${m.meta.sim_t.toFixed(1)}s · 체인 ${chain.length}대 · 끼어들기 ${m.meta.cutin} · ${m.meta.hz} Hz`;
+    render(); };
+  ws.onclose = () => { document.getElementById("meta").textContent = "연결 끊김 – 재시도…"; setTimeout(connect, 1000); };
+}
+const cl = document.getElementById("cl"), cf = document.getElementById("cf");
+connect();
+</script></body></html>
+"""